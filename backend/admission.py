@@ -0,0 +1,191 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from auth import get_current_user
+from config import settings
+from models import User, UserRole
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+"""
+요청 수용 제어(admission control) 및 부하 차단 미들웨어
+- 요청을 우선순위 등급(auth / bulk / interactive)으로 나누고, 등급별·경로별 동시 실행 수와 대기열 길이를 제한
+- 대기열이 가득 차면 즉시 503(등급 한도) 또는 429(경로 한도)와 Retry-After를 반환
+- 대기 시간이 ADMISSION_QUEUE_TIMEOUT을 넘어도 503으로 끊어 꼬리 지연이 다른 요청으로 번지지 않게 함
+- 반납된 자리는 대기 순서대로 다음 요청에 바로 넘겨줌 (시간 초과/취소된 대기자가 받은 자리도 다음으로 넘김)
+- 카운터는 GET /admin/admission (관리자 전용)으로 조회
+"""
+
+# (메소드, 경로, 등급) - "*"로 끝나면 앞부분 일치, 아니면 정확히 일치. 먼저 나온 규칙 우선
+CLASS_RULES = [
+    ("POST", "/auth/login", "auth"),
+    ("POST", "/auth/signup", "auth"),
+    ("GET", "/works/", "bulk"),
+    ("GET", "/works/solution/*", "bulk"),
+    ("GET", "/search/*", "bulk"),
+    ("POST", "/batch", "bulk"),
+    ("*", "/admin/*", "bulk"),
+]
+# 제한 없이 통과시키는 경로 (헬스체크 등)
+EXEMPT_PATHS = ("/docs", "/openapi.json", "/redoc", "/healthz", "/readyz")
+
+
+class Limiter:
+    """동시 실행 수 + 대기열 길이 제한"""
+
+    def __init__(self, name: str, concurrency: int, queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.active = 0
+        self.waiting = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.waiting >= self.queue:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            # wait()는 시간이 지나도 waiter를 취소하지 않으므로, 깨움과 시간 초과가 겹쳐도 아래에서 한 번만 판단
+            await asyncio.wait([waiter], timeout=timeout)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        finally:
+            self.waiting -= 1
+            self.wait_seconds += time.monotonic() - started
+        if not waiter.done():
+            self._abandon(waiter)
+            self.timed_out += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def _abandon(self, waiter: asyncio.Future):
+        # 이미 자리를 넘겨받은 뒤 포기(요청 취소)하면 그 자리를 다음 대기자에게 넘김
+        if waiter.done():
+            self._hand_off()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def _hand_off(self):
+        """자리를 가장 오래 기다린 대기자에게 그대로 넘기고, 대기자가 없으면 반납"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    async def release(self):
+        self._hand_off()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+        }
+
+
+def classify(method: str, path: str) -> str:
+    for rule_method, pattern, name in CLASS_RULES:
+        if rule_method != "*" and rule_method != method:
+            continue
+        if path == pattern or (pattern.endswith("*") and path.startswith(pattern[:-1])):
+            return name
+    return "interactive"
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.classes: Dict[str, Limiter] = {
+            "interactive": Limiter("interactive", settings.ADMISSION_INTERACTIVE_CONCURRENCY, settings.ADMISSION_INTERACTIVE_QUEUE),
+            "bulk": Limiter("bulk", settings.ADMISSION_BULK_CONCURRENCY, settings.ADMISSION_BULK_QUEUE),
+            "auth": Limiter("auth", settings.ADMISSION_AUTH_CONCURRENCY, settings.ADMISSION_AUTH_QUEUE),
+        }
+        # 경로별 추가 한도 (예: {"GET /works/": [4, 8]})
+        self.routes: Dict[str, Limiter] = {
+            key: Limiter(key, limits[0], limits[1])
+            for key, limits in json.loads(settings.ADMISSION_ROUTE_LIMITS or "{}").items()
+        }
+        admission_state["middleware"] = self
+
+    def _reject(self, status_code: int, limiter: Limiter) -> JSONResponse:
+        return JSONResponse(
+            {"detail": "요청이 많아 잠시 후 다시 시도해 주세요.", "limit": limiter.name},
+            status_code=status_code,
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED or scope["path"].startswith(EXEMPT_PATHS) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        # 배치 하위 요청은 바깥 /batch 요청이 이미 자리를 차지하고 있으므로 통과
+        if (scope.get("state") or {}).get("batch_sub"):
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        limiter = self.classes[classify(method, path)]
+        route_limiter = self.routes.get(f"{method} {path}")
+        timeout = settings.ADMISSION_QUEUE_TIMEOUT
+
+        if route_limiter is not None:
+            if not await route_limiter.acquire(timeout):
+                await self._reject(429, route_limiter)(scope, receive, send)
+                return
+        try:
+            if not await limiter.acquire(timeout):
+                await self._reject(503, limiter)(scope, receive, send)
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await limiter.release()
+        finally:
+            if route_limiter is not None:
+                await route_limiter.release()
+
+    def stats(self) -> dict:
+        return {
+            "classes": {name: limiter.stats() for name, limiter in self.classes.items()},
+            "routes": {name: limiter.stats() for name, limiter in self.routes.items()},
+        }
+
+
+admission_state: Dict[str, AdmissionControlMiddleware] = {}
+
+
+# 수용 제어 카운터 조회 (관리자 전용)
+@router.get("/admission")
+def admission_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    middleware = admission_state.get("middleware")
+    return middleware.stats() if middleware else {"classes": {}, "routes": {}}
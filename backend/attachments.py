@@ -0,0 +1,435 @@
+import fcntl
+import hashlib
+import os
+import re
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import ContextManager, List, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from config import settings
+from database import get_db, delete_returning, row_exists
+from models import Attachment, AttachmentUpload, Issue, Work
+from schemas import Attachment as AttachmentSchema, AttachmentOwnerType, AttachmentUploadCreate, AttachmentUploadStatus
+
+router = APIRouter(prefix="/attachments", tags=["attachments"])
+
+"""
+첨부파일 API 라우터
+- 이슈/작업내역 첨부파일의 분할(재개 가능) 업로드, 목록, 다운로드(Range 지원), 삭제
+- 업로드 본문은 메모리에 모으지 않고 청크 단위로 저장소에 바로 기록
+- 파일 본문은 sha256 기준으로 한 번만 저장 (같은 파일은 메타데이터만 추가)
+- 모든 API는 로그인 필요, 업로드 상태/청크/완료는 업로드를 시작한 사용자만
+- 청크 기록과 완료 처리는 업로드별 잠금(워커 간에도 유효)으로 직렬화, 잠겨 있으면 409
+- 작업내역 삭제/이슈 영구 삭제 시 그 첨부파일과 진행 중 업로드도 같은 트랜잭션에서 삭제 (다른 첨부가 참조하지 않는 파일은 커밋 후 삭제)
+"""
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# 업로드 id는 저장소 파일 경로에 쓰이므로 형식을 제한
+UploadId = Path(..., pattern=r"^[0-9a-f]{32}$")
+
+
+class AttachmentStore(ABC):
+    """첨부파일 저장소 인터페이스"""
+
+    @abstractmethod
+    def partial_size(self, upload_id: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def start_upload(self, upload_id: str):
+        ...
+
+    @abstractmethod
+    def append_path(self, upload_id: str) -> str:
+        ...
+
+    @abstractmethod
+    def lock_upload(self, upload_id: str) -> ContextManager[bool]:
+        """업로드 하나에 대한 배타 잠금 (다른 요청이 잡고 있으면 False, 업로드가 없으면 FileNotFoundError)"""
+
+    @abstractmethod
+    def finish_upload(self, upload_id: str) -> Tuple[str, int]:
+        ...
+
+    @abstractmethod
+    def discard_upload(self, upload_id: str):
+        ...
+
+    @abstractmethod
+    def blob_path(self, sha256: str) -> str:
+        ...
+
+    @abstractmethod
+    def delete_blob(self, sha256: str):
+        ...
+
+
+class LocalDiskStore(AttachmentStore):
+    """로컬 디스크 저장소 (blobs/ab/cd/<sha256>, uploads/<upload_id>.part)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "uploads"), exist_ok=True)
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.root, "uploads", f"{upload_id}.part")
+
+    def partial_size(self, upload_id: str) -> Optional[int]:
+        path = self._part_path(upload_id)
+        return os.path.getsize(path) if os.path.exists(path) else None
+
+    def start_upload(self, upload_id: str):
+        open(self._part_path(upload_id), "wb").close()
+
+    def append_path(self, upload_id: str) -> str:
+        return self._part_path(upload_id)
+
+    @contextmanager
+    def lock_upload(self, upload_id: str):
+        # 업로드 파일 자체에 flock (O_CREAT 없이 열어 취소된 업로드를 다시 만들지 않음)
+        fd = os.open(self._part_path(upload_id), os.O_RDONLY)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            os.close(fd)
+
+    def finish_upload(self, upload_id: str) -> Tuple[str, int]:
+        path = self._part_path(upload_id)
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        target = self.blob_path(sha256)
+        if os.path.exists(target):
+            # 이미 같은 내용이 저장되어 있으면 업로드 파일은 버림
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        return sha256, size
+
+    def discard_upload(self, upload_id: str):
+        path = self._part_path(upload_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "blobs", sha256[:2], sha256[2:4], sha256)
+
+    def delete_blob(self, sha256: str):
+        path = self.blob_path(sha256)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+STORES = {"local": lambda: LocalDiskStore(settings.ATTACHMENTS_DIR)}
+_store: Optional[AttachmentStore] = None
+
+
+def get_store() -> AttachmentStore:
+    global _store
+    if _store is None:
+        _store = STORES[settings.ATTACHMENT_STORE]()
+    return _store
+
+
+class RangeFileResponse(Response):
+    """파일 일부/전체 응답. 서버가 zerocopysend 확장을 지원하면 sendfile로 전송"""
+
+    def __init__(self, path: str, start: int, length: int, status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.length = length
+
+    def init_headers(self, headers=None):
+        super().init_headers(headers)
+        # 본문이 비어 있는 상태로 계산된 content-length를 실제 길이로 교체
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b"content-length"]
+
+    async def __call__(self, scope, receive, send):
+        self.raw_headers.append((b"content-length", str(self.length).encode()))
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+        remaining = self.length
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    # 단일 범위만 지원, 해석할 수 없는 형식(다중 범위 등)은 전체 응답
+    if not header:
+        return None
+    m = RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start = max(size - int(m.group(2)), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def delete_owner_attachments(db: Session, owner_type: AttachmentOwnerType, owner_ids: List[int]) -> Tuple[List[str], List[str]]:
+    """삭제되는 이슈/작업내역의 첨부파일과 진행 중 업로드 행을 삭제 (호출한 쪽 트랜잭션 안에서)
+    커밋 후 release_files에 넘길 (더 이상 참조되지 않는 sha256 목록, 업로드 id 목록)을 반환"""
+    if not owner_ids:
+        return [], []
+    removed = set(db.execute(
+        delete(Attachment.__table__)
+        .where(Attachment.owner_type == owner_type.value, Attachment.owner_id.in_(owner_ids))
+        .returning(Attachment.sha256)
+    ).scalars())
+    shared = set(db.execute(select(Attachment.sha256).where(Attachment.sha256.in_(removed))).scalars()) if removed else set()
+    uploads = db.execute(
+        delete(AttachmentUpload.__table__)
+        .where(AttachmentUpload.owner_type == owner_type.value, AttachmentUpload.owner_id.in_(owner_ids))
+        .returning(AttachmentUpload.id)
+    ).scalars().all()
+    return sorted(removed - shared), list(uploads)
+
+
+def release_files(released: Tuple[List[str], List[str]]):
+    # delete_owner_attachments 결과를 커밋 후 저장소에서 삭제
+    blobs, uploads = released
+    store = get_store()
+    for sha256 in blobs:
+        store.delete_blob(sha256)
+    for upload_id in uploads:
+        store.discard_upload(upload_id)
+
+
+# 분할 업로드 시작
+@router.post("/uploads", response_model=AttachmentUploadStatus)
+def create_upload(upload: AttachmentUploadCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    if upload.size > settings.ATTACHMENT_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="첨부파일 크기 제한을 초과했습니다.")
+    owner = Issue if upload.owner_type == AttachmentOwnerType.issue else Work
+    conditions = [owner.id == upload.owner_id] + ([owner.deleted_at.is_(None)] if owner is Issue else [])
+    if not row_exists(db, owner, conditions):
+        raise HTTPException(status_code=404, detail=f"{upload.owner_type.value.capitalize()} not found")
+    upload_id = uuid.uuid4().hex
+    db.add(AttachmentUpload(
+        id=upload_id,
+        owner_type=upload.owner_type.value,
+        owner_id=upload.owner_id,
+        filename=os.path.basename(upload.filename),
+        content_type=upload.content_type,
+        size=upload.size,
+        uploaded_by=current_user.name,
+    ))
+    get_store().start_upload(upload_id)
+    db.commit()
+    return {"upload_id": upload_id, "offset": 0, "size": upload.size}
+
+
+def _own_upload(db: Session, upload_id: str, current_user) -> AttachmentUpload:
+    upload = db.get(AttachmentUpload, upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if upload.uploaded_by != current_user.name:
+        raise HTTPException(status_code=403, detail="본인이 시작한 업로드만 이어서 진행할 수 있습니다.")
+    return upload
+
+
+def _upload_busy() -> HTTPException:
+    return HTTPException(status_code=409, detail="같은 업로드를 다른 요청이 처리 중입니다.", headers={"Retry-After": "1"})
+
+
+# 업로드 진행 상태 (재개 시 이어서 보낼 위치 확인)
+@router.get("/uploads/{upload_id}", response_model=AttachmentUploadStatus)
+def get_upload(upload_id: str = UploadId, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    upload = _own_upload(db, upload_id, current_user)
+    offset = get_store().partial_size(upload_id)
+    if offset is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"upload_id": upload_id, "offset": offset, "size": upload.size}
+
+
+# 청크 업로드 (Content-Range: bytes start-end/total, start는 현재 offset과 같고 total은 업로드 시작 시 크기와 같아야 함)
+@router.put("/uploads/{upload_id}", response_model=AttachmentUploadStatus)
+async def upload_chunk(request: Request, upload_id: str = UploadId, content_range: str = Header(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    upload = await run_in_threadpool(_own_upload, db, upload_id, current_user)
+    m = CONTENT_RANGE_RE.match(content_range)
+    if not m:
+        raise HTTPException(status_code=400, detail="Content-Range 형식이 올바르지 않습니다.")
+    start, end, total = (int(g) for g in m.groups())
+    if total != upload.size or end < start or end >= total:
+        raise HTTPException(status_code=400, detail="Content-Range 범위가 올바르지 않습니다.")
+
+    store = get_store()
+    try:
+        with store.lock_upload(upload_id) as locked:
+            if not locked:
+                raise _upload_busy()
+            # 잠금을 잡은 뒤의 크기가 기준 (같은 offset의 동시 요청은 하나만 기록)
+            offset = store.partial_size(upload_id)
+            if start != offset:
+                raise HTTPException(status_code=409, detail=f"현재 업로드 위치는 {offset}입니다.", headers={"Upload-Offset": str(offset)})
+            expected = end - start + 1
+            written = 0
+            async with await anyio.open_file(store.append_path(upload_id), "ab") as f:
+                async for chunk in request.stream():
+                    if written + len(chunk) > expected:
+                        chunk = chunk[:expected - written]
+                    await f.write(chunk)
+                    written += len(chunk)
+                    if written >= expected:
+                        break
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"upload_id": upload_id, "offset": offset + written, "size": total}
+
+
+# 업로드 완료 → 해시 계산, 중복 제거 후 첨부파일 등록
+@router.post("/uploads/{upload_id}/complete", response_model=AttachmentSchema)
+def complete_upload(upload_id: str = UploadId, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    upload = _own_upload(db, upload_id, current_user)
+    store = get_store()
+    try:
+        with store.lock_upload(upload_id) as locked:
+            if not locked:
+                raise _upload_busy()
+            offset = store.partial_size(upload_id)
+            if offset != upload.size:
+                raise HTTPException(status_code=409, detail=f"업로드가 완료되지 않았습니다. ({offset}/{upload.size})", headers={"Upload-Offset": str(offset)})
+            sha256, size = store.finish_upload(upload_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    attachment = Attachment(
+        owner_type=upload.owner_type,
+        owner_id=upload.owner_id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=size,
+        sha256=sha256,
+        uploaded_by=upload.uploaded_by,
+    )
+    db.add(attachment)
+    db.delete(upload)
+    db.commit()
+    db.refresh(attachment)
+    return attachment
+
+
+# 업로드 취소 (청크 기록/완료 처리 중이면 409)
+@router.delete("/uploads/{upload_id}")
+def cancel_upload(upload_id: str = UploadId, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    _own_upload(db, upload_id, current_user)
+    store = get_store()
+    try:
+        with store.lock_upload(upload_id) as locked:
+            if not locked:
+                raise _upload_busy()
+            deleted = delete_returning(db, AttachmentUpload, [AttachmentUpload.id == upload_id])
+            db.commit()
+            store.discard_upload(upload_id)
+    except FileNotFoundError:
+        # 업로드 파일이 이미 없으면(완료됐거나 정리됨) 남은 메타데이터만 삭제
+        deleted = delete_returning(db, AttachmentUpload, [AttachmentUpload.id == upload_id])
+        db.commit()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"ok": True}
+
+
+# 첨부파일 목록
+@router.get("/", response_model=List[AttachmentSchema])
+def list_attachments(owner_type: AttachmentOwnerType = Query(...), owner_id: int = Query(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    return db.query(Attachment).filter(
+        Attachment.owner_type == owner_type.value,
+        Attachment.owner_id == owner_id,
+    ).order_by(Attachment.created_at.asc()).all()
+
+
+def _attachment_response(db: Session, attachment_id: int, range: Optional[str], if_none_match: Optional[str]) -> Response:
+    attachment = db.get(Attachment, attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    path = get_store().blob_path(attachment.sha256)
+    etag = f'"{attachment.sha256}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Type": attachment.content_type,
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(attachment.filename)}",
+    }
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    byte_range = _parse_range(range, attachment.size)
+    if byte_range is None:
+        return RangeFileResponse(path, 0, attachment.size, 200, headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{attachment.size}"
+    return RangeFileResponse(path, start, end - start + 1, 206, headers)
+
+
+# 첨부파일 다운로드 (Range 요청 지원)
+@router.get("/{attachment_id}")
+def download_attachment(attachment_id: int, range: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    return _attachment_response(db, attachment_id, range, if_none_match)
+
+
+# 첨부파일 헤더만 조회 (크기/ETag 확인, 본문 없음)
+@router.head("/{attachment_id}")
+def head_attachment(attachment_id: int, range: Optional[str] = Header(None), if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    return _attachment_response(db, attachment_id, range, if_none_match)
+
+
+# 첨부파일 삭제 (같은 내용을 참조하는 첨부가 없으면 파일도 삭제)
+@router.delete("/{attachment_id}")
+def delete_attachment(attachment_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    attachment = db.get(Attachment, attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    sha256 = attachment.sha256
+    db.delete(attachment)
+    db.flush()
+    shared = row_exists(db, Attachment, [Attachment.sha256 == sha256])
+    db.commit()
+    if not shared:
+        get_store().delete_blob(sha256)
+    return {"ok": True}
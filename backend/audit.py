@@ -0,0 +1,225 @@
+import enum
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from config import settings
+from database import get_engine
+from models import ActivityLog
+
+"""
+변경 이력(감사 로그) write-behind 기록
+- 수정 API는 필드 단위 변경분을 record()로 넘기기만 함 (메모리 버퍼 + 저널 파일에 한 줄 append, DB 왕복 없음)
+- 백그라운드 스레드가 AUDIT_FLUSH_INTERVAL(초)마다 또는 AUDIT_FLUSH_SIZE건이 쌓이면 한 번에 저장
+  (psycopg 3이면 COPY, 아니면 다중 행 INSERT)
+- 저장 실패/프로세스 비정상 종료 시에도 AUDIT_SPOOL_DIR의 저널 파일이 남아 다음 flush(또는 다음 기동)에서 다시 저장
+  (스풀 파일 이름은 <종류>-<소유 pid>-..., 다른 워커는 소유 프로세스가 종료된 파일만 가져가므로 쓰는 중인 파일을 중복 저장하지 않음)
+- 아직 저장되지 않은 변경분도 pending()으로 조회할 수 있어 이력 API는 방금 수정한 내용까지 보여줌
+"""
+
+logger = logging.getLogger(__name__)
+
+# active: 기록 중인 저널, inflight: flush 중, pending: 저장 실패분(소유 워커가 다시 저장), claimed: 재저장 중
+SPOOL_KINDS = ("active", "inflight", "pending", "claimed")
+COLUMNS = ("entity_type", "entity_id", "solution", "field", "old_value", "new_value", "actor", "created_at")
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditLog:
+    def __init__(self, spool_dir: str, flush_interval: float, flush_size: int):
+        self.spool_dir = spool_dir
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: List[dict] = []
+        self._journal = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"recorded": 0, "flushed": 0, "failed_flushes": 0, "replayed": 0}
+
+    # ---- 쓰기 경로 ----
+
+    def record(self, entity_type: str, entity_id: int, changes: Dict[str, Tuple[Any, Any]], actor: Optional[str] = None, solution: Optional[str] = None):
+        if not changes:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        events = [
+            {
+                "entity_type": entity_type, "entity_id": entity_id, "solution": solution, "field": field,
+                "old_value": _jsonable(old), "new_value": _jsonable(new), "actor": actor, "created_at": now,
+            }
+            for field, (old, new) in changes.items()
+        ]
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        with self._lock:
+            self._ensure_started()
+            self._journal.write(lines)
+            self._journal.flush()
+            self._buffer.extend(events)
+            self.stats["recorded"] += len(events)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def pending(self, entity_type: str, entity_id: int) -> List[dict]:
+        with self._lock:
+            return [e for e in self._buffer if e["entity_type"] == entity_type and e["entity_id"] == entity_id]
+
+    # ---- 저널/flush ----
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.spool_dir, f"active-{os.getpid()}.jsonl")
+
+    def _spool_path(self, kind: str) -> str:
+        return os.path.join(self.spool_dir, f"{kind}-{os.getpid()}-{time.time_ns()}.jsonl")
+
+    def _ensure_started(self):
+        # self._lock 안에서 호출
+        if self._journal is not None:
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        # 같은 pid를 쓰던 이전 프로세스(컨테이너 재시작 등)의 저널은 버퍼에 없으므로 저장 실패분으로 넘김
+        if os.path.exists(self._journal_path()) and os.path.getsize(self._journal_path()) > 0:
+            os.replace(self._journal_path(), self._spool_path("pending"))
+        self._journal = open(self._journal_path(), "a", encoding="utf-8")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._thread.start()
+
+    def _rotate(self) -> Tuple[List[dict], Optional[str]]:
+        """버퍼와 현재 저널을 떼어내 inflight 파일로 넘김 (이후 record()는 새 저널에 기록)"""
+        with self._lock:
+            if not self._buffer:
+                return [], None
+            events, self._buffer = self._buffer, []
+            self._journal.close()
+            inflight = self._spool_path("inflight")
+            os.replace(self._journal_path(), inflight)
+            self._journal = open(self._journal_path(), "a", encoding="utf-8")
+            return events, inflight
+
+    def _write(self, events: List[dict]):
+        engine = get_engine()
+        with engine.begin() as conn:
+            if conn.dialect.driver == "psycopg":
+                cursor = conn.connection.driver_connection.cursor()
+                with cursor.copy(f"COPY {ActivityLog.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                    for event in events:
+                        row = dict(event, old_value=json.dumps(event["old_value"], ensure_ascii=False), new_value=json.dumps(event["new_value"], ensure_ascii=False))
+                        copy.write_row([row[c] for c in COLUMNS])
+            else:
+                conn.execute(insert(ActivityLog.__table__), events)
+
+    def _spool_files(self) -> List[Tuple[str, str, int]]:
+        """(경로, 종류, 소유 pid) 목록 - 소유 pid는 그 파일을 쓰거나 선점한 프로세스"""
+        files = []
+        for path in glob.glob(os.path.join(self.spool_dir, "*-*.jsonl")):
+            kind, _, rest = os.path.basename(path)[:-len(".jsonl")].partition("-")
+            pid = rest.split("-")[0]
+            if kind in SPOOL_KINDS and pid.isdigit():
+                files.append((path, kind, int(pid)))
+        return sorted(files)
+
+    def _replay_spool(self):
+        # 이 워커의 저장 실패분(pending)과 종료된 프로세스가 남긴 파일만 rename으로 선점해 다시 저장
+        # (살아 있는 다른 워커의 파일은 기록/flush/재저장 중일 수 있으므로 건드리지 않음)
+        me = os.getpid()
+        for path, kind, pid in self._spool_files():
+            if pid == me and kind != "pending":
+                continue
+            if pid != me and _pid_alive(pid):
+                continue
+            claimed = self._spool_path("claimed")
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with open(claimed, encoding="utf-8") as f:
+                    events = [json.loads(line) for line in f if line.endswith("\n")]
+                if events:
+                    self._write(events)
+                os.remove(claimed)
+                self.stats["replayed"] += len(events)
+            except Exception:
+                os.replace(claimed, self._spool_path("pending"))
+                raise
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            events, inflight = self._rotate()
+            if inflight is not None:
+                try:
+                    self._write(events)
+                except Exception:
+                    # 이 워커의 저장 실패분으로 남겨 다음 flush에서 다시 저장
+                    pending = self._spool_path("pending")
+                    os.replace(inflight, pending)
+                    self.stats["failed_flushes"] += 1
+                    logger.warning("audit flush failed, %d events kept in %s", len(events), pending, exc_info=True)
+                    return 0
+                os.remove(inflight)
+                self.stats["flushed"] += len(events)
+            # 남아 있던 실패분/이전 프로세스 저널 저장
+            try:
+                self._replay_spool()
+            except Exception:
+                logger.warning("audit spool replay failed", exc_info=True)
+            return len(events)
+
+    def start(self):
+        """기동 시 flush 스레드를 먼저 띄워 이전 프로세스가 남긴 저널도 바로 저장되게 함"""
+        with self._lock:
+            self._ensure_started()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("audit flush failed")
+
+    def close(self):
+        """종료 시 남은 변경분 저장 (실패해도 저널이 남아 다음 기동에서 저장)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        with self._lock:
+            self._journal.close()
+            self._journal = None
+            self._thread = None
+            # flush 뒤에 들어온 변경분이 없으면 빈 저널 정리 (있으면 다음 기동에서 저장)
+            if os.path.getsize(self._journal_path()) == 0:
+                os.remove(self._journal_path())
+
+
+audit_log = AuditLog(settings.AUDIT_SPOOL_DIR, settings.AUDIT_FLUSH_INTERVAL, settings.AUDIT_FLUSH_SIZE)
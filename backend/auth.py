@@ -3,7 +3,9 @@ from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from database import get_db
+from database import get_db, update_returning
+from tracing import span
+import statements
 from models import User, UserRole
 from schemas import UserCreate, UserRead, UserLogin, UserUpdate
 import os
@@ -19,6 +21,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 """
 인증 및 사용자 관리 라우터
@@ -44,28 +47,42 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 # JWT 토큰에서 사용자 정보 추출 함수
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="인증 정보가 유효하지 않습니다.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: Optional[str] = payload.get("sub")
-        if email is None:
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    with span("get_current_user"):
+        # 배치 요청(/batch)에서 이미 검증된 사용자는 다시 조회하지 않음 (컬럼 값으로 하위 요청마다 새 객체를 만듦)
+        state = request.scope.get("state") or {}
+        if state.get("batch_user") is not None and state.get("batch_token") == token:
+            return User(**state["batch_user"])
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="인증 정보가 유효하지 않습니다.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: Optional[str] = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
+        user = db.execute(*statements.user_by_email(email)).scalars().first()
+        if user is None:
+            raise credentials_exception
+        return user
+
+# 변경 이력에 남길 요청자 이메일 (토큰이 없거나 유효하지 않아도 요청은 막지 않음, DB 조회 없음)
+def get_actor(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        return None
 
 # 회원가입 API
 @router.post("/signup", response_model=UserRead)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = db.execute(*statements.user_by_email(user.email)).scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="이미 등록된 이메일입니다.")
     hashed_password = get_password_hash(user.password)
@@ -97,7 +114,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
         password = form.get("password")
     if not email or not password:
         raise HTTPException(status_code=422, detail="이메일/비밀번호를 입력하세요.")
-    db_user = db.query(User).filter(User.email == email).first()
+    db_user = db.execute(*statements.user_by_email(email)).scalars().first()
     if not db_user or not verify_password(password, db_user.hashed_password):
         raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 올바르지 않습니다.")
     if not db_user.is_active:
@@ -108,7 +125,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
 # 내 정보 수정 API
 @router.put("/me", response_model=UserRead)
 def update_me(update: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = db.execute(*statements.user_by_id(current_user.id)).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     if update.name is not None:
@@ -139,12 +156,10 @@ def get_users(db: Session = Depends(get_db), current_user: User = Depends(get_cu
 def activate_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.admin:
         raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = update_returning(db, User, [User.id == user_id], {"is_active": True})
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-    user.is_active = True
     db.commit()
-    db.refresh(user)
     return user
 
 # 사용자 권한 변경 (관리자 전용, 자기 자신은 불가)
@@ -154,10 +169,8 @@ def change_user_role(user_id: int, role: UserRole, db: Session = Depends(get_db)
         raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
     if current_user.id == user_id:
         raise HTTPException(status_code=403, detail="자기 자신의 권한은 변경할 수 없습니다.")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = update_returning(db, User, [User.id == user_id], {"role": role})
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-    user.role = role
     db.commit()
-    db.refresh(user)
     return user 
\ No newline at end of file
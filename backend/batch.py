@@ -0,0 +1,119 @@
+import asyncio
+import json
+from typing import List
+from urllib.parse import urlsplit
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from auth import get_current_user
+from config import settings
+from database import SessionLocal
+from models import User
+from schemas import BatchRequest, BatchRequestItem, BatchResponseItem
+
+router = APIRouter(tags=["batch"])
+
+"""
+배치 요청 API 라우터
+- 여러 API 호출을 한 번의 요청으로 묶어 동시에 실행하고 결과를 함께 반환
+- 하위 요청은 앱 내부(ASGI)로 바로 전달되므로 프록시/HTTP 왕복이 발생하지 않음
+"""
+
+# 하위 요청에 그대로 전달할 헤더
+FORWARDED_HEADERS = {b"authorization", b"cookie", b"accept-language", b"traceparent", b"tracestate"}
+
+
+def _resolve_batch_user(request: Request):
+    # 인증 헤더가 있으면 사용자 조회를 한 번만 수행하고 하위 요청에서 재사용
+    # (조회용 세션은 바로 닫아 하위 요청이 도는 동안 커넥션을 붙잡지 않고, 세션에 묶인 객체 대신 컬럼 값만 넘김)
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, None
+    with SessionLocal() as db:
+        try:
+            user = get_current_user(request, token=token, db=db)
+        except HTTPException:
+            # 인증 실패는 각 하위 요청이 개별적으로 401을 반환하도록 둔다
+            return None, None
+        return token, {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def _build_scope(request: Request, item: BatchRequestItem, body: bytes, state: dict) -> dict:
+    parts = urlsplit(item.path)
+    headers = [(k, v) for k, v in request.scope["headers"] if k in FORWARDED_HEADERS]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode()))
+    return {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method.upper(),
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+
+async def _dispatch(request: Request, item: BatchRequestItem, state: dict) -> BatchResponseItem:
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+    scope = _build_scope(request, item, body, state)
+    request_sent = False
+    status_code = 500
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # 응답이 끝날 때까지 연결이 유지된 것처럼 대기
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await request.app(scope, receive, send)
+    raw = b"".join(chunks)
+    try:
+        payload = json.loads(raw) if raw else None
+    except ValueError:
+        payload = raw.decode(errors="replace")
+    return BatchResponseItem(id=item.id, status=status_code, body=payload)
+
+
+# 배치 요청 실행
+@router.post("/batch", response_model=List[BatchResponseItem])
+async def run_batch(batch: BatchRequest, request: Request):
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {settings.BATCH_MAX_REQUESTS}개의 요청만 처리할 수 있습니다.")
+    for item in batch.requests:
+        if not item.path.startswith("/") or urlsplit(item.path).path.rstrip("/") == "/batch":
+            raise HTTPException(status_code=400, detail=f"허용되지 않는 경로입니다: {item.path}")
+
+    token, user = await run_in_threadpool(_resolve_batch_user, request)
+    # batch_sub: 수용 제어에서 하위 요청을 다시 대기열에 넣지 않도록 표시
+    state = dict(request.scope.get("state") or {}, batch_sub=True)
+    if user is not None:
+        state.update(batch_token=token, batch_user=user)
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def run(item: BatchRequestItem) -> BatchResponseItem:
+        async with semaphore:
+            try:
+                return await _dispatch(request, item, dict(state))
+            except Exception as exc:
+                return BatchResponseItem(id=item.id, status=500, body={"detail": str(exc)})
+
+    return await asyncio.gather(*(run(item) for item in batch.requests))
@@ -0,0 +1,86 @@
+import sys
+import timeit
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+from sqlalchemy.util import LRUCache
+from models import Client, Issue, IssueComment, IssueStatus, User, Work
+import statements
+
+"""
+캐시 문장(statements.py) 효과 측정용 마이크로 벤치마크 (DB 연결 없이 PostgreSQL 방언으로 컴파일까지만 측정)
+- before: 기존처럼 요청마다 db.query(...).filter(...)를 새로 만들고 캐시 키 계산 후 compiled cache 조회
+- after:  statements의 미리 만든 문장 + 파라미터로 compiled cache 조회
+- nocache: 컴파일 캐시 없이 매번 컴파일 (query_cache_size=0 과 같음)
+사용법: python bench_statements.py [반복 횟수]
+"""
+
+DIALECT = postgresql.psycopg.dialect()
+
+
+def _orm(query: Query):
+    return query.statement
+
+
+CASES = {
+    "get_current_user": (
+        lambda: _orm(Query(User).filter(User.email == "user@example.com")),
+        lambda: statements.user_by_email("user@example.com"),
+    ),
+    "get_client": (
+        lambda: _orm(Query(Client).filter(Client.id == 1)),
+        lambda: statements.client_by_id(1),
+    ),
+    "get_work": (
+        lambda: _orm(Query(Work).filter(Work.id == 1)),
+        lambda: statements.work_by_id(1),
+    ),
+    "get_issue": (
+        lambda: _orm(Query(Issue).filter(Issue.solution == "csd", Issue.id == 1)),
+        lambda: statements.issue_by_id("csd", 1),
+    ),
+    "list_works_by_solution": (
+        lambda: _orm(Query(Work).filter(Work.solution == "csd").filter(Work.date >= "2025-01-01").filter(Work.date <= "2025-12-31").order_by(Work.date.desc())),
+        lambda: statements.works_list("csd", "2025-01-01", "2025-12-31"),
+    ),
+    "list_issues": (
+        lambda: _orm(
+            Query(Issue)
+            .filter(Issue.solution == "csd", Issue.status == IssueStatus.waiting, Issue.tags.contains(["db"]),
+                    Issue.title.ilike("%lock%") | Issue.content.ilike("%lock%") | Issue.assignee.ilike("%lock%"))
+            .order_by(Issue.created_at.asc()).offset(0).limit(20)
+        ),
+        lambda: statements.issues_list("csd", IssueStatus.waiting, tags=["db"], search="lock"),
+    ),
+    "list_comments": (
+        lambda: _orm(Query(IssueComment).filter(IssueComment.issue_id == 1).order_by(IssueComment.created_at.asc())),
+        lambda: statements.comments_for_issue("dynatrace", 1),
+    ),
+}
+
+
+def _run(build, cache):
+    # Connection.execute가 내부에서 하는 것과 같은 경로 (캐시 키 계산 → compiled cache 조회 → 미스 시 컴파일)
+    stmt = build()
+    if isinstance(stmt, tuple):
+        stmt = stmt[0]
+    stmt._compile_w_cache(DIALECT, compiled_cache=cache, column_keys=[])
+
+
+def bench(number: int):
+    print(f"{'query':<24}{'nocache':>12}{'before':>12}{'after':>12}{'saved':>12}   (us/call)")
+    total_before = total_after = 0.0
+    for name, (before, after) in CASES.items():
+        cache = LRUCache(1200)
+        _run(before, cache)
+        _run(after, cache)
+        nocache_us = timeit.timeit(lambda: _run(before, None), number=number) / number * 1e6
+        before_us = timeit.timeit(lambda: _run(before, cache), number=number) / number * 1e6
+        after_us = timeit.timeit(lambda: _run(after, cache), number=number) / number * 1e6
+        total_before += before_us
+        total_after += after_us
+        print(f"{name:<24}{nocache_us:>12.1f}{before_us:>12.1f}{after_us:>12.1f}{before_us - after_us:>12.1f}")
+    print(f"{'total':<24}{'':>12}{total_before:>12.1f}{total_after:>12.1f}{total_before - total_after:>12.1f}")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
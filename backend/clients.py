@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-import models, schemas
+from typing import List, Optional
+from database import get_db, update_returning_changes, row_exists
+from auth import get_actor
+from audit import audit_log
+from singleflight import read_flight
+from suggest import client_names
+from overview import client_overview, client_overviews
+from knowledge import unindex
+from dedup import duplicate_index
+import models, schemas, statements
+import webhooks
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -13,15 +22,33 @@ router = APIRouter(prefix="/clients", tags=["clients"])
 
 @router.get("/", response_model=List[schemas.Client])
 def list_clients(db: Session = Depends(get_db)):
-    return db.query(models.Client).all()
+    return db.query(models.Client).filter(models.Client.deleted_at.is_(None)).all()
+
+# 고객사 이름 자동완성 (입력 중 호출, 이름만 몇 개 반환)
+@router.get("/suggest", response_model=List[str])
+def suggest_clients(q: str = Query(..., min_length=1), solution: Optional[str] = Query(None), limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    return client_names.suggest(db, q, solution, limit)
 
 @router.get("/{client_id}", response_model=schemas.Client)
 def get_client(client_id: int, db: Session = Depends(get_db)):
-    client = db.query(models.Client).filter(models.Client.id == client_id).first()
+    client = db.execute(*statements.client_by_id(client_id)).scalars().first()
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
 
+# 고객사 개요 (고객사 정보 + 작업/이슈 요약을 한 번의 쿼리로, 변경 전까지 캐시)
+@router.get("/{client_id}/overview", response_model=schemas.ClientOverview)
+def get_client_overview(
+    client_id: int,
+    recent: Optional[int] = Query(None, ge=1, le=50),
+    months: Optional[int] = Query(None, ge=1, le=36),
+    db: Session = Depends(get_db),
+):
+    overview = read_flight.do(("clients.get_client_overview", client_id, recent, months), lambda: client_overview(db, client_id, recent, months))
+    if overview is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return overview
+
 @router.post("/", response_model=schemas.Client)
 def create_client(client: schemas.ClientCreate, db: Session = Depends(get_db)):
     data = client.dict()
@@ -34,28 +61,79 @@ def create_client(client: schemas.ClientCreate, db: Session = Depends(get_db)):
     db.add(db_client)
     db.commit()
     db.refresh(db_client)
+    client_names.add(db_client.id, db_client.name, db_client.solution)
     return db_client
 
 @router.put("/{client_id}", response_model=schemas.Client)
-def update_client(client_id: int, client: schemas.ClientUpdate, db: Session = Depends(get_db)):
-    db_client = db.query(models.Client).filter(models.Client.id == client_id).first()
+@router.patch("/{client_id}", response_model=schemas.Client)
+def update_client(client_id: int, client: schemas.ClientUpdate, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    data = client.dict(exclude_unset=True)
+    version = data.pop("version", None)
+    conditions = [models.Client.id == client_id, models.Client.deleted_at.is_(None)]
+    db_client, changes = update_returning_changes(db, models.Client, conditions, data, version)
     if not db_client:
+        if version is not None and row_exists(db, models.Client, conditions):
+            raise HTTPException(status_code=409, detail="다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.")
         raise HTTPException(status_code=404, detail="Client not found")
-    for key, value in client.dict().items():
-        setattr(db_client, key, value)
     db.commit()
-    db.refresh(db_client)
+    audit_log.record("client", client_id, changes, actor=actor, solution=db_client["solution"])
+    client_overviews.invalidate(client_id)
+    if "name" in changes or "solution" in changes:
+        client_names.add(client_id, db_client["name"], db_client["solution"])
     return db_client
 
+# 고객사와 그 이슈/댓글에 같은 시각으로 삭제 표시 (한 문장, 반환: 고객사 솔루션, 이슈 id 목록, 댓글 id 목록)
+def _soft_delete_client(db: Session, client_id: int):
+    Client, Issue, IssueComment = models.Client, models.Issue, models.IssueComment
+    client = (
+        update(Client.__table__)
+        .where(Client.id == client_id, Client.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Client.name, Client.solution)
+        .cte("deleted_client")
+    )
+    issues = (
+        update(Issue.__table__)
+        .where(tuple_(Issue.client, Issue.solution).in_(select(client.c.name, client.c.solution)), Issue.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Issue.id, Issue.solution)
+        .cte("deleted_issues")
+    )
+    comments = (
+        update(IssueComment.__table__)
+        .where(tuple_(IssueComment.issue_id, IssueComment.solution).in_(select(issues.c.id, issues.c.solution)), IssueComment.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(IssueComment.id)
+        .cte("deleted_comments")
+    )
+    return db.execute(select(
+        select(client.c.solution).scalar_subquery(),
+        select(func.count()).select_from(client).scalar_subquery(),
+        select(func.coalesce(func.array_agg(issues.c.id), [])).scalar_subquery(),
+        select(func.coalesce(func.array_agg(comments.c.id), [])).scalar_subquery(),
+    )).one()
+
+# 고객사 삭제 (고객사와 이슈/댓글은 삭제 표시만 하고, 보관 기간이 지나면 purge 작업이 삭제 전 작업내역과 함께 실제 삭제)
 @router.delete("/{client_id}")
-def delete_client(client_id: int, db: Session = Depends(get_db)):
-    db_client = db.query(models.Client).filter(models.Client.id == client_id).first()
-    if not db_client:
+def delete_client(client_id: int, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    solution, deleted, ids, comment_ids = _soft_delete_client(db, client_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Client not found")
-    db.delete(db_client)
+    if ids:
+        webhooks.enqueue(db, solution, "issue.bulk_deleted", {"solution": solution, "ids": ids, "comments_deleted": len(comment_ids), "actor": actor})
     db.commit()
-    return {"ok": True} 
+    for issue_id in ids:
+        unindex("issue", issue_id)
+        duplicate_index.remove(solution, issue_id)
+    for comment_id in comment_ids:
+        unindex("comment", comment_id)
+    client_names.remove(client_id)
+    client_overviews.invalidate(client_id)
+    return {"ok": True}
 
 @router.get("/solution/{solution}", response_model=List[schemas.Client])
 def list_clients_by_solution(solution: str, db: Session = Depends(get_db)):
-    return db.query(models.Client).filter(models.Client.solution == solution).all() 
\ No newline at end of file
+    # 동일 조건의 동시 요청은 한 번의 쿼리 결과를 공유
+    def query():
+        return [schemas.Client.model_validate(c) for c in db.execute(*statements.clients_by_solution(solution)).scalars()]
+    return read_flight.do(("clients.list_clients_by_solution", solution), query) 
\ No newline at end of file
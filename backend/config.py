@@ -1,3 +1,5 @@
+from typing import Optional
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,7 +9,189 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
 
+    # 배치 요청(/batch) 설정
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 8
+
+    # works 파티션/아카이브 설정
+    WORKS_PARTITION_MONTHS_AHEAD: int = 3
+    WORKS_RETENTION_MONTHS: int = 36
+    WORKS_ARCHIVE_DIR: str = "archive/works"
+
+    # issues 솔루션별 파티션 설정 (새 솔루션 파티션 생성 시 잠금 대기 한도)
+    ISSUE_PARTITION_LOCK_TIMEOUT_MS: int = 2000
+
+    # 지식 검색 인덱스 설정 (KNOWLEDGE_EMBEDDING_DIM=0 이면 BM25만 사용)
+    KNOWLEDGE_INDEX_DIR: str = "data/knowledge"
+    KNOWLEDGE_EMBEDDING_DIM: int = 256
+    KNOWLEDGE_EMBEDDING_WEIGHT: float = 0.3
+    KNOWLEDGE_SAVE_EVERY: int = 200
+    # 워커마다 다른 워커의 변경 반영/세그먼트 기록 주기 (초, 0이거나 JOBS_ENABLED=false인 워커는 KNOWLEDGE_SAVE_EVERY 건마다만)
+    KNOWLEDGE_REFRESH_INTERVAL: int = 60
+
+    # 이슈 중복 탐지 설정
+    DEDUP_THRESHOLD: float = 0.5
+    DEDUP_INDEX_TTL: int = 600
+
+    # 고객사 이름 자동완성 설정 (고객사 수가 CLIENT_SUGGEST_MAX_NAMES를 넘으면 pg_trgm 인덱스로 조회)
+    CLIENT_SUGGEST_TTL: int = 300
+    CLIENT_SUGGEST_MAX_NAMES: int = 100000
+
+    # 고객사 개요(/clients/{id}/overview) 캐시 설정 (다른 워커에서의 변경은 CLIENT_OVERVIEW_TTL초 안에 반영)
+    CLIENT_OVERVIEW_TTL: int = 300
+    CLIENT_OVERVIEW_CACHE_SIZE: int = 1024
+    CLIENT_OVERVIEW_MONTHS: int = 12
+    CLIENT_OVERVIEW_RECENT_WORKS: int = 10
+
+    # 이슈 이벤트 웹훅 발송 설정 (WEBHOOK_POLL_INTERVAL초마다 outbox 확인, 0이면 발송 끔)
+    WEBHOOK_POLL_INTERVAL: float = 2.0
+    WEBHOOK_CLAIM_SIZE: int = 200
+    WEBHOOK_LEASE: int = 60
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_MAX_CONCURRENCY: int = 20
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_BACKOFF_BASE: float = 5.0
+    WEBHOOK_BACKOFF_MAX: float = 60 * 60
+    WEBHOOK_PURGE_INTERVAL: int = 60 * 60
+    WEBHOOK_RETENTION_DAYS: int = 7
+
+    # 소프트 삭제 정리 설정 (PURGE_INTERVAL초마다 PURGE_RETENTION_DAYS가 지난 삭제 표시 행을 PURGE_BATCH_SIZE건씩 삭제, 0이면 끔)
+    PURGE_INTERVAL: int = 60 * 60
+    PURGE_RETENTION_DAYS: float = 30
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_MAX_BATCHES: int = 200
+    PURGE_BATCH_PAUSE: float = 0.2
+    PURGE_LOCK_TIMEOUT_MS: int = 2000
+
+    # 첨부파일 저장소 설정
+    ATTACHMENT_STORE: str = "local"
+    ATTACHMENTS_DIR: str = "data/attachments"
+    ATTACHMENT_MAX_SIZE: int = 200 * 1024 * 1024
+
+    # Idempotency-Key 응답 보관 설정
+    IDEMPOTENCY_TTL: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 1024
+    # 처리 중 워커가 죽어 응답이 저장되지 않은 키를 재시도가 넘겨받기까지의 시간(초)
+    IDEMPOTENCY_CLAIM_LEASE: int = 120
+
+    # 변경 이력 기록 설정 (AUDIT_FLUSH_INTERVAL초마다 또는 AUDIT_FLUSH_SIZE건이 쌓이면 저장)
+    AUDIT_FLUSH_INTERVAL: float = 2.0
+    AUDIT_FLUSH_SIZE: int = 500
+    AUDIT_SPOOL_DIR: str = "data/audit"
+
+    # 주간 리포트 스냅샷 설정 (REPORT_SNAPSHOT_INTERVAL초마다 최근 REPORT_LOOKBACK_WEEKS개 주차 확인, 0이면 끔)
+    REPORTS_DIR: str = "data/reports"
+    REPORT_SNAPSHOT_INTERVAL: int = 60 * 60
+    REPORT_LOOKBACK_WEEKS: int = 4
+    REPORT_EXPIRY_DAYS: int = 30
+    REPORT_KEEP_REVISIONS: int = 3
+
+    # 마이그레이션 설정 (잠금 대기 한도, migrations/online.py의 backfill 배치 크기/쉬는 시간)
+    MIGRATION_LOCK_TIMEOUT_MS: int = 5000
+    MIGRATION_LOCK_RETRIES: int = 5
+    MIGRATION_BACKFILL_BATCH: int = 5000
+    MIGRATION_BACKFILL_PAUSE: float = 0.1
+    MIGRATION_BACKFILL_MAX_BATCH_SECONDS: float = 1.0
+
+    # 커넥션 풀 설정
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # 헬스체크 설정 (/readyz가 503을 반환하는 한도, 0이면 해당 검사 끔)
+    READY_DB_TIMEOUT: float = 2.0
+    READY_DB_CHECK_TTL: float = 1.0
+    READY_MAX_POOL_WAIT_MS: float = 250
+    READY_MAX_LOOP_LAG_MS: float = 250
+    READY_MAX_IN_FLIGHT: int = 96
+    READY_LOOP_LAG_INTERVAL: float = 0.5
+    # SIGTERM 후 종료 전까지 /readyz를 503으로 두고 요청을 계속 처리하는 시간 (로드밸런서 probe 주기 x 실패 횟수 이상, 0이면 바로 종료)
+    READY_DRAIN_SECONDS: float = 0
+
+    # 앱 기동 설정 (APP_ROUTERS: 불러올 라우터 이름, 쉼표 구분, 비우면 전체 / APP_WARMUP: 기동 시 풀·캐시 예열)
+    APP_ROUTERS: str = ""
+    APP_WARMUP: bool = True
+
+    # 백그라운드 주기 작업 설정 (여러 워커/인스턴스 중 하나에서만 켜기, 주기 0이면 해당 작업 끔)
+    JOBS_ENABLED: bool = True
+    WORKS_PARTITION_MAINTAIN_INTERVAL: int = 0
+    ISSUE_PARTITION_MAINTAIN_INTERVAL: int = 0
+
+    # 마감 리마인더 다이제스트 설정 (REMINDER_NOTIFIER: log / smtp, 주기 0이면 끔)
+    # 각 워커가 REMINDER_CHECK_INTERVAL마다 확인하고, 전체 워커 중 한 곳만 REMINDER_DIGEST_INTERVAL마다 발송
+    REMINDER_DIGEST_INTERVAL: int = 24 * 60 * 60
+    REMINDER_CHECK_INTERVAL: int = 10 * 60
+    REMINDER_DUE_SOON_DAYS: float = 2
+    REMINDER_MAX_ITEMS: int = 50
+    REMINDER_NOTIFIER: str = "log"
+    REMINDER_OUTBOX_DIR: str = "data/outbox"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = False
+    MAIL_FROM: str = "csd-portal@localhost"
+
+    # SQL 문장 캐시 설정 (DB_PREPARE_THRESHOLD: 같은 문장이 몇 번 실행되면 prepare할지, 비우면 사용 안 함)
+    # 서버 측 prepare는 DB_DRIVER=psycopg(psycopg 3 설치 필요)일 때만 동작, 기본 psycopg2는 compiled cache만 사용
+    DB_DRIVER: str = "psycopg2"
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARE_THRESHOLD: Optional[int] = 2
+
+    # 요청 수용 제어 설정 (등급별 동시 실행 수/대기열 길이, 경로별 한도는 JSON {"GET /works/": [4, 8]})
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INTERACTIVE_CONCURRENCY: int = 64
+    ADMISSION_INTERACTIVE_QUEUE: int = 128
+    ADMISSION_BULK_CONCURRENCY: int = 4
+    ADMISSION_BULK_QUEUE: int = 8
+    ADMISSION_AUTH_CONCURRENCY: int = 4
+    ADMISSION_AUTH_QUEUE: int = 16
+    ADMISSION_ROUTE_LIMITS: str = "{}"
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0
+    ADMISSION_RETRY_AFTER: int = 2
+
+    # 요청 프로파일링 설정 (PROFILE_TRACEMALLOC_FRAMES > 0 이면 시작 시 tracemalloc 켜기)
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL: float = 0.005
+    PROFILE_DIR: str = "data/profiles"
+    PROFILE_KEEP: int = 200
+    PROFILE_TRACEMALLOC_FRAMES: int = 0
+
+    # 분산 트레이싱 설정 (TRACING_EXPORTER: otlp / file / console / none)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = ""
+    TRACING_FILE: str = "data/traces.jsonl"
+    TRACING_SERVICE_NAME: str = "csd-portal-backend"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
+    @field_validator("DB_PREPARE_THRESHOLD", mode="before")
+    @classmethod
+    def _empty_as_none(cls, value):
+        # .env에 DB_PREPARE_THRESHOLD= 처럼 비워 두면 None (prepare 끔)
+        return None if value == "" else value
+
     class Config:
         env_file = ".env"
 
-settings = Settings() 
\ No newline at end of file
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+# create_app(settings)에서 라우터를 불러오기 전에 호출해 설정을 교체
+def configure(new_settings: Settings) -> Settings:
+    global _settings
+    _settings = new_settings
+    return _settings
+
+
+# `from config import settings`는 처음 접근하는 시점에 Settings()를 만든다 (import만으로는 .env를 읽지 않음)
+def __getattr__(name: str):
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,20 +1,130 @@
-from sqlalchemy import create_engine
+from typing import List, Optional, Tuple
+from sqlalchemy import create_engine, delete, func, literal, select, update
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from config import settings
+from sqlalchemy.orm import Session, sessionmaker
+from config import get_settings
+from tracing import span
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+_engine: Optional[Engine] = None
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def database_url() -> str:
+    settings = get_settings()
+    return f"postgresql+{settings.DB_DRIVER}://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+
+# 엔진은 처음 사용할 때 생성 (import만으로는 설정을 읽거나 풀을 만들지 않음)
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        url = database_url()
+        # 컴파일된 문장 캐시 크기 조정, DB_DRIVER=psycopg(psycopg 3)면 반복 실행되는 문장을 서버 측 prepared statement로 전환
+        # (psycopg2는 prepare를 지원하지 않음, PgBouncer transaction pooling 뒤에서는 DB_PREPARE_THRESHOLD를 비워 꺼야 함)
+        connect_args = {}
+        if make_url(url).get_dialect().driver == "psycopg":
+            connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD
+        _engine = create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+            connect_args=connect_args,
+        )
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+# 풀의 연결만 닫음 (엔진과 트레이싱 계측은 그대로 두어, 같은 앱이 다시 기동되면 새 연결로 계속 사용)
+def dispose_engine():
+    if _engine is not None:
+        _engine.dispose()
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw) -> Session:
+        get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+
+# 기존 코드의 `from database import engine` 호환
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    if name == "SQLALCHEMY_DATABASE_URL":
+        return database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
 
 # API 엔드포인트에서 데이터베이스 세션을 얻기 위한 의존성 함수
 def get_db():
-    db = SessionLocal()
+    with span("get_db"):
+        db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        with span("get_db.close"):
+            db.close()
+
+# 단일 UPDATE ... RETURNING 으로 전달된 필드만 수정 (SELECT/refresh 왕복 없음)
+# version 컬럼이 있으면 1 증가시키고, expected_version이 주어지면 낙관적 동시성 검사
+def update_returning(db: Session, model, conditions: list, values: dict, expected_version: Optional[int] = None) -> Optional[dict]:
+    table = model.__table__
+    stmt = update(table).where(*conditions)
+    if "version" in table.c:
+        if expected_version is not None:
+            stmt = stmt.where(table.c.version == expected_version)
+        values = {**values, "version": table.c.version + 1}
+    row = db.execute(stmt.values(**values).returning(*table.c)).mappings().first()
+    return dict(row) if row else None
+
+# update_returning과 같지만 수정 전 값도 같은 문장에서 받아 실제로 바뀐 필드만 {필드: (이전, 이후)}로 반환
+# UPDATE ... FROM (SELECT ... FOR UPDATE) old ... RETURNING old.* 형태라 추가 왕복 없음 (변경 이력 기록용)
+def update_returning_changes(db: Session, model, conditions: list, values: dict, expected_version: Optional[int] = None) -> Tuple[Optional[dict], dict]:
+    rows = update_many_returning_changes(db, model, conditions, values, expected_version)
+    return rows[0] if rows else (None, {})
+
+# 조건에 맞는 모든 행을 한 문장으로 수정하고 행마다 (수정 후 행, 변경 필드) 반환
+def update_many_returning_changes(db: Session, model, conditions: list, values: dict, expected_version: Optional[int] = None) -> List[Tuple[dict, dict]]:
+    table = model.__table__
+    pk = list(table.primary_key.columns)
+    fields = [name for name in values if name != "version"]
+    old = select(*pk, *[table.c[name] for name in fields if table.c[name] not in pk]).where(*conditions).with_for_update().subquery("old")
+    stmt = update(table).where(*[column == old.c[column.name] for column in pk])
+    if "version" in table.c:
+        if expected_version is not None:
+            stmt = stmt.where(table.c.version == expected_version)
+        values = {**values, "version": table.c.version + 1}
+    previous = [old.c[name].label(f"_previous_{name}") for name in fields]
+    results = []
+    for row in db.execute(stmt.values(**values).returning(*table.c, *previous)).mappings():
+        row = dict(row)
+        before = {name: row.pop(f"_previous_{name}") for name in fields}
+        results.append((row, {name: (before[name], row[name]) for name in fields if before[name] != row[name]}))
+    return results
+
+# 단일 DELETE ... RETURNING, 삭제된 행의 id 반환
+def delete_returning(db: Session, model, conditions: list) -> Optional[int]:
+    table = model.__table__
+    return db.execute(delete(table).where(*conditions).returning(table.c.id)).scalar()
+
+# delete_returning과 같지만 삭제된 행 전체를 반환 (삭제 후 처리에 다른 컬럼이 필요할 때)
+def delete_returning_row(db: Session, model, conditions: list) -> Optional[dict]:
+    table = model.__table__
+    row = db.execute(delete(table).where(*conditions).returning(*table.c)).mappings().first()
+    return dict(row) if row else None
+
+# 소프트 삭제: deleted_at만 채우는 단일 UPDATE ... RETURNING, 삭제 표시된 행의 id 반환 (이미 삭제된 행은 제외)
+def soft_delete_returning(db: Session, model, conditions: list) -> Optional[int]:
+    table = model.__table__
+    stmt = update(table).where(*conditions, table.c.deleted_at.is_(None)).values(deleted_at=func.now())
+    return db.execute(stmt.returning(table.c.id)).scalar()
+
+# 수정/삭제 실패 시 404(없음)와 409/403(조건 불일치)을 구분하기 위한 존재 확인
+def row_exists(db: Session, model, conditions: list) -> bool:
+    return db.execute(select(literal(1)).select_from(model.__table__).where(*conditions)).first() is not None
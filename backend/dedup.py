@@ -0,0 +1,190 @@
+import logging
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import Issue
+
+"""
+이슈 중복 탐지 (MinHash/LSH)
+- solution별로 이슈 제목+내용의 문자 3-gram MinHash 서명을 LSH 밴드 버킷에 색인
+- 후보는 버킷 충돌로만 찾고(전체 비교 없음), 서명 일치율로 유사도(Jaccard 추정) 계산
+- 이슈 등록/수정/삭제 시 갱신, 처음 조회하거나 DEDUP_INDEX_TTL이 지나면 테이블에서 재구축
+  (처음 한 번만 요청 안에서 만들고 동시 요청은 그 결과를 기다림, TTL 재구축은 기존 인덱스로 응답하면서 백그라운드에서)
+- 재구축 중에 들어온 add/remove는 기록해 두었다가 새 인덱스로 바꾸기 직전에 다시 적용
+"""
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 31) - 1
+NORMALIZE_RE = re.compile(r"[\W_]+")
+
+_rng = np.random.default_rng(20250801)
+_PERM_A = _rng.integers(1, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str) -> Set[str]:
+    normalized = NORMALIZE_RE.sub("", (text or "").lower())
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    grams = shingles(text)
+    if not grams:
+        return None
+    # 31비트 해시 * 31비트 계수이므로 uint64 곱셈에서 넘치지 않음
+    hashes = np.fromiter((zlib.crc32(g.encode()) & MERSENNE_PRIME for g in grams), dtype=np.uint64, count=len(grams))
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % MERSENNE_PRIME).min(axis=0)
+
+
+def _bands(sig: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [(b, sig[b * ROWS:(b + 1) * ROWS].tobytes()) for b in range(BANDS)]
+
+
+def _issue_text(title: str, content: Optional[str]) -> str:
+    return f"{title or ''} {content or ''}"
+
+
+class _SolutionIndex:
+    def __init__(self):
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.titles: Dict[int, str] = {}
+        self.buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self.built_at = time.monotonic()
+
+    def add(self, issue_id: int, title: str, sig: Optional[np.ndarray]):
+        self.remove(issue_id)
+        if sig is None:
+            return
+        self.signatures[issue_id] = sig
+        self.titles[issue_id] = title
+        for band in _bands(sig):
+            self.buckets.setdefault(band, set()).add(issue_id)
+
+    def remove(self, issue_id: int):
+        sig = self.signatures.pop(issue_id, None)
+        self.titles.pop(issue_id, None)
+        if sig is None:
+            return
+        for band in _bands(sig):
+            bucket = self.buckets.get(band)
+            if bucket is not None:
+                bucket.discard(issue_id)
+                if not bucket:
+                    del self.buckets[band]
+
+    def query(self, sig: np.ndarray, threshold: float, limit: int, exclude: Optional[int]) -> List[dict]:
+        candidates: Set[int] = set()
+        for band in _bands(sig):
+            candidates |= self.buckets.get(band, set())
+        candidates.discard(exclude)
+        scored = []
+        for issue_id in candidates:
+            score = float(np.mean(self.signatures[issue_id] == sig))
+            if score >= threshold:
+                scored.append({"id": issue_id, "title": self.titles[issue_id], "score": round(score, 3)})
+        scored.sort(key=lambda x: x["score"], reverse=True)
+        return scored[:limit]
+
+
+class DuplicateIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._solutions: Dict[str, _SolutionIndex] = {}
+        # 재구축 중인 solution -> (그동안 들어온 변경 기록, 완료 이벤트)
+        self._building: Dict[str, Tuple[List[tuple], threading.Event]] = {}
+
+    def _claim(self, solution: str) -> Tuple[bool, Tuple[List[tuple], threading.Event]]:
+        # self._lock을 잡은 상태에서 호출, 이미 재구축 중이면 그 항목을 돌려줌
+        building = self._building.get(solution)
+        if building is not None:
+            return False, building
+        building = self._building[solution] = ([], threading.Event())
+        return True, building
+
+    def _build(self, db: Session, solution: str, building: Tuple[List[tuple], threading.Event]) -> _SolutionIndex:
+        changes, done = building
+        try:
+            index = _SolutionIndex()
+            rows = db.query(Issue.id, Issue.title, Issue.content).filter(Issue.solution == solution, Issue.deleted_at.is_(None)).yield_per(1000)
+            for issue_id, title, content in rows:
+                index.add(issue_id, title, signature(_issue_text(title, content)))
+            with self._lock:
+                for method, args in changes:
+                    getattr(index, method)(*args)
+                self._solutions[solution] = index
+            return index
+        finally:
+            with self._lock:
+                del self._building[solution]
+            done.set()
+
+    def _build_in_background(self, solution: str, building: Tuple[List[tuple], threading.Event]):
+        try:
+            with SessionLocal() as db:
+                self._build(db, solution, building)
+        except Exception:
+            logger.warning("duplicate index rebuild failed: %s", solution, exc_info=True)
+
+    def rebuild(self, db: Session, solution: str) -> _SolutionIndex:
+        with self._lock:
+            owner, building = self._claim(solution)
+        if owner:
+            return self._build(db, solution, building)
+        # 다른 스레드가 재구축 중이면 그 결과를 사용
+        building[1].wait()
+        with self._lock:
+            return self._solutions.get(solution) or _SolutionIndex()
+
+    def _get(self, db: Session, solution: str) -> _SolutionIndex:
+        with self._lock:
+            index = self._solutions.get(solution)
+            # 다른 워커에서의 변경을 반영하기 위해 TTL이 지나면 백그라운드에서 재구축 (그동안은 기존 인덱스 사용)
+            if index is not None and time.monotonic() - index.built_at > settings.DEDUP_INDEX_TTL:
+                owner, building = self._claim(solution)
+                if owner:
+                    threading.Thread(target=self._build_in_background, args=(solution, building), daemon=True).start()
+        if index is None:
+            index = self.rebuild(db, solution)
+        return index
+
+    def similar(self, db: Session, solution: str, text: str, threshold: float = None, limit: int = 5, exclude: Optional[int] = None) -> List[dict]:
+        sig = signature(text)
+        if sig is None:
+            return []
+        index = self._get(db, solution)
+        threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+        with self._lock:
+            return index.query(sig, threshold, limit, exclude)
+
+    def add(self, solution: str, issue_id: int, title: str, content: Optional[str]):
+        sig = signature(_issue_text(title, content))
+        with self._lock:
+            index = self._solutions.get(solution)
+            if index is not None:
+                index.add(issue_id, title, sig)
+            if solution in self._building:
+                self._building[solution][0].append(("add", (issue_id, title, sig)))
+
+    def remove(self, solution: str, issue_id: int):
+        with self._lock:
+            index = self._solutions.get(solution)
+            if index is not None:
+                index.remove(issue_id)
+            if solution in self._building:
+                self._building[solution][0].append(("remove", (issue_id,)))
+
+
+duplicate_index = DuplicateIndex()
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config import settings
+from database import get_engine
+
+router = APIRouter(tags=["health"])
+
+"""
+로드밸런서용 헬스체크 (인증 없음, 수용 제어 대상 아님)
+- GET /healthz: 프로세스가 응답하는지만 확인 (DB를 보지 않으므로 DB 장애 때 워커가 재시작되지 않음)
+- GET /readyz: DB 연결 여부, 풀 체크아웃 대기, 이벤트 루프 지연, 처리 중 요청 수를 READY_* 한도와 비교해 넘으면 503
+  (로드밸런서가 과부하 워커를 빼서 꼬리 지연이 커지기 전에 다른 워커로 보내도록 함, 한도 0이면 그 검사는 끔)
+- DB 검사는 READY_DB_CHECK_TTL초 동안 결과를 재사용하고, 동시에 들어온 probe는 한 번의 검사를 공유
+- 풀이 이미 다 나가 있으면 체크아웃을 기다리지 않고 바로 실패
+- SIGTERM을 받은 워커는 READY_DRAIN_SECONDS 동안 요청은 계속 처리하면서 503(draining)을 반환해 로드밸런서가 먼저 빼도록 함
+"""
+
+PROBE_PATHS = ("/healthz", "/readyz")
+# 이벤트 루프 지연은 최근 샘플 중 최댓값으로 판단 (READY_LOOP_LAG_INTERVAL초 간격)
+LOOP_LAG_SAMPLES = 10
+
+
+class HealthMonitor:
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self.loop_lag: Deque[float] = deque(maxlen=LOOP_LAG_SAMPLES)
+        self._db_checked = 0.0
+        self._db_result: Optional[dict] = None
+        self._db_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def db_lock(self) -> asyncio.Lock:
+        if self._db_lock is None:
+            self._db_lock = asyncio.Lock()
+        return self._db_lock
+
+    async def watch_loop(self, interval: float):
+        # 정해진 시간만큼 잠든 뒤 늦게 깨어난 만큼이 루프 지연 (동기 작업이 루프를 붙잡고 있던 시간)
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(loop.time() - started - interval, 0.0))
+
+    def _check_db(self) -> dict:
+        engine = get_engine()
+        pool = engine.pool
+        result = {"checked_out": pool.checkedout(), "limit": settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW}
+        if result["checked_out"] >= result["limit"]:
+            return {**result, "ok": False, "error": "pool exhausted"}
+        try:
+            started = time.perf_counter()
+            with engine.connect() as conn:
+                checked_out = time.perf_counter()
+                conn.execute(text("SELECT 1"))
+            finished = time.perf_counter()
+        except Exception as exc:
+            return {**result, "ok": False, "error": type(exc).__name__}
+        return {
+            **result,
+            "ok": True,
+            "checkout_ms": round((checked_out - started) * 1000, 1),
+            "query_ms": round((finished - checked_out) * 1000, 1),
+        }
+
+    def _db_fresh(self) -> bool:
+        return self._db_result is not None and time.monotonic() - self._db_checked < settings.READY_DB_CHECK_TTL
+
+    async def check_db(self) -> dict:
+        if self._db_fresh():
+            return self._db_result
+        async with self.db_lock:
+            if not self._db_fresh():
+                try:
+                    result = await asyncio.wait_for(run_in_threadpool(self._check_db), settings.READY_DB_TIMEOUT)
+                except asyncio.TimeoutError:
+                    result = {"ok": False, "error": "timeout"}
+                self._db_result, self._db_checked = result, time.monotonic()
+        return self._db_result
+
+    async def readiness(self) -> dict:
+        failed = []
+        db = await self.check_db()
+        if not db["ok"]:
+            failed.append("db")
+        elif settings.READY_MAX_POOL_WAIT_MS and db["checkout_ms"] > settings.READY_MAX_POOL_WAIT_MS:
+            failed.append("pool_wait")
+        loop_lag_ms = max(self.loop_lag, default=0.0) * 1000
+        if settings.READY_MAX_LOOP_LAG_MS and loop_lag_ms > settings.READY_MAX_LOOP_LAG_MS:
+            failed.append("loop_lag")
+        if settings.READY_MAX_IN_FLIGHT and self.in_flight > settings.READY_MAX_IN_FLIGHT:
+            failed.append("in_flight")
+        if self.draining:
+            failed.append("draining")
+        return {
+            "status": "not_ready" if failed else "ready",
+            "failed": failed,
+            "checks": {"db": db, "loop_lag_ms": round(loop_lag_ms, 1), "in_flight": self.in_flight},
+        }
+
+
+health_monitor = HealthMonitor()
+
+
+class InFlightMiddleware:
+    """처리 중인 요청 수 집계 (수용 제어 대기열에 있는 요청 포함, probe와 배치 하위 요청 제외)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in PROBE_PATHS or (scope.get("state") or {}).get("batch_sub"):
+            await self.app(scope, receive, send)
+            return
+        health_monitor.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            health_monitor.in_flight -= 1
+
+
+# 생존 확인 (스레드풀이 가득 차도 응답하도록 이벤트 루프에서 바로 처리)
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# 요청 수용 가능 여부 (과부하/DB 불가/종료 중이면 503)
+@router.get("/readyz")
+async def readyz():
+    result = await health_monitor.readiness()
+    return JSONResponse(result, status_code=503 if result["failed"] else 200)
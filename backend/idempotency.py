@@ -0,0 +1,188 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from config import get_settings
+from database import SessionLocal
+from models import IdempotencyKey
+
+"""
+Idempotency-Key 처리 미들웨어
+- POST 요청에 Idempotency-Key 헤더가 있으면 첫 응답을 저장하고, 같은 키로 다시 오면 저장된 응답을 그대로 반환
+- 키는 인증 주체 + 경로 + 키 값으로 구분, 요청 본문이 다르면 422
+- 처리 중인 키로 다시 오면 409, 5xx 응답은 저장하지 않아 재시도 시 다시 실행
+- 처리 중에 워커가 죽어 응답 없이 IDEMPOTENCY_CLAIM_LEASE가 지난 키는 같은 요청의 재시도가 넘겨받아 다시 실행
+  (응답 저장/선점 해제는 자기가 선점한 claimed_at일 때만, 넘겨받힌 뒤 늦게 끝난 원래 요청은 새 선점을 건드리지 않음)
+- 최근 응답은 프로세스 내 LRU에, 전체는 idempotency_keys 테이블에 IDEMPOTENCY_TTL 동안 보관
+"""
+
+MAX_KEY_LENGTH = 255
+PURGE_INTERVAL = 600
+
+
+class _ResponseCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, IdempotencyKey]]" = OrderedDict()
+
+    def get(self, record_id: str) -> Optional[IdempotencyKey]:
+        with self._lock:
+            item = self._items.get(record_id)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._items[record_id]
+                return None
+            self._items.move_to_end(record_id)
+            return item[1]
+
+    def put(self, record: IdempotencyKey):
+        with self._lock:
+            self._items[record.id] = (record.expires_at.timestamp(), record)
+            self._items.move_to_end(record.id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+_last_purge = 0.0
+
+
+def _claim(record_id: str, request_hash: str) -> Tuple[Optional[IdempotencyKey], Optional[datetime]]:
+    """키를 선점하면 (None, 선점한 claimed_at), 이미 있으면 (기존 레코드, None) 반환"""
+    global _last_purge
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        if time.monotonic() - _last_purge > PURGE_INTERVAL:
+            _last_purge = time.monotonic()
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+        claimed = db.execute(
+            insert(IdempotencyKey)
+            .values(
+                id=record_id, request_hash=request_hash, claimed_at=now,
+                expires_at=now + timedelta(seconds=get_settings().IDEMPOTENCY_TTL),
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(IdempotencyKey.id)
+        ).scalar()
+        db.commit()
+        if claimed:
+            return None, now
+        existing = db.execute(select(IdempotencyKey).where(IdempotencyKey.id == record_id)).scalar_one_or_none()
+        if existing is not None and existing.expires_at < now:
+            # 만료된 키는 지우고 다시 선점
+            db.delete(existing)
+            db.commit()
+            return _claim(record_id, request_hash)
+        if _is_stale(existing, request_hash, now):
+            # 응답 없이 lease가 지난 선점은 넘겨받음 (claimed_at이 그대로일 때만 바꿔서 한 요청만 성공)
+            taken = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.id == record_id,
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.claimed_at.is_not_distinct_from(existing.claimed_at),
+                )
+                .values(claimed_at=now)
+                .returning(IdempotencyKey.id)
+            ).scalar()
+            db.commit()
+            if taken:
+                return None, now
+            return _claim(record_id, request_hash)
+        if existing is not None:
+            db.expunge(existing)
+        return existing, None
+
+
+def _is_stale(record: Optional[IdempotencyKey], request_hash: str, now: datetime) -> bool:
+    if record is None or record.status_code is not None or record.request_hash != request_hash:
+        return False
+    # claimed_at이 없는 행(컬럼 추가 전 선점)은 created_at 기준
+    claimed_at = record.claimed_at or record.created_at
+    return claimed_at is not None and claimed_at < now - timedelta(seconds=get_settings().IDEMPOTENCY_CLAIM_LEASE)
+
+
+def _owned(record_id: str, claimed_at: datetime) -> list:
+    # 선점 이후 다른 요청이 넘겨받았으면(claimed_at이 바뀜) 조건에 맞지 않음
+    return [IdempotencyKey.id == record_id, IdempotencyKey.claimed_at == claimed_at, IdempotencyKey.status_code.is_(None)]
+
+
+def _store(record_id: str, claimed_at: datetime, status_code: int, content_type: Optional[str], body: bytes) -> Optional[IdempotencyKey]:
+    with SessionLocal() as db:
+        record = db.execute(
+            update(IdempotencyKey)
+            .where(*_owned(record_id, claimed_at))
+            .values(status_code=status_code, content_type=content_type, response_body=body)
+            .returning(IdempotencyKey)
+        ).scalar_one_or_none()
+        if record is not None:
+            db.expunge(record)
+        db.commit()
+        return record
+
+
+def _release(record_id: str, claimed_at: datetime):
+    with SessionLocal() as db:
+        db.execute(delete(IdempotencyKey).where(*_owned(record_id, claimed_at)))
+        db.commit()
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    headers = {"Idempotent-Replayed": "true"}
+    return Response(content=record.response_body, status_code=record.status_code, media_type=record.content_type, headers=headers)
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        # 앱마다 만들어지므로 create_app(settings)로 넘긴 IDEMPOTENCY_CACHE_SIZE를 따름
+        self.cache = _ResponseCache(get_settings().IDEMPOTENCY_CACHE_SIZE)
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get("idempotency-key")
+        if request.method != "POST" or not key:
+            return await call_next(request)
+        if len(key) > MAX_KEY_LENGTH:
+            return JSONResponse({"detail": "Idempotency-Key가 너무 깁니다."}, status_code=400)
+
+        body = await request.body()
+        scope_key = request.headers.get("authorization", "")
+        record_id = hashlib.sha256(f"{scope_key}\n{request.url.path}\n{key}".encode()).hexdigest()
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        existing, claimed_at = self.cache.get(record_id), None
+        if existing is None:
+            existing, claimed_at = await run_in_threadpool(_claim, record_id, request_hash)
+        if existing is not None:
+            if existing.request_hash != request_hash:
+                return JSONResponse({"detail": "같은 Idempotency-Key로 다른 요청이 전송되었습니다."}, status_code=422)
+            if existing.status_code is None:
+                return JSONResponse({"detail": "같은 요청을 처리 중입니다."}, status_code=409, headers={"Retry-After": "1"})
+            self.cache.put(existing)
+            return _replay(existing)
+
+        try:
+            response = await call_next(request)
+            content = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception:
+            await run_in_threadpool(_release, record_id, claimed_at)
+            raise
+        if response.status_code >= 500:
+            await run_in_threadpool(_release, record_id, claimed_at)
+        else:
+            record = await run_in_threadpool(_store, record_id, claimed_at, response.status_code, response.headers.get("content-type"), content)
+            if record is not None:
+                self.cache.put(record)
+        # 본문을 이미 읽었으므로 같은 헤더로 새 응답을 만든다
+        replay = Response(content=content, status_code=response.status_code)
+        replay.raw_headers = response.raw_headers
+        return replay
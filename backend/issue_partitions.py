@@ -0,0 +1,130 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import String, func, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from config import settings
+from database import get_db, get_engine
+from models import User, UserRole
+import jobs
+
+router = APIRouter(prefix="/admin/issues/partitions", tags=["admin"])
+
+"""
+issues 테이블 솔루션별 LIST 파티션 관리
+- issues는 solution 기준 LIST 파티션 (issues_<솔루션>), 기본 파티션은 두지 않음
+  (기본 파티션에서 행을 옮기면 댓글 FK cascade가 돌기 때문에, 새 솔루션은 첫 이슈를 넣기 전에 파티션부터 만듦)
+- 파티션은 빈 테이블을 만든 뒤 ATTACH (부모에는 SHARE UPDATE EXCLUSIVE만 잡으므로 다른 솔루션 조회/쓰기를 막지 않음)
+- 여러 워커가 같은 솔루션을 동시에 만들지 않도록 advisory lock 후 다시 확인
+- 파티션은 고객사에 등록된(삭제되지 않은) 솔루션만 생성, 등록되지 않은 솔루션의 이슈 등록은 400
+  (이슈 등록은 인증이 없으므로 임의 솔루션 이름으로 파티션이 끝없이 늘어나지 않도록 함)
+- 주기 실행: 고객사에 등록된 솔루션 중 파티션이 없는 것을 미리 생성 (`python issue_partitions.py maintain`)
+"""
+
+NAME_MAX = 40
+REGISTERED_SOLUTIONS = "SELECT DISTINCT solution FROM clients WHERE deleted_at IS NULL"
+BOUND_VALUE_RE = re.compile(r"'((?:[^']|'')*)'")
+
+# 이 워커가 파티션 존재를 확인한 솔루션 (확인 후에는 DB를 다시 보지 않음)
+_known = set()
+_known_lock = threading.Lock()
+
+
+def partition_name(solution: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", solution.lower()).strip("_")[:NAME_MAX]
+    # 소문자/숫자가 아닌 문자가 있으면 이름이 겹치지 않도록 해시를 붙임
+    if slug != solution:
+        slug = f"{slug}_{hashlib.md5(solution.encode()).hexdigest()[:8]}".lstrip("_")
+    return f"issues_{slug}"
+
+
+def list_partitions(conn: Connection) -> Dict[str, str]:
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'issues'
+        ORDER BY c.relname
+    """))
+    # 솔루션 -> 파티션 이름 ("FOR VALUES IN ('a', 'b')" 에서 값 추출)
+    return {
+        value.replace("''", "'"): name
+        for name, bound in rows
+        for value in BOUND_VALUE_RE.findall(bound or "")
+    }
+
+
+class UnknownSolution(Exception):
+    pass
+
+
+def is_registered(conn: Connection, solution: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM clients WHERE solution = :solution AND deleted_at IS NULL LIMIT 1"),
+        {"solution": solution},
+    ).first() is not None
+
+
+def create_partition(conn: Connection, solution: str) -> Optional[str]:
+    conn.execute(select(func.set_config("lock_timeout", str(settings.ISSUE_PARTITION_LOCK_TIMEOUT_MS), True)))
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('issue_partitions'))"))
+    if solution in list_partitions(conn):
+        return None
+    if not is_registered(conn, solution):
+        raise UnknownSolution(solution)
+    name = partition_name(solution)
+    value = literal(solution, String).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    # 빈 테이블이므로 ATTACH 시 검사할 행이 없고, 인덱스/기본키/FK는 부모 기준으로 자동 생성됨
+    conn.execute(text(f"CREATE TABLE {name} (LIKE issues INCLUDING DEFAULTS)"))
+    conn.execute(text(f"ALTER TABLE issues ATTACH PARTITION {name} FOR VALUES IN ({value})"))
+    return name
+
+
+def ensure_partition(solution: str) -> Optional[str]:
+    """솔루션 파티션이 없으면 별도 트랜잭션으로 만들고 이름을 반환 (이슈 등록 전에 호출, 미등록 솔루션이면 UnknownSolution)"""
+    if solution in _known:
+        return None
+    with _known_lock:
+        if solution in _known:
+            return None
+        with get_engine().begin() as conn:
+            name = create_partition(conn, solution)
+        _known.add(solution)
+    return name
+
+
+def maintain() -> dict:
+    with get_engine().connect() as conn:
+        existing = list_partitions(conn)
+        solutions = conn.execute(text(REGISTERED_SOLUTIONS)).scalars().all()
+    created = [name for name in (ensure_partition(s) for s in sorted(set(solutions) - set(existing))) if name]
+    return {"created": created}
+
+
+# 솔루션별 파티션 목록 (관리자 전용)
+@router.get("/")
+def get_partitions(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return {"partitions": list_partitions(db.connection())}
+
+
+# 등록된 솔루션의 파티션 미리 생성 (관리자 전용)
+@router.post("/maintain")
+def run_maintenance(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return maintain()
+
+
+# 앱 안에서 주기 실행 (ISSUE_PARTITION_MAINTAIN_INTERVAL > 0 일 때)
+jobs.register("issue_partitions", "ISSUE_PARTITION_MAINTAIN_INTERVAL", maintain)
+
+
+if __name__ == "__main__":
+    print(json.dumps(maintain(), ensure_ascii=False, indent=2))
@@ -1,11 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, String, cast, func, literal, select, text, true, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
-from models import Issue, IssueComment, IssueStatus, IssuePriority
-from schemas import Issue as IssueSchema, IssueCreate, IssueUpdate, IssueComment as IssueCommentSchema, IssueCommentCreate
-from datetime import datetime
-from auth import get_current_user
+from database import get_db, update_returning, update_returning_changes, update_many_returning_changes, soft_delete_returning, row_exists
+from models import ActivityLog, Issue, IssueComment, IssueStatus, IssuePriority, ISSUE_OPEN_DUE_PREDICATE
+from schemas import Issue as IssueSchema, IssueCreate, IssueCreated, IssueUpdate, IssueComment as IssueCommentSchema, IssueCommentCreate, IssueFacets, SimilarIssue, OverdueIssue, AssigneeAging, ActivityEntry, IssueBulkTarget, IssueBulkUpdate, IssueBulkResult
+from datetime import datetime, timedelta, timezone
+from auth import get_current_user, get_actor
+from audit import audit_log
+import webhooks
+from singleflight import read_flight
+from knowledge import index_issue, index_comment, unindex
+from dedup import duplicate_index
+from overview import client_overviews
+from issue_partitions import UnknownSolution, ensure_partition
+import statements
 
 router = APIRouter(prefix="/issues", tags=["issues"])
 
@@ -14,6 +24,29 @@ router = APIRouter(prefix="/issues", tags=["issues"])
 - 이슈 목록, 상세, 추가/수정/삭제, 댓글 관리 등
 """
 
+# 이슈 목록/집계 공통 필터 조건
+def _issue_filters(
+    solution: str,
+    status: Optional[IssueStatus] = None,
+    priority: Optional[IssuePriority] = None,
+    client: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    search: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> list:
+    # 캐시 문장(statements.issues_list)과 같은 조건을 값으로 구성
+    return statements.issue_conditions(
+        solution,
+        status=status or None,
+        priority=priority or None,
+        client=client or None,
+        tags=tags or None,
+        pattern=f"%{search}%" if search else None,
+        start=start or None,
+        end=end or None,
+    )
+
 # 이슈 목록 조회 (필터/검색/페이지네이션)
 @router.get("/{solution}", response_model=List[IssueSchema])
 def list_issues(
@@ -21,6 +54,7 @@ def list_issues(
     status: Optional[IssueStatus] = Query(None),
     priority: Optional[IssuePriority] = Query(None),
     client: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None),
     search: Optional[str] = Query(None),
     start: Optional[str] = Query(None),
     end: Optional[str] = Query(None),
@@ -28,29 +62,158 @@ def list_issues(
     limit: int = 20,
     db: Session = Depends(get_db)
 ):
-    q = db.query(Issue).filter(Issue.solution == solution)
-    if status:
-        q = q.filter(Issue.status == status)
-    if priority:
-        q = q.filter(Issue.priority == priority)
-    if client:
-        q = q.filter(Issue.client == client)
-    if search:
-        q = q.filter(
-            Issue.title.ilike(f"%{search}%") |
-            Issue.content.ilike(f"%{search}%") |
-            Issue.assignee.ilike(f"%{search}%")
+    # 동일 조건의 동시 요청은 한 번의 쿼리 결과를 공유
+    def query():
+        issues = db.execute(*statements.issues_list(solution, status, priority, client, tags, search, start, end, skip, limit)).scalars()
+        return [IssueSchema.model_validate(i) for i in issues]
+    key = ("issues.list_issues", solution, status, priority, client, tuple(tags or ()), search, start, end, skip, limit)
+    return read_flight.do(key, query)
+
+# 이슈 필터 집계 (태그/상태/우선순위/고객사별 건수, 단일 쿼리)
+@router.get("/{solution}/facets", response_model=IssueFacets)
+def issue_facets(
+    solution: str,
+    status: Optional[IssueStatus] = Query(None),
+    priority: Optional[IssuePriority] = Query(None),
+    client: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    search: Optional[str] = Query(None),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    filtered = (
+        select(Issue.status, Issue.priority, Issue.client, Issue.tags)
+        .where(*_issue_filters(solution, status, priority, client, tags, search, start, end))
+        .cte("filtered")
+    )
+    tag = func.jsonb_array_elements_text(
+        func.coalesce(filtered.c.tags, cast("[]", JSONB))
+    ).table_valued("value").alias("tag")
+    facets = union_all(
+        select(literal("total").label("facet"), literal("").label("value"), func.count().label("count"))
+        .select_from(filtered),
+        *[
+            select(literal(name), cast(column, String), func.count()).group_by(column)
+            for name, column in (
+                ("status", filtered.c.status),
+                ("priority", filtered.c.priority),
+                ("client", filtered.c.client),
+            )
+        ],
+        select(literal("tags"), tag.c.value, func.count())
+        .select_from(filtered.join(tag, true()))
+        .group_by(tag.c.value),
+    )
+    result = {"total": 0, "status": {}, "priority": {}, "client": {}, "tags": {}}
+    for facet, value, count in db.execute(facets):
+        if facet == "total":
+            result["total"] = count
+        else:
+            result[facet][value] = count
+    return result
+
+# 유사(중복 의심) 이슈 조회
+@router.get("/{solution}/similar", response_model=List[SimilarIssue])
+def similar_issues(
+    solution: str,
+    text: str = Query(..., min_length=1),
+    threshold: Optional[float] = Query(None, ge=0, le=1),
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    return duplicate_index.similar(db, solution, text, threshold, limit)
+
+# 마감일 경과 일수 (음수면 마감 전)
+def _overdue_days():
+    return func.extract("epoch", func.now() - Issue.due_date) / 86400
+
+# 마감 지연/임박 이슈 (미해결 + 마감일 부분 인덱스 사용, 담당자별 순번/건수는 윈도 함수로 함께 계산)
+@router.get("/{solution}/overdue", response_model=List[OverdueIssue])
+def overdue_issues(
+    solution: str,
+    within_days: float = Query(0, ge=0, description="0이면 이미 지난 이슈만, N이면 N일 안에 마감되는 이슈까지"),
+    assignee: Optional[str] = Query(None),
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    db: Session = Depends(get_db)
+):
+    cutoff = datetime.now(timezone.utc) + timedelta(days=within_days)
+    stmt = (
+        select(
+            Issue,
+            _overdue_days().label("overdue_days"),
+            func.row_number().over(partition_by=Issue.assignee, order_by=Issue.due_date).label("assignee_rank"),
+            func.count().over(partition_by=Issue.assignee).label("assignee_total"),
         )
-    if start:
-        q = q.filter(Issue.created_at >= start)
-    if end:
-        q = q.filter(Issue.created_at <= end)
-    q = q.order_by(Issue.created_at.asc())
-    return q.offset(skip).limit(limit).all()
-
-# 이슈 등록
-@router.post("/{solution}", response_model=IssueSchema)
+        .where(Issue.solution == solution, text(ISSUE_OPEN_DUE_PREDICATE), Issue.due_date < cutoff)
+        .order_by(Issue.due_date.asc())
+        .offset(skip)
+        .limit(limit)
+    )
+    if assignee:
+        stmt = stmt.where(Issue.assignee == assignee)
+    return [
+        OverdueIssue(**IssueSchema.model_validate(issue).dict(), overdue_days=round(days, 2), assignee_rank=rank, assignee_total=total)
+        for issue, days, rank, total in db.execute(stmt)
+    ]
+
+# 담당자별 마감 지연 현황 (구간별 건수, 최장 지연, 지연 비중/순위)
+@router.get("/{solution}/aging", response_model=List[AssigneeAging])
+def assignee_aging(
+    solution: str,
+    due_soon_days: float = Query(2, ge=0),
+    db: Session = Depends(get_db)
+):
+    per_issue = (
+        select(Issue.assignee, _overdue_days().label("days"))
+        .where(Issue.solution == solution, text(ISSUE_OPEN_DUE_PREDICATE))
+        .subquery()
+    )
+    days = per_issue.c.days
+    overdue = func.count().filter(days > 0)
+    buckets = {
+        "0-3d": func.count().filter(days > 0, days <= 3),
+        "3-7d": func.count().filter(days > 3, days <= 7),
+        "7-30d": func.count().filter(days > 7, days <= 30),
+        "30d+": func.count().filter(days > 30),
+    }
+    stmt = (
+        select(
+            per_issue.c.assignee,
+            func.count().label("open_with_due"),
+            overdue.label("overdue"),
+            func.count().filter(days <= 0, days > -due_soon_days).label("due_soon"),
+            *[column.label(f"bucket_{i}") for i, column in enumerate(buckets.values())],
+            func.max(days).label("max_overdue_days"),
+            (cast(overdue, Float) / func.nullif(func.sum(overdue).over(), 0)).label("overdue_share"),
+            func.rank().over(order_by=(overdue.desc(), func.max(days).desc())).label("rank"),
+        )
+        .group_by(per_issue.c.assignee)
+        .order_by(text("rank"), per_issue.c.assignee)
+    )
+    result = []
+    for row in db.execute(stmt).mappings():
+        result.append(AssigneeAging(
+            assignee=row["assignee"],
+            open_with_due=row["open_with_due"],
+            overdue=row["overdue"],
+            due_soon=row["due_soon"],
+            buckets={name: row[f"bucket_{i}"] for i, name in enumerate(buckets)},
+            max_overdue_days=round(row["max_overdue_days"], 2) if row["max_overdue_days"] is not None else None,
+            overdue_share=round(row["overdue_share"] or 0.0, 3),
+            rank=row["rank"],
+        ))
+    return result
+
+# 이슈 등록 (중복 의심 이슈 목록을 함께 반환)
+@router.post("/{solution}", response_model=IssueCreated)
 def create_issue(solution: str, issue: IssueCreate, db: Session = Depends(get_db)):
+    # 처음 보는 솔루션이면 파티션부터 생성 (별도 트랜잭션, 이미 확인한 솔루션은 DB 조회 없음, 고객사 미등록 솔루션은 거부)
+    try:
+        ensure_partition(solution)
+    except UnknownSolution:
+        raise HTTPException(status_code=400, detail="등록되지 않은 솔루션입니다.")
     db_issue = Issue(
         solution=solution,
         title=issue.title,
@@ -64,82 +227,201 @@ def create_issue(solution: str, issue: IssueCreate, db: Session = Depends(get_db
         created_at=datetime.utcnow()
     )
     db.add(db_issue)
+    db.flush()
+    webhooks.enqueue(db, solution, "issue.created", IssueSchema.model_validate(db_issue).model_dump(mode="json"))
     db.commit()
     db.refresh(db_issue)
-    return db_issue
+    index_issue(db_issue)
+    similar = duplicate_index.similar(db, solution, f"{db_issue.title} {db_issue.content or ''}", exclude=db_issue.id)
+    duplicate_index.add(solution, db_issue.id, db_issue.title, db_issue.content)
+    client_overviews.invalidate_name(db_issue.client, solution)
+    return IssueCreated(**IssueSchema.model_validate(db_issue).dict(), similar=similar)
+
+# 일괄 수정/삭제 대상 조건 (ids 또는 list_issues와 같은 필터, 조건 없이 전체를 대상으로 하는 요청은 거부)
+def _bulk_conditions(solution: str, target: IssueBulkTarget) -> list:
+    if target.ids is not None:
+        if not target.ids:
+            raise HTTPException(status_code=400, detail="대상 이슈가 없습니다.")
+        return [Issue.solution == solution, Issue.id.in_(target.ids), Issue.deleted_at.is_(None)]
+    filters = target.filter.dict(exclude_none=True) if target.filter else {}
+    if not filters:
+        raise HTTPException(status_code=400, detail="ids 또는 filter 조건이 필요합니다.")
+    return _issue_filters(solution, **filters)
+
+# 이슈 소프트 삭제 (이슈와 댓글에 삭제 표시를 한 문장으로, 실제 삭제는 purge 작업이 FK cascade로 처리)
+def _soft_delete_issues(db: Session, conditions: list):
+    deleted = (
+        update(Issue.__table__)
+        .where(*conditions, Issue.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Issue.id, Issue.solution)
+        .cte("deleted_issues")
+    )
+    comments = (
+        update(IssueComment.__table__)
+        .where(tuple_(IssueComment.issue_id, IssueComment.solution).in_(select(deleted.c.id, deleted.c.solution)), IssueComment.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(IssueComment.id)
+        .cte("deleted_comments")
+    )
+    return db.execute(select(
+        select(func.coalesce(func.array_agg(deleted.c.id), [])).scalar_subquery(),
+        select(func.coalesce(func.array_agg(comments.c.id), [])).scalar_subquery(),
+    )).one()
+
+# 이슈 일괄 수정 (상태/우선순위/담당자, 단일 UPDATE)
+@router.patch("/{solution}/bulk", response_model=IssueBulkResult)
+def bulk_update_issues(solution: str, bulk: IssueBulkUpdate, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    values = bulk.changes.dict(exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="변경할 항목이 없습니다.")
+    rows = update_many_returning_changes(db, Issue, _bulk_conditions(solution, bulk), values)
+    ids = [row["id"] for row, _ in rows]
+    if ids:
+        webhooks.enqueue(db, solution, "issue.bulk_updated", {
+            "solution": solution, "ids": ids, "changes": bulk.changes.model_dump(mode="json", exclude_none=True), "actor": actor,
+        })
+    db.commit()
+    for row, changes in rows:
+        audit_log.record("issue", row["id"], changes, actor=actor, solution=solution)
+    client_overviews.invalidate_solution(solution)
+    return IssueBulkResult(affected=len(ids), ids=ids)
+
+# 이슈 일괄 삭제 (댓글까지 단일 문장으로 삭제)
+@router.delete("/{solution}/bulk", response_model=IssueBulkResult)
+def bulk_delete_issues(solution: str, target: IssueBulkTarget, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    ids, comment_ids = _soft_delete_issues(db, _bulk_conditions(solution, target))
+    if ids:
+        webhooks.enqueue(db, solution, "issue.bulk_deleted", {"solution": solution, "ids": ids, "comments_deleted": len(comment_ids), "actor": actor})
+    db.commit()
+    for issue_id in ids:
+        unindex("issue", issue_id)
+        duplicate_index.remove(solution, issue_id)
+    for comment_id in comment_ids:
+        unindex("comment", comment_id)
+    client_overviews.invalidate_solution(solution)
+    return IssueBulkResult(affected=len(ids), ids=ids, comments_deleted=len(comment_ids))
 
 # 이슈 상세
 @router.get("/{solution}/{issue_id}", response_model=IssueSchema)
 def get_issue(solution: str, issue_id: int, db: Session = Depends(get_db)):
-    issue = db.query(Issue).filter(Issue.solution == solution, Issue.id == issue_id).first()
+    issue = db.execute(*statements.issue_by_id(solution, issue_id)).scalars().first()
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     return issue
 
 # 이슈 수정
 @router.patch("/{solution}/{issue_id}", response_model=IssueSchema)
-def update_issue(solution: str, issue_id: int, update: IssueUpdate, db: Session = Depends(get_db)):
-    issue = db.query(Issue).filter(Issue.solution == solution, Issue.id == issue_id).first()
+def update_issue(solution: str, issue_id: int, update: IssueUpdate, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    data = update.dict(exclude_unset=True)
+    version = data.pop("version", None)
+    conditions = [Issue.solution == solution, Issue.id == issue_id, Issue.deleted_at.is_(None)]
+    issue, changes = update_returning_changes(db, Issue, conditions, data, version)
     if not issue:
+        if version is not None and row_exists(db, Issue, conditions):
+            raise HTTPException(status_code=409, detail="다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.")
         raise HTTPException(status_code=404, detail="Issue not found")
-    for field, value in update.dict(exclude_unset=True).items():
-        setattr(issue, field, value)
+    if "status" in changes:
+        old, new = changes["status"]
+        webhooks.enqueue(db, solution, "issue.status_changed", {
+            "id": issue_id, "solution": solution, "title": issue["title"], "assignee": issue["assignee"],
+            "old_status": old.value, "new_status": new.value, "actor": actor,
+        })
     db.commit()
-    db.refresh(issue)
+    audit_log.record("issue", issue_id, changes, actor=actor, solution=solution)
+    index_issue(issue)
+    duplicate_index.add(solution, issue_id, issue["title"], issue["content"])
+    client_overviews.invalidate_name(issue["client"], solution)
+    if "client" in changes:
+        client_overviews.invalidate_name(changes["client"][0], solution)
     return issue
 
 # 이슈 삭제
 @router.delete("/{solution}/{issue_id}")
 def delete_issue(solution: str, issue_id: int, db: Session = Depends(get_db)):
-    issue = db.query(Issue).filter(Issue.solution == solution, Issue.id == issue_id).first()
-    if not issue:
+    ids, comment_ids = _soft_delete_issues(db, [Issue.solution == solution, Issue.id == issue_id])
+    if not ids:
         raise HTTPException(status_code=404, detail="Issue not found")
-    db.delete(issue)
     db.commit()
+    unindex("issue", issue_id)
+    duplicate_index.remove(solution, issue_id)
+    for comment_id in comment_ids:
+        unindex("comment", comment_id)
+    client_overviews.invalidate_solution(solution)
     return {"ok": True}
 
+# 이슈 변경 이력 (최신순, 아직 저장 대기 중인 변경분 포함)
+@router.get("/{solution}/{issue_id}/history", response_model=List[ActivityEntry])
+def issue_history(solution: str, issue_id: int, skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    rows = db.execute(
+        select(ActivityLog)
+        .where(ActivityLog.entity_type == "issue", ActivityLog.entity_id == issue_id, ActivityLog.solution == solution)
+        .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+        .limit(skip + limit)
+    ).scalars().all()
+    entries = [ActivityEntry.model_validate(row) for row in rows]
+    entries += [ActivityEntry(**event) for event in audit_log.pending("issue", issue_id) if event["solution"] == solution]
+    entries.sort(key=lambda entry: entry.created_at, reverse=True)
+    return entries[skip:skip + limit]
+
 # 댓글 등록
 @router.post("/{solution}/{issue_id}/comments", response_model=IssueCommentSchema)
 def create_comment(solution: str, issue_id: int, comment: IssueCommentCreate, db: Session = Depends(get_db)):
+    client = db.execute(
+        select(Issue.client).where(Issue.solution == solution, Issue.id == issue_id, Issue.deleted_at.is_(None))
+    ).scalar()
+    if client is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
     db_comment = IssueComment(
         issue_id=issue_id,
+        solution=solution,
         author=comment.author,
         content=comment.content,
         created_at=datetime.utcnow()
     )
     db.add(db_comment)
+    db.flush()
+    webhooks.enqueue(db, solution, "issue.comment_created", {**IssueCommentSchema.model_validate(db_comment).model_dump(mode="json"), "solution": solution})
     db.commit()
     db.refresh(db_comment)
+    index_comment(db_comment, solution)
+    client_overviews.invalidate_name(client, solution)
     return db_comment
 
 # 댓글 목록
 @router.get("/{solution}/{issue_id}/comments", response_model=List[IssueCommentSchema])
 def list_comments(solution: str, issue_id: int, db: Session = Depends(get_db)):
-    return db.query(IssueComment).filter(IssueComment.issue_id == issue_id).order_by(IssueComment.created_at.asc()).all()
+    return db.execute(*statements.comments_for_issue(solution, issue_id)).scalars().all()
+
+# 댓글이 달린 이슈의 고객사 (고객사 개요의 최근 활동 시각이 댓글에 따라 바뀌므로 캐시 무효화용)
+def _comment_issue_client(db: Session, solution: str, issue_id: int) -> Optional[str]:
+    return db.execute(select(Issue.client).where(Issue.solution == solution, Issue.id == issue_id)).scalar()
 
 # 댓글 수정
 @router.patch("/{solution}/{issue_id}/comments/{comment_id}", response_model=IssueCommentSchema)
 def update_comment(solution: str, issue_id: int, comment_id: int, update: IssueCommentCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    comment = db.query(IssueComment).filter(IssueComment.id == comment_id, IssueComment.issue_id == issue_id).first()
+    conditions = [IssueComment.id == comment_id, IssueComment.solution == solution, IssueComment.issue_id == issue_id, IssueComment.deleted_at.is_(None)]
+    comment = update_returning(db, IssueComment, conditions + [IssueComment.author == current_user.name], {"content": update.content})
     if not comment:
+        if row_exists(db, IssueComment, conditions):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인이 작성한 댓글만 수정할 수 있습니다.")
         raise HTTPException(status_code=404, detail="Comment not found")
-    if comment.author != current_user.name:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인이 작성한 댓글만 수정할 수 있습니다.")
-    update_data = update.dict(exclude_unset=True)
-    if 'content' in update_data:
-        comment.content = update_data['content']
+    client = _comment_issue_client(db, solution, issue_id)
     db.commit()
-    db.refresh(comment)
+    index_comment(comment, solution)
+    client_overviews.invalidate_name(client, solution)
     return comment
 
 # 댓글 삭제
 @router.delete("/{solution}/{issue_id}/comments/{comment_id}")
 def delete_comment(solution: str, issue_id: int, comment_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    comment = db.query(IssueComment).filter(IssueComment.id == comment_id, IssueComment.issue_id == issue_id).first()
-    if not comment:
+    conditions = [IssueComment.id == comment_id, IssueComment.solution == solution, IssueComment.issue_id == issue_id, IssueComment.deleted_at.is_(None)]
+    if not soft_delete_returning(db, IssueComment, conditions + [IssueComment.author == current_user.name]):
+        if row_exists(db, IssueComment, conditions):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인이 작성한 댓글만 삭제할 수 있습니다.")
         raise HTTPException(status_code=404, detail="Comment not found")
-    if comment.author != current_user.name:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인이 작성한 댓글만 삭제할 수 있습니다.")
-    db.delete(comment)
+    client = _comment_issue_client(db, solution, issue_id)
     db.commit()
-    return {"ok": True} 
\ No newline at end of file
+    unindex("comment", comment_id)
+    client_overviews.invalidate_name(client, solution)
+    return {"ok": True}
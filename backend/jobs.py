@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Tuple
+from fastapi.concurrency import run_in_threadpool
+from config import get_settings
+
+"""
+백그라운드 주기 작업
+- 각 모듈이 register()로 (이름, 주기 설정 이름, 함수)를 등록하고, create_app의 lifespan에서 시작/종료
+- 주기는 Settings 값(초)으로 읽으며 0 이하이면 그 작업은 돌지 않음, JOBS_ENABLED=false 이면 전체 끔
+- 동기 함수는 스레드풀에서 실행, 예외는 로그만 남기고 다음 주기에 다시 실행
+"""
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, Tuple[str, Callable]] = {}
+last_runs: Dict[str, dict] = {}
+
+
+def register(name: str, interval_setting: str, fn: Callable):
+    _registry[name] = (interval_setting, fn)
+
+
+async def _run_periodic(name: str, interval: float, fn: Callable):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        started = loop.time()
+        try:
+            result = await fn() if asyncio.iscoroutinefunction(fn) else await run_in_threadpool(fn)
+            last_runs[name] = {"ok": True, "seconds": round(loop.time() - started, 3), "result": result}
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception("job %s failed", name)
+            last_runs[name] = {"ok": False, "seconds": round(loop.time() - started, 3), "error": str(exc)}
+
+
+def start_all() -> List[asyncio.Task]:
+    settings = get_settings()
+    if not settings.JOBS_ENABLED:
+        return []
+    tasks = []
+    for name, (interval_setting, fn) in _registry.items():
+        interval = getattr(settings, interval_setting, 0)
+        if interval and interval > 0:
+            tasks.append(asyncio.create_task(_run_periodic(name, interval, fn), name=f"job:{name}"))
+    return tasks
+
+
+async def stop_all(tasks: List[asyncio.Task]):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,564 @@
+import fcntl
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from config import get_settings
+from database import SessionLocal, get_db
+from models import Issue, IssueComment, Work
+from schemas import KnowledgeHit
+import jobs
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+"""
+지식 검색 (ChatAI용)
+- 작업내역(content/issue), 이슈(title/content), 이슈 댓글을 대상으로 한 로컬 BM25 + 해시 임베딩 검색
+- 저장된 세그먼트(CSR 역색인, 임베딩 행렬)는 메모리 매핑으로 읽고, 이후 변경분은 메모리 델타에 누적
+- 쓰기 API에서 증분 갱신되며 KNOWLEDGE_SAVE_EVERY 건마다 세그먼트를 다시 기록
+- 모든 워커가 KNOWLEDGE_REFRESH_INTERVAL초마다 다른 워커의 변경을 반영 (기록 담당은 바뀐 것이 있으면 이때도 세그먼트 기록)
+- 세그먼트 디렉터리는 WRITER.lock을 잡은 워커 하나만 기록 (그 워커가 죽으면 다른 워커가 이어받음)
+  기록 담당은 저장 전에 DB 변경분을 반영하고, 나머지 워커는 저장 대신 최신 세그먼트로 갈아탄 뒤 그 이후 변경분만 반영
+- DB 조회/세그먼트 기록·읽기는 인덱스 잠금 밖에서 하고 교체할 때만 잠금 (그동안 들어온 변경은 새 세그먼트에 다시 적용)
+- 세그먼트를 읽은 뒤에는 DB에서 사라진(하드 삭제된) 문서를 인덱스에서 제외
+- 세그먼트를 기록할 때 삭제 표시된 문서(수정 전 버전 포함)는 빼고 기록 (전체 재구축 없이도 크기가 늘지 않음)
+"""
+
+TOKEN_RE = re.compile(r"[0-9a-z_]+|[가-힣]+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_LENGTH = 200
+# 하드 삭제 확인 시 한 번에 조회할 id 수
+EXISTS_CHUNK = 10000
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall((text or "").lower()):
+        if "가" <= token[0] <= "힣":
+            # 한글은 조사/어미가 붙어 있으므로 어절 전체와 음절 bigram을 함께 색인
+            tokens.append(token)
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        elif len(token) > 1 or token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+def _hash_embedding(tokens: List[str], dim: int) -> np.ndarray:
+    # 외부 모델 없이 쓰는 특징 해싱 임베딩 (L2 정규화)
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in tokens:
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        vec[h % dim] += 1.0 if (h >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class _Growable:
+    """용량을 두 배씩 늘리는 1차원/2차원 numpy 버퍼"""
+
+    def __init__(self, dtype, width: int = 0):
+        self.width = width
+        self.size = 0
+        self.data = np.zeros((16, width) if width else 16, dtype=dtype)
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.zeros((len(self.data) * 2,) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+def _merged_postings(base: tuple, delta: Dict[str, Tuple[List[int], List[float]]], term: str) -> Tuple[np.ndarray, np.ndarray]:
+    # 세그먼트(base_terms, base_ptr, base_doc, base_tf)와 델타의 posting을 합침
+    base_terms, base_ptr, base_doc, base_tf = base
+    parts_doc, parts_tf = [], []
+    row = base_terms.get(term)
+    if row is not None:
+        lo, hi = base_ptr[row], base_ptr[row + 1]
+        parts_doc.append(base_doc[lo:hi])
+        parts_tf.append(base_tf[lo:hi])
+    if term in delta:
+        docs, tfs = delta[term]
+        parts_doc.append(np.asarray(docs, dtype=np.int32))
+        parts_tf.append(np.asarray(tfs, dtype=np.float32))
+    if not parts_doc:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    return np.concatenate(parts_doc), np.concatenate(parts_tf)
+
+
+class KnowledgeIndex:
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        # 세그먼트 기록/교체는 한 번에 하나씩 (요청 스레드와 주기 작업이 겹칠 수 있음)
+        self._save_lock = threading.Lock()
+        self.loaded = False
+        self.dirty = 0
+        self._saving = False
+        self._writer = None
+        self._segment: Optional[str] = None
+        # 세그먼트 기록/읽기 중이면 그동안 들어온 변경 기록 (교체 후 다시 적용)
+        self._changes: Optional[List[tuple]] = None
+        self._reset()
+
+    def _reset(self):
+        self.docs: List[dict] = []
+        self.keys: Dict[str, int] = {}
+        self.solutions: Dict[str, int] = {}
+        self.lengths = _Growable(np.float32)
+        self.alive = _Growable(np.bool_)
+        self.solution_codes = _Growable(np.int32)
+        # 저장된 세그먼트 (메모리 매핑)
+        self.base_terms: Dict[str, int] = {}
+        self.base_ptr = np.zeros(1, dtype=np.int64)
+        self.base_doc = np.zeros(0, dtype=np.int32)
+        self.base_tf = np.zeros(0, dtype=np.float32)
+        self.base_emb = np.zeros((0, self.dim), dtype=np.float32)
+        # 세그먼트 이후 변경분
+        self.delta: Dict[str, Tuple[List[int], List[float]]] = {}
+        self.delta_emb = _Growable(np.float32, self.dim) if self.dim else None
+        self.built_at: Optional[datetime] = None
+
+    # 문서 추가/갱신 (기존 문서는 삭제 표시 후 새로 추가)
+    def upsert(self, key: str, solution: str, title: str, text: str, extra: Optional[dict] = None):
+        tokens = tokenize(f"{title}\n{text}")
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append(("_upsert", (key, solution, title, text, extra, tokens)))
+            self._upsert(key, solution, title, text, extra, tokens)
+            self.dirty += 1
+        if self.dirty >= get_settings().KNOWLEDGE_SAVE_EVERY and not self._saving:
+            # 세그먼트 기록/갱신은 요청 스레드가 아닌 백그라운드에서
+            self._saving = True
+            threading.Thread(target=self.save, daemon=True).start()
+
+    def _upsert(self, key: str, solution: str, title: str, text: str, extra: Optional[dict], tokens: List[str]):
+        self._remove(key)
+        idx = len(self.docs)
+        snippet = (text or "")[:SNIPPET_LENGTH]
+        self.docs.append({"key": key, "solution": solution, "title": title, "snippet": snippet, **(extra or {})})
+        self.keys[key] = idx
+        self.lengths.append(len(tokens))
+        self.alive.append(True)
+        self.solution_codes.append(self.solutions.setdefault(solution, len(self.solutions)))
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            docs, tfs = self.delta.setdefault(token, ([], []))
+            docs.append(idx)
+            tfs.append(tf)
+        if self.dim:
+            self.delta_emb.append(_hash_embedding(tokens, self.dim))
+
+    def is_writer(self) -> bool:
+        # 세그먼트 기록 담당 여부 (프로세스가 끝나면 잠금이 풀려 다른 워커가 다음 저장 때 이어받음)
+        if self._writer is None:
+            os.makedirs(self.path, exist_ok=True)
+            f = open(os.path.join(self.path, "WRITER.lock"), "a")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                return False
+            self._writer = f
+        return True
+
+    @contextmanager
+    def _current_lock(self, mode: int):
+        # CURRENT 교체/이전 세그먼트 삭제(배타)와 세그먼트 읽기(공유)가 겹치지 않도록
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "CURRENT.lock"), "a") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def remove(self, key: str):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append(("_remove", (key,)))
+            if self._remove(key):
+                self.dirty += 1
+
+    def _remove(self, key: str) -> bool:
+        idx = self.keys.pop(key, None)
+        if idx is None:
+            return False
+        self.alive.data[idx] = False
+        return True
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        return _merged_postings((self.base_terms, self.base_ptr, self.base_doc, self.base_tf), self.delta, term)
+
+    def search(self, query: str, solution: Optional[str] = None, k: int = 10) -> List[dict]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            n = len(self.docs)
+            if n == 0:
+                return []
+            alive = self.alive.view().copy()
+            if solution is not None:
+                code = self.solutions.get(solution)
+                if code is None:
+                    return []
+                alive &= self.solution_codes.view() == code
+            lengths = self.lengths.view()
+            live = int(alive.sum())
+            if live == 0:
+                return []
+            avg_len = float(lengths[alive].mean()) or 1.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len)
+
+            scores = np.zeros(n, dtype=np.float32)
+            for term in set(tokens):
+                docs, tfs = self._postings(term)
+                if len(docs) == 0:
+                    continue
+                df = int(alive[docs].sum())
+                if df == 0:
+                    continue
+                idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+                np.add.at(scores, docs, idf * tfs * (BM25_K1 + 1) / (tfs + norm[docs]))
+
+            scores[~alive] = 0
+            if self.dim and scores.max() > 0:
+                # BM25 점수를 정규화한 뒤 해시 임베딩 코사인 유사도와 가중 합산
+                q = _hash_embedding(tokens, self.dim)
+                cosine = np.concatenate([self.base_emb @ q, self.delta_emb.view() @ q])
+                weight = get_settings().KNOWLEDGE_EMBEDDING_WEIGHT
+                scores = (1 - weight) * scores / scores.max() + weight * np.clip(cosine, 0, None) * (scores > 0)
+
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [{**self.docs[i], "score": float(scores[i])} for i in top if scores[i] > 0]
+
+    # 기록 담당이면 DB 변경분을 반영해 (바뀐 것이 있으면) 새 세그먼트로 기록,
+    # 아니면 담당 워커의 최신 세그먼트로 갈아타거나 그대로 두고 이후 변경분만 반영
+    # (DB 조회와 파일 기록은 인덱스 잠금 밖에서 하므로 그동안에도 검색/증분 갱신은 계속됨)
+    def save(self):
+        try:
+            with self._save_lock, SessionLocal() as db:
+                if self.is_writer():
+                    self.catch_up(db)
+                    if self.dirty or self._segment is None:
+                        self._save()
+                elif self.load():
+                    self.catch_up(db)
+                    self.drop_missing(db)
+                    self.dirty = 0
+                else:
+                    self.catch_up(db)
+                    self.dirty = 0
+        finally:
+            self._saving = False
+
+    def _snapshot(self) -> dict:
+        # self._lock을 잡은 상태에서 호출, 세그먼트 기록에 필요한 상태 복사 (세그먼트 배열은 바뀌지 않으므로 참조만)
+        return {
+            "docs": list(self.docs),
+            "lengths": self.lengths.view().copy(),
+            "alive": self.alive.view().copy(),
+            "solution_codes": self.solution_codes.view().copy(),
+            "solutions": dict(self.solutions),
+            "base": (self.base_terms, self.base_ptr, self.base_doc, self.base_tf),
+            "delta": {term: (list(docs), list(tfs)) for term, (docs, tfs) in self.delta.items()},
+            "base_emb": self.base_emb,
+            "delta_emb": self.delta_emb.view().copy() if self.dim else None,
+            "built_at": self.built_at,
+            "dirty": self.dirty,
+        }
+
+    def _write_segment(self, snapshot: dict) -> str:
+        # 삭제 표시된 문서는 기록하지 않고 남은 문서 번호를 앞으로 당김 (수정할 때마다 늘어나는 죽은 문서 정리)
+        alive = snapshot["alive"]
+        keep = np.flatnonzero(alive)
+        renumber = np.full(len(alive), -1, dtype=np.int32)
+        renumber[keep] = np.arange(len(keep), dtype=np.int32)
+        terms, doc_parts, tf_parts = [], [], []
+        ptr = [0]
+        for term in sorted(set(snapshot["base"][0]) | set(snapshot["delta"])):
+            docs, tfs = _merged_postings(snapshot["base"], snapshot["delta"], term)
+            live = alive[docs]
+            if not live.any():
+                continue
+            terms.append(term)
+            doc_parts.append(renumber[docs[live]])
+            tf_parts.append(tfs[live])
+            ptr.append(ptr[-1] + int(live.sum()))
+        segment = f"segment-{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}"
+        target = os.path.join(self.path, segment)
+        os.makedirs(target, exist_ok=True)
+        np.save(os.path.join(target, "ptr.npy"), np.asarray(ptr, dtype=np.int64))
+        np.save(os.path.join(target, "doc.npy"), np.concatenate(doc_parts) if doc_parts else np.zeros(0, dtype=np.int32))
+        np.save(os.path.join(target, "tf.npy"), np.concatenate(tf_parts) if tf_parts else np.zeros(0, dtype=np.float32))
+        np.save(os.path.join(target, "lengths.npy"), snapshot["lengths"][keep])
+        np.save(os.path.join(target, "alive.npy"), np.ones(len(keep), dtype=np.bool_))
+        np.save(os.path.join(target, "solution_codes.npy"), snapshot["solution_codes"][keep])
+        if self.dim:
+            np.save(os.path.join(target, "emb.npy"), np.concatenate([snapshot["base_emb"], snapshot["delta_emb"]])[keep])
+        with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "terms": terms,
+                "docs": [snapshot["docs"][i] for i in keep],
+                "solutions": snapshot["solutions"],
+                "built_at": snapshot["built_at"].isoformat() if snapshot["built_at"] else None,
+            }, f, ensure_ascii=False)
+        return segment
+
+    def _save(self):
+        # 잠금은 상태 복사와 마지막 교체 때만 잡고, 그 사이 변경은 _changes에 기록했다가 새 세그먼트 위에 다시 적용
+        with self._lock:
+            snapshot = self._snapshot()
+            self._changes = []
+        try:
+            segment = self._write_segment(snapshot)
+            current = os.path.join(self.path, "CURRENT")
+            with self._current_lock(fcntl.LOCK_EX):
+                previous = open(current).read().strip() if os.path.exists(current) else None
+                with open(current + ".tmp", "w") as f:
+                    f.write(segment)
+                os.replace(current + ".tmp", current)
+                if previous and previous != segment:
+                    shutil.rmtree(os.path.join(self.path, previous), ignore_errors=True)
+            state = self._read_segment(os.path.join(self.path, segment))
+            with self._lock:
+                self._apply_segment(segment, state)
+                self.dirty = max(self.dirty - snapshot["dirty"], 0)
+        finally:
+            with self._lock:
+                self._changes = None
+
+    def _read_segment(self, target: str) -> dict:
+        # 잠금 밖에서 세그먼트 파일을 읽음 (큰 배열은 메모리 매핑)
+        with open(os.path.join(target, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        state = {
+            "meta": meta,
+            "base_ptr": np.load(os.path.join(target, "ptr.npy")),
+            "base_doc": np.load(os.path.join(target, "doc.npy"), mmap_mode="r"),
+            "base_tf": np.load(os.path.join(target, "tf.npy"), mmap_mode="r"),
+            "base_emb": np.load(os.path.join(target, "emb.npy"), mmap_mode="r") if self.dim else None,
+        }
+        for name in ("lengths", "alive", "solution_codes"):
+            state[name] = np.array(np.load(os.path.join(target, f"{name}.npy")), copy=True)
+        return state
+
+    def _apply_segment(self, segment: str, state: dict):
+        # self._lock을 잡은 상태에서 호출, 읽어 둔 세그먼트로 교체한 뒤 그동안의 변경을 다시 적용
+        meta = state["meta"]
+        self._reset()
+        self.docs = meta["docs"]
+        self.solutions = meta["solutions"]
+        self.built_at = datetime.fromisoformat(meta["built_at"]) if meta["built_at"] else None
+        self.base_terms = {term: i for i, term in enumerate(meta["terms"])}
+        self.base_ptr, self.base_doc, self.base_tf = state["base_ptr"], state["base_doc"], state["base_tf"]
+        if self.dim:
+            self.base_emb = state["base_emb"]
+        for name, buf in (("lengths", self.lengths), ("alive", self.alive), ("solution_codes", self.solution_codes)):
+            values = state[name]
+            buf.data = values if len(values) else buf.data
+            buf.size = len(values)
+        # 삭제 표시된 문서는 키 목록에서 제외
+        self.keys = {doc["key"]: i for i, doc in enumerate(self.docs) if self.alive.data[i]}
+        self._segment = segment
+        for method, args in self._changes or []:
+            getattr(self, method)(*args)
+
+    # 저장된 최신 세그먼트를 읽음 (없거나, 이미 읽은 세그먼트이거나, 차원이 다르면 False)
+    def load(self) -> bool:
+        current = os.path.join(self.path, "CURRENT")
+        with self._lock:
+            self._changes = []
+        try:
+            with self._current_lock(fcntl.LOCK_SH):
+                if not os.path.exists(current):
+                    return False
+                segment = open(current).read().strip()
+                if segment == self._segment:
+                    return False
+                state = self._read_segment(os.path.join(self.path, segment))
+            if state["meta"]["dim"] != self.dim:
+                # 임베딩 차원이 바뀌면 DB에서 다시 구축
+                return False
+            with self._lock:
+                self._apply_segment(segment, state)
+            return True
+        finally:
+            with self._lock:
+                self._changes = None
+
+    # DB 전체로부터 다시 구축 (삭제 표시된 문서 정리), 세그먼트는 기록 담당 워커만 저장
+    def rebuild(self, db: Session):
+        with self._lock:
+            self._reset()
+            self.built_at = datetime.now(timezone.utc)
+            self._index_rows(db, since=None)
+            self.loaded = True
+            if self.is_writer():
+                self._save()
+
+    # 저장 시점 이후 변경된 행만 반영 (행마다 잠깐씩만 잠금)
+    def catch_up(self, db: Session):
+        with self._lock:
+            since = self.built_at
+            self.built_at = datetime.now(timezone.utc)
+        try:
+            self._index_rows(db, since=since)
+        except Exception:
+            with self._lock:
+                self.built_at = since
+            raise
+        self.loaded = True
+
+    # 세그먼트 저장 이후 하드 삭제된 문서 제외 (catch_up은 남아 있는 행만 볼 수 있으므로)
+    def drop_missing(self, db: Session):
+        with self._lock:
+            keys = list(self.keys)
+        by_kind: Dict[str, List[int]] = {}
+        for key in keys:
+            kind, _, id = key.partition(":")
+            by_kind.setdefault(kind, []).append(int(id))
+        for kind, model in (("work", Work), ("issue", Issue), ("comment", IssueComment)):
+            ids = by_kind.get(kind, [])
+            for i in range(0, len(ids), EXISTS_CHUNK):
+                chunk = ids[i:i + EXISTS_CHUNK]
+                existing = set(db.execute(select(model.id).where(model.id.in_(chunk))).scalars())
+                for id in chunk:
+                    if id not in existing:
+                        self.remove(f"{kind}:{id}")
+
+    def _index_rows(self, db: Session, since: Optional[datetime]):
+        def changed(model):
+            if since is None:
+                return True
+            # 삭제 표시(deleted_at)도 변경으로 봄 (댓글은 updated_at이 없음)
+            columns = [model.created_at] + [getattr(model, name) for name in ("updated_at", "deleted_at") if hasattr(model, name)]
+            return or_(*(column > since for column in columns))
+
+        for work in db.query(Work).filter(changed(Work)).yield_per(1000):
+            index_work(work, self)
+        for issue in db.query(Issue).filter(changed(Issue), Issue.deleted_at.is_(None)).yield_per(1000):
+            index_issue(issue, self)
+        for comment in db.query(IssueComment).filter(changed(IssueComment), IssueComment.deleted_at.is_(None)).yield_per(1000):
+            index_comment(comment, comment.solution, self)
+        if since is None:
+            return
+        # 저장 시점 이후 삭제 표시된 이슈/댓글은 색인에서 제외
+        for kind, model in (("issue", Issue), ("comment", IssueComment)):
+            for id in db.execute(select(model.id).where(changed(model), model.deleted_at.isnot(None))).scalars():
+                self.remove(f"{kind}:{id}")
+
+
+_index: Optional[KnowledgeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> KnowledgeIndex:
+    """현재 설정의 인덱스 (처음 사용할 때 만들고, create_app(settings)로 경로/차원이 바뀌면 새로 만듦)"""
+    global _index
+    settings = get_settings()
+    with _index_lock:
+        if _index is None or (_index.path, _index.dim) != (settings.KNOWLEDGE_INDEX_DIR, settings.KNOWLEDGE_EMBEDDING_DIM):
+            _index = KnowledgeIndex(settings.KNOWLEDGE_INDEX_DIR, settings.KNOWLEDGE_EMBEDDING_DIM)
+        return _index
+
+
+def _get(obj, name):
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+# 쓰기 API에서 호출하는 증분 갱신 함수 (인덱스가 아직 로드되지 않았으면 다음 로드 때 반영됨)
+def index_work(work, index: KnowledgeIndex = None):
+    shared = get_index()
+    index = index or shared
+    if index is shared and not index.loaded:
+        return
+    text = _get(work, "content") + ("\n" + _get(work, "issue") if _get(work, "issue") else "")
+    index.upsert(f"work:{_get(work, 'id')}", _get(work, "solution"), f"{_get(work, 'client')} {_get(work, 'date')}", text,
+                 {"kind": "work", "id": _get(work, "id")})
+
+
+def index_issue(issue, index: KnowledgeIndex = None):
+    shared = get_index()
+    index = index or shared
+    if index is shared and not index.loaded:
+        return
+    index.upsert(f"issue:{_get(issue, 'id')}", _get(issue, "solution"), _get(issue, "title"), _get(issue, "content") or "",
+                 {"kind": "issue", "id": _get(issue, "id")})
+
+
+def index_comment(comment, solution: str, index: KnowledgeIndex = None):
+    shared = get_index()
+    index = index or shared
+    if index is shared and not index.loaded:
+        return
+    index.upsert(f"comment:{_get(comment, 'id')}", solution, "", _get(comment, "content"),
+                 {"kind": "comment", "id": _get(comment, "id"), "issue_id": _get(comment, "issue_id")})
+
+
+def unindex(kind: str, id: int):
+    knowledge_index = get_index()
+    if knowledge_index.loaded:
+        knowledge_index.remove(f"{kind}:{id}")
+
+
+# 주기 작업: 다른 워커의 변경 반영 및 세그먼트 기록/교체 (아직 로드하지 않은 워커는 첫 검색 때 로드)
+def refresh() -> dict:
+    knowledge_index = get_index()
+    if not knowledge_index.loaded:
+        return {"loaded": False}
+    knowledge_index.save()
+    return {"loaded": True, "segment": knowledge_index._segment, "docs": len(knowledge_index.keys)}
+
+
+def ensure_loaded(db: Session):
+    knowledge_index = get_index()
+    if knowledge_index.loaded:
+        return
+    with knowledge_index._lock:
+        if knowledge_index.loaded:
+            return
+        if knowledge_index.load():
+            knowledge_index.catch_up(db)
+            knowledge_index.drop_missing(db)
+        else:
+            knowledge_index.rebuild(db)
+
+
+# 지식 검색 ("이전에 어떻게 해결했나")
+@router.get("/knowledge", response_model=List[KnowledgeHit])
+def search_knowledge(
+    q: str = Query(..., min_length=1),
+    solution: Optional[str] = Query(None),
+    k: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    ensure_loaded(db)
+    return get_index().search(q, solution, k)
+
+
+# 앱 안에서 주기 실행 (워커마다, KNOWLEDGE_REFRESH_INTERVAL > 0 일 때)
+jobs.register("knowledge_refresh", "KNOWLEDGE_REFRESH_INTERVAL", refresh)
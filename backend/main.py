@@ -1,27 +1,256 @@
+import asyncio
+import importlib
+import logging
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
-from auth import router as auth_router, get_current_user, users_router
-from clients import router as clients_router
-from works import router as works_router
-from issues import router as issues_router
-
-app = FastAPI()
-
-# CORS 미들웨어 추가
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # 개발 중에는 모든 origin을 허용합니다.
-    allow_credentials=True,
-    allow_methods=["*"],  # 모든 HTTP 메소드를 허용합니다.
-    allow_headers=["*"],  # 모든 HTTP 헤더를 허용합니다.
-)
-
-app.include_router(auth_router)
-app.include_router(clients_router)
-app.include_router(works_router)
-app.include_router(users_router)
-app.include_router(issues_router)
-
-@app.get("/")
-def read_root(current_user=Depends(get_current_user)):
-    return {"message": f"{current_user.name}님, CSD Portal에 오신 것을 환영합니다!"} 
\ No newline at end of file
+from sqlalchemy import text
+import config
+from config import Settings
+
+"""
+앱 생성 (create_app)
+- `uvicorn main:app` 또는 `uvicorn main:create_app --factory`
+- 라우터/미들웨어 모듈은 create_app 안에서 불러오므로 main import만으로는 설정·DB·passlib 등을 로드하지 않음
+- APP_ROUTERS로 이 워커에서 서비스할 라우터만 골라 불러올 수 있음 (비우면 전체)
+- 기동 시(lifespan) 커넥션 풀/자주 쓰는 SQL 문장/bcrypt/지식 검색·고객사 자동완성 인덱스/OpenAPI 스키마를 미리 준비하고 주기 작업·변경 이력 flush 시작
+- /healthz, /readyz(로드밸런서용, 인증 없음)는 APP_ROUTERS와 관계없이 항상 등록
+"""
+
+logger = logging.getLogger(__name__)
+
+# (이름, "모듈:라우터") - 등록 순서대로 include
+ROUTERS = [
+    ("auth", "auth:router"),
+    ("clients", "clients:router"),
+    ("works", "works:router"),
+    ("users", "auth:users_router"),
+    ("issues", "issues:router"),
+    ("batch", "batch:router"),
+    ("partitions", "partitions:router"),
+    ("issue_partitions", "issue_partitions:router"),
+    ("knowledge", "knowledge:router"),
+    ("attachments", "attachments:router"),
+    ("admission", "admission:router"),
+    ("profiling", "profiling:router"),
+    ("reminders", "reminders:router"),
+    ("reports", "reports:router"),
+    ("webhooks", "webhooks:router"),
+    ("purge", "purge:router"),
+]
+
+
+# 워밍업 조회에 쓰는 솔루션 값 (일치하는 행이 없어 결과가 비어 있음)
+WARMUP_SOLUTION = "__warmup__"
+
+
+def _load(target: str):
+    module_name, attr = target.split(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _selected_routers(settings: Settings) -> list:
+    names = {name.strip() for name in settings.APP_ROUTERS.split(",") if name.strip()}
+    unknown = names - {name for name, _ in ROUTERS}
+    if unknown:
+        raise ValueError(f"알 수 없는 라우터: {', '.join(sorted(unknown))}")
+    return [(name, target) for name, target in ROUTERS if not names or name in names]
+
+
+def _prewarm_pool(size: int):
+    from database import get_engine
+
+    engine = get_engine()
+
+    def ping(_):
+        # 동시에 붙잡아야 풀에 size개의 연결이 실제로 만들어짐
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    with ThreadPoolExecutor(max_workers=size) as pool:
+        list(pool.map(ping, range(size)))
+
+
+def _warm_statements():
+    # 자주 쓰는 문장을 한 번씩 실행해 compiled cache/ORM 로딩 경로를 채움 (결과는 버림)
+    from database import SessionLocal
+    import statements
+
+    # 빈 문자열은 "조건 없음"으로 처리되므로 없는 솔루션 값으로 조건이 붙은 문장을 실행 (전체 조회 방지)
+    with SessionLocal() as db:
+        for stmt, params in (
+            statements.user_by_email(""),
+            statements.client_by_id(0),
+            statements.clients_by_solution(WARMUP_SOLUTION),
+            statements.work_by_id(0),
+            statements.works_list(WARMUP_SOLUTION),
+            statements.issue_by_id(WARMUP_SOLUTION, 0),
+            statements.issues_list(WARMUP_SOLUTION),
+            statements.comments_for_issue(WARMUP_SOLUTION, 0),
+        ):
+            db.execute(stmt, params).scalars().first()
+
+
+def _warm_caches(loaded: set):
+    from database import SessionLocal
+
+    if "auth" in loaded:
+        from auth import pwd_context
+        # bcrypt 백엔드 로딩/자체 점검을 첫 로그인 요청 전에 끝냄
+        pwd_context.dummy_verify()
+    if "knowledge" in loaded:
+        from knowledge import ensure_loaded
+        with SessionLocal() as db:
+            ensure_loaded(db)
+    if "clients" in loaded:
+        from suggest import client_names
+        with SessionLocal() as db:
+            client_names.rebuild(db)
+
+
+async def _warmup(app: FastAPI, settings: Settings):
+    steps = [
+        ("pool", lambda: _prewarm_pool(settings.DB_POOL_SIZE)),
+        ("statements", _warm_statements),
+        ("caches", lambda: _warm_caches(app.state.routers)),
+    ]
+    for name, step in steps:
+        try:
+            await run_in_threadpool(step)
+        except Exception:
+            # DB가 아직 준비되지 않았어도 기동은 계속 (첫 요청에서 다시 연결)
+            logger.warning("warmup step %s failed", name, exc_info=True)
+    # 첫 /docs 요청에서 스키마를 만들지 않도록 미리 생성 (app.openapi_schema에 캐시됨)
+    app.openapi()
+
+
+def _drain_on_sigterm(seconds: float):
+    """SIGTERM을 받으면 바로 종료하지 않고 /readyz를 503(draining)으로 바꾼 뒤 seconds초 뒤에 원래 핸들러(uvicorn 종료)를 호출
+    (uvicorn은 종료 신호를 받으면 곧바로 수신을 멈추므로 lifespan 종료 단계에서는 probe가 draining을 볼 수 없음)"""
+    from health import health_monitor
+
+    if seconds <= 0 or threading.current_thread() is not threading.main_thread():
+        return None
+    original = signal.getsignal(signal.SIGTERM)
+    if not callable(original):
+        return None
+    loop = asyncio.get_running_loop()
+
+    def forward(signum, frame):
+        signal.signal(signal.SIGTERM, original)
+        original(signum, frame)
+
+    def handler(signum, frame):
+        # 대기 중에 한 번 더 받으면 바로 종료
+        if health_monitor.draining:
+            forward(signum, frame)
+            return
+        health_monitor.draining = True
+        logger.info("SIGTERM received, draining for %.1fs before shutdown", seconds)
+        loop.call_soon_threadsafe(loop.call_later, seconds, forward, signum, None)
+
+    signal.signal(signal.SIGTERM, handler)
+    return original
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import jobs
+    from database import dispose_engine
+    from health import health_monitor
+
+    settings = app.state.settings
+    loop_watch = asyncio.create_task(health_monitor.watch_loop(settings.READY_LOOP_LAG_INTERVAL), name="health:loop_lag")
+    if settings.APP_WARMUP:
+        await _warmup(app, settings)
+    # 수정 API를 불러온 워커면 변경 이력 flush 시작 (이전 프로세스가 남긴 저널도 저장)
+    audit = sys.modules.get("audit")
+    if audit is not None:
+        audit.audit_log.start()
+    tasks = jobs.start_all()
+    original_sigterm = _drain_on_sigterm(settings.READY_DRAIN_SECONDS)
+    try:
+        yield
+    finally:
+        if original_sigterm is not None:
+            signal.signal(signal.SIGTERM, original_sigterm)
+        health_monitor.draining = True
+        loop_watch.cancel()
+        await jobs.stop_all(tasks)
+        if audit is not None:
+            await run_in_threadpool(audit.audit_log.close)
+        webhooks = sys.modules.get("webhooks")
+        if webhooks is not None:
+            await webhooks.sender.close()
+        dispose_engine()
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = config.configure(settings) if settings is not None else config.get_settings()
+
+    from database import get_engine
+    from tracing import TracingMiddleware, setup_tracing
+    from profiling import ProfilingMiddleware
+    from idempotency import IdempotencyMiddleware
+    from admission import AdmissionControlMiddleware
+    from health import InFlightMiddleware, router as health_router
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+
+    # 분산 트레이싱 (TRACING_ENABLED일 때만 동작)
+    setup_tracing(get_engine())
+
+    # 샘플링/서명 헤더 요청 프로파일링 (가장 안쪽에서 핸들러 실행 구간만 측정)
+    app.add_middleware(ProfilingMiddleware)
+
+    # POST 재시도/중복 제출 방지 (재전송 응답에도 CORS 헤더가 붙도록 CORS보다 먼저 등록)
+    app.add_middleware(IdempotencyMiddleware)
+
+    # 과부하 시 등급별로 요청을 대기/차단 (CORS보다 안쪽이라 429/503에도 CORS 헤더가 붙음)
+    app.add_middleware(AdmissionControlMiddleware)
+
+    # 요청 span (수용 제어 대기 시간까지 포함되도록 CORS 바로 안쪽에 등록)
+    app.add_middleware(TracingMiddleware)
+
+    # /readyz 판단용 처리 중 요청 수 (수용 제어 대기 중인 요청까지 세도록 그 바깥에 등록)
+    app.add_middleware(InFlightMiddleware)
+
+    # CORS 미들웨어 추가
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # 개발 중에는 모든 origin을 허용합니다.
+        allow_credentials=True,
+        allow_methods=["*"],  # 모든 HTTP 메소드를 허용합니다.
+        allow_headers=["*"],  # 모든 HTTP 헤더를 허용합니다.
+    )
+
+    app.include_router(health_router)
+
+    app.state.routers = set()
+    for name, target in _selected_routers(settings):
+        app.include_router(_load(target))
+        app.state.routers.add(name)
+
+    from auth import get_current_user
+
+    @app.get("/")
+    def read_root(current_user=Depends(get_current_user)):
+        return {"message": f"{current_user.name}님, CSD Portal에 오신 것을 환영합니다!"}
+
+    return app
+
+
+# `uvicorn main:app` 호환: main.app에 처음 접근할 때 앱 생성
+def __getattr__(name: str):
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
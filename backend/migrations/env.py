@@ -66,19 +66,32 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # lockcheck.py 등에서 연결을 넘겨주면 그 연결로 실행
+    connection = config.attributes.get("connection", None)
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
+    # lock_timeout: 잠금을 바로 못 얻으면 기다리며 뒤따르는 API 쿼리를 막는 대신 실패 (migrations/online.py 참고)
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args={"options": f"-c lock_timeout={settings.MIGRATION_LOCK_TIMEOUT_MS}"},
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        do_run_migrations(connection)
+
 
-        with context.begin_transaction():
-            context.run_migrations()
+def do_run_migrations(connection) -> None:
+    # 리비전마다 커밋해 잠금을 오래 들고 있지 않음 (CONCURRENTLY 등 autocommit_block 사용 리비전도 안전)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, transaction_per_migration=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
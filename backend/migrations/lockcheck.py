@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+from config import settings
+
+"""
+마이그레이션 잠금 시간 측정
+- 빈 DB(전용 DB, 운영 DB 금지)에 리비전을 하나씩 올리면서, 필요한 테이블이 생기는 시점에 대량 데이터(--rows)를 채움
+- 마이그레이션 연결이 잡은 테이블 잠금을 --interval초마다 pg_locks에서 읽어 리비전/테이블/잠금 모드별 최대 유지 시간 기록
+- 동시에 probe 연결이 주요 테이블을 계속 조회해 API 쿼리가 실제로 막힌 시간(최대 응답 시간)도 기록
+- 쓰기를 막는 잠금(SHARE 이상)을 --threshold-ms보다 오래 잡은 리비전이 있으면 종료 코드 1 (CI에서 새 리비전 검사용)
+- 사용: `python migrations/lockcheck.py --url postgresql+psycopg://user:pw@localhost/csd_lockcheck --rows 2000000 --report data/lockcheck.json`
+  (데이터를 채운 뒤 리비전만 다시 보려면 `--from <revision>`으로 그 이전 리비전은 측정 없이 올림)
+"""
+
+# API 쓰기(RowExclusiveLock)와 충돌하는 잠금, ACCESS EXCLUSIVE는 읽기까지 막음
+BLOCKING_MODES = {"ShareLock", "ShareRowExclusiveLock", "ExclusiveLock", "AccessExclusiveLock"}
+PROBE_TABLES = ("clients", "works", "issues", "issue_comments")
+SOLUTIONS = ("dynatrace", "newrelic", "appdynamics", "netscout")
+
+# 테이블별 채울 컬럼 (해당 리비전에 있는 컬럼만 사용), n은 generate_series 행 번호
+SEED_COLUMNS = {
+    "clients": {
+        "name": "'client-' || n",
+        "contract_type": "'annual'",
+        "license_type": "'enterprise'",
+        "license_start": "current_date - 365",
+        "license_end": "current_date + (n % 720)",
+        "solution": "(ARRAY{solutions})[1 + n % {count}]",
+    },
+    "works": {
+        "client": "'client-' || (n % {clients})",
+        "date": "current_date - (n % 1095)",
+        "solution": "(ARRAY{solutions})[1 + (n % {clients}) % {count}]",
+        "content": "'작업 내용 ' || md5(n::text)",
+    },
+    "issues": {
+        "solution": "(ARRAY{solutions})[1 + (n % {clients}) % {count}]",
+        "title": "'이슈 ' || md5(n::text)",
+        "client": "'client-' || (n % {clients})",
+        "assignee": "'user-' || (n % 50)",
+        "status": "(ARRAY['in_progress','waiting','resolved'])[1 + n % 3]::issuestatus",
+        "priority": "(ARRAY['high','medium','low'])[1 + n % 3]::issuepriority",
+        "content": "repeat(md5(n::text), 4)",
+        "created_at": "now() - (n % 1095) * interval '1 day'",
+        "due_date": "CASE WHEN n % 4 = 0 THEN now() + (n % 30 - 15) * interval '1 day' END",
+    },
+    "issue_comments": {
+        "issue_id": "1 + n % {issues}",
+        "author": "'user-' || (n % 50)",
+        "content": "'댓글 ' || md5(n::text)",
+        "created_at": "now() - (n % 1095) * interval '1 day'",
+    },
+}
+
+
+class LockMonitor(threading.Thread):
+    """마이그레이션 연결(pid)이 잡은 테이블 잠금과 probe 조회 시간을 주기적으로 기록"""
+
+    def __init__(self, engine, pid: int, interval: float, probe: bool):
+        super().__init__(daemon=True)
+        self.engine, self.pid, self.interval, self.probe = engine, pid, interval, probe
+        self.revision: Optional[str] = None
+        self.locks: Dict[str, Dict[tuple, dict]] = {}
+        self.probes: Dict[str, float] = {}
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+
+    def run(self):
+        held: Dict[tuple, float] = {}
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn, \
+                self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as probe:
+            while not self._stop.is_set():
+                revision = self.revision
+                now = time.monotonic()
+                rows = conn.execute(text(
+                    "SELECT c.relname, l.mode FROM pg_locks l JOIN pg_class c ON c.oid = l.relation "
+                    "WHERE l.pid = :pid AND l.granted AND l.locktype = 'relation' "
+                    "AND c.relnamespace <> 'pg_catalog'::regnamespace AND c.relkind IN ('r', 'p')"
+                ), {"pid": self.pid}).all()
+                current = {(revision, relation, mode) for relation, mode in rows}
+                for key in current:
+                    held.setdefault(key, now)
+                for key in list(held):
+                    if key not in current:
+                        self._record(key, now - held.pop(key))
+                if self.probe and revision:
+                    self._probe(probe, revision)
+                self._stop.wait(self.interval)
+            now = time.monotonic()
+            for key, since in held.items():
+                self._record(key, now - since)
+
+    def _record(self, key: tuple, seconds: float):
+        revision, relation, mode = key
+        entry = self.locks.setdefault(revision, {}).setdefault((relation, mode), {"max_ms": 0.0, "total_ms": 0.0, "count": 0})
+        # 폴링 간격만큼은 측정 오차
+        ms = (seconds + self.interval) * 1000
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["total_ms"] += ms
+        entry["count"] += 1
+
+    def _probe(self, conn, revision: str):
+        for table in PROBE_TABLES:
+            started = time.monotonic()
+            try:
+                conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1"))
+            except Exception:
+                continue  # 아직 없거나 이름이 바뀌는 중인 테이블
+            ms = (time.monotonic() - started) * 1000
+            self.probes[revision] = max(self.probes.get(revision, 0.0), ms)
+
+
+def _seed_sql(table: str, columns: List[str], rows: int, params: dict) -> str:
+    exprs = SEED_COLUMNS[table]
+    names = [name for name in exprs if name in columns]
+    values = [exprs[name].format(**params) for name in names]
+    return f"INSERT INTO {table} ({', '.join(names)}) SELECT {', '.join(values)} FROM generate_series(1, {rows}) AS n"
+
+
+def seed(engine, rows: int):
+    clients = max(rows // 100, 10)
+    params = {"solutions": json.dumps(list(SOLUTIONS)).replace('"', "'"), "count": len(SOLUTIONS), "clients": clients, "issues": rows}
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table, count in (("clients", clients), ("works", rows), ("issues", rows), ("issue_comments", rows * 2)):
+            columns = [column["name"] for column in inspector.get_columns(table)]
+            started = time.monotonic()
+            conn.execute(text(_seed_sql(table, columns, count, params)))
+            print(f"seeded {table}: {count} rows ({time.monotonic() - started:.1f}s)", file=sys.stderr)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="마이그레이션 리비전별 잠금 시간 측정 (전용 빈 DB에서 실행)")
+    parser.add_argument("--url", required=True, help="측정용 DB URL (운영 DB 금지)")
+    parser.add_argument("--rows", type=int, default=1000000, help="works/issues에 채울 행 수 (댓글은 2배)")
+    parser.add_argument("--from", dest="start", help="이 리비전까지는 측정 없이 올림")
+    parser.add_argument("--to", default="head")
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--threshold-ms", type=float, default=1000)
+    parser.add_argument("--no-probe", action="store_true")
+    parser.add_argument("--report", help="JSON 결과 파일")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url, poolclass=NullPool, connect_args={"options": f"-c lock_timeout={settings.MIGRATION_LOCK_TIMEOUT_MS}"})
+    cfg = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    script = ScriptDirectory.from_config(cfg)
+    revisions = [rev.revision for rev in reversed(list(script.walk_revisions("base", args.to)))]
+
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT to_regclass('alembic_version')")).scalar() is not None:
+            print("빈 DB에서 실행해야 합니다 (alembic_version 테이블이 이미 있음).", file=sys.stderr)
+            return 2
+
+    migration = engine.connect()
+    pid = migration.execute(text("SELECT pg_backend_pid()")).scalar()
+    migration.commit()
+    cfg.attributes["connection"] = migration
+    monitor = LockMonitor(engine, pid, args.interval, probe=not args.no_probe)
+    monitor.start()
+
+    results, seeded, measuring = [], False, args.start is None
+    try:
+        for revision in revisions:
+            monitor.revision = revision if measuring else None
+            started = time.monotonic()
+            command.upgrade(cfg, revision)
+            seconds = time.monotonic() - started
+            if migration.in_transaction():
+                migration.commit()
+            if measuring:
+                results.append({"revision": revision, "seeded": seeded, "seconds": round(seconds, 3)})
+            if revision == args.start:
+                measuring = True
+            if not seeded and all(inspect(engine).has_table(table) for table in SEED_COLUMNS):
+                seed(engine, args.rows)
+                seeded = True
+    finally:
+        monitor.stop()
+        migration.close()
+
+    failed = False
+    for result in results:
+        locks = monitor.locks.get(result["revision"], {})
+        result["locks"] = [
+            {"relation": relation, "mode": mode, **{k: round(v, 1) if isinstance(v, float) else v for k, v in stats.items()}}
+            for (relation, mode), stats in sorted(locks.items(), key=lambda item: -item[1]["max_ms"])
+        ]
+        blocking = [lock for lock in result["locks"] if lock["mode"] in BLOCKING_MODES]
+        result["max_blocking_ms"] = max((lock["max_ms"] for lock in blocking), default=0.0)
+        result["probe_max_ms"] = round(monitor.probes.get(result["revision"], 0.0), 1)
+        result["over_threshold"] = result["seeded"] and result["max_blocking_ms"] > args.threshold_ms
+        failed = failed or result["over_threshold"]
+        worst = blocking[0] if blocking else None
+        print(
+            f"{'!!' if result['over_threshold'] else '  '} {result['revision']} {result['seconds']:>8.2f}s "
+            f"blocking {result['max_blocking_ms']:>9.1f}ms probe {result['probe_max_ms']:>9.1f}ms"
+            + (f"  {worst['relation']} {worst['mode']}" if worst else "")
+        )
+
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "threshold_ms": args.threshold_ms, "revisions": results}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import logging
+import time
+from typing import Callable, Optional, Sequence
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+from config import settings
+
+"""
+대용량 테이블(works, issues 등)용 무중단 마이그레이션 헬퍼
+- env.py가 모든 마이그레이션 연결에 lock_timeout(MIGRATION_LOCK_TIMEOUT_MS)을 걸고 리비전마다 트랜잭션을 나눔
+  (잠금을 못 얻으면 API 쿼리를 뒤에 줄 세우는 대신 바로 실패 -> with_lock_retry로 재시도)
+- 인덱스: create_index_concurrently / drop_index_concurrently (파티션 테이블은 파티션별 CONCURRENTLY 후 ATTACH)
+- 제약: add_foreign_key_not_valid, set_not_null (NOT VALID로 추가 후 별도 트랜잭션에서 VALIDATE)
+- 데이터: backfill (키 범위 배치 UPDATE, 배치마다 커밋 + 쉬기, 배치가 느리면 크기를 줄임, 진행률 로그)
+- 컬럼 변경은 expand/contract 두 단계로:
+    1) expand 리비전: expand_column으로 새 컬럼 추가(+ 옛 컬럼 쓰기를 따라가는 트리거) 후 backfill
+    2) 새 컬럼을 읽고 쓰는 코드 배포
+    3) contract 리비전: contract_column으로 트리거와 옛 컬럼 제거
+- 한 리비전에는 강한 잠금(ACCESS EXCLUSIVE 등)을 잡는 문장을 하나만 두고, 데이터 변경은 backfill로 분리
+- 사용: `from migrations.online import create_index_concurrently, backfill`
+- 잠금 시간 확인: `python migrations/lockcheck.py --url ...` (빈 DB에 리비전을 하나씩 올리며 대량 데이터 기준 잠금 시간 기록)
+"""
+
+logger = logging.getLogger("alembic.online")
+
+# SQLSTATE 55P03 lock_not_available (lock_timeout 초과)
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _sqlstate(exc: OperationalError) -> Optional[str]:
+    orig = exc.orig
+    return getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+
+
+def with_lock_retry(fn: Callable, attempts: Optional[int] = None, pause: float = 1.0):
+    """fn()이 lock_timeout으로 실패하면 savepoint까지 되돌리고 점점 길게 쉬었다가 다시 시도"""
+    attempts = attempts or settings.MIGRATION_LOCK_RETRIES
+    conn = op.get_bind()
+    # autocommit_block 안에서는 문장마다 커밋되므로 savepoint 없이 재시도
+    autocommit = conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    for attempt in range(1, attempts + 1):
+        savepoint = None if autocommit else conn.begin_nested()
+        try:
+            result = fn()
+            if savepoint is not None:
+                savepoint.commit()
+            return result
+        except OperationalError as exc:
+            if savepoint is not None:
+                savepoint.rollback()
+            if _sqlstate(exc) != LOCK_NOT_AVAILABLE or attempt == attempts:
+                raise
+            logger.warning("lock timeout (attempt %d/%d), retrying in %.1fs", attempt, attempts, pause * attempt)
+            time.sleep(pause * attempt)
+
+
+def _relkind(name: str) -> Optional[str]:
+    return op.get_bind().execute(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}).scalar()
+
+
+def _partitions(table: str) -> list:
+    return list(op.get_bind().execute(
+        sa.text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"),
+        {"table": table},
+    ).scalars())
+
+
+def _drop_invalid_index(name: str):
+    # 이전에 실패한 CREATE INDEX CONCURRENTLY가 남긴 INVALID 인덱스
+    invalid = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_index i WHERE i.indexrelid = to_regclass(:name) AND NOT i.indisvalid AND (SELECT relkind FROM pg_class WHERE oid = i.indexrelid) = 'i'"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _index_sql(name: str, table: str, columns: Sequence[str], unique: bool, using: Optional[str], where: Optional[str], concurrently: bool, only: bool = False) -> str:
+    return " ".join(part for part in (
+        "CREATE", "UNIQUE" if unique else "", "INDEX", "CONCURRENTLY" if concurrently else "", "IF NOT EXISTS", name,
+        "ON", "ONLY" if only else "", table, f"USING {using}" if using else "", f"({', '.join(columns)})", f"WHERE {where}" if where else "",
+    ) if part)
+
+
+def create_index_concurrently(name: str, table: str, columns: Sequence[str], unique: bool = False, using: Optional[str] = None, where: Optional[str] = None):
+    """CREATE INDEX CONCURRENTLY (트랜잭션 밖에서 실행, 쓰기를 막지 않음)
+    columns는 SQL 그대로 (예: ["solution", "date DESC"], ["name gin_trgm_ops"])"""
+    with op.get_context().autocommit_block():
+        if _relkind(table) != "p":
+            _drop_invalid_index(name)
+            op.execute(_index_sql(name, table, columns, unique, using, where, concurrently=True))
+            return
+        # 파티션 테이블은 CONCURRENTLY를 지원하지 않으므로 부모에는 ON ONLY(메타데이터만), 파티션마다 CONCURRENTLY 후 ATTACH
+        op.execute(_index_sql(name, table, columns, unique, using, where, concurrently=False, only=True))
+        for partition in _partitions(table):
+            child = f"{partition}_{name}"[:63]
+            _drop_invalid_index(child)
+            op.execute(_index_sql(child, partition, columns, unique, using, where, concurrently=True))
+            with_lock_retry(lambda: op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def drop_index_concurrently(name: str):
+    with op.get_context().autocommit_block():
+        if _relkind(name) == "I":
+            # 파티션 인덱스는 CONCURRENTLY로 지울 수 없음 (부모 인덱스를 지우면 파티션 인덱스도 함께 삭제)
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        else:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def validate_constraint(table: str, name: str):
+    """NOT VALID로 추가한 제약 검사 (SHARE UPDATE EXCLUSIVE 잠금이라 읽기/쓰기와 함께 진행)"""
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def add_foreign_key_not_valid(name: str, source: str, referent: str, local_cols: Sequence[str], remote_cols: Sequence[str], ondelete: Optional[str] = None):
+    """FK를 NOT VALID로 추가(짧은 잠금, 새 행만 검사)한 뒤 커밋하고 기존 행은 VALIDATE로 검사"""
+    with_lock_retry(lambda: op.create_foreign_key(name, source, referent, list(local_cols), list(remote_cols), ondelete=ondelete, postgresql_not_valid=True))
+    validate_constraint(source, name)
+
+
+def set_not_null(table: str, column: str):
+    """SET NOT NULL의 전체 스캔을 ACCESS EXCLUSIVE 잠금 밖에서 하도록 CHECK 제약을 먼저 검증 (PostgreSQL 12+)"""
+    check = f"{table}_{column}_not_null"[:63]
+    with_lock_retry(lambda: op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({column} IS NOT NULL) NOT VALID"))
+    validate_constraint(table, check)
+    with_lock_retry(lambda: op.alter_column(table, column, nullable=False))
+    op.drop_constraint(check, table, type_="check")
+
+
+def backfill(
+    table: str,
+    set_sql: str,
+    where_sql: str = "true",
+    key: str = "id",
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    params: Optional[dict] = None,
+    attempts: Optional[int] = None,
+) -> int:
+    """key 범위로 나눠 UPDATE {table} SET {set_sql} WHERE {where_sql} 실행 (배치마다 커밋, 행 잠금은 배치 동안만)
+    - 배치가 MIGRATION_BACKFILL_MAX_BATCH_SECONDS보다 오래 걸리면 배치 크기를 절반으로, 아주 빠르면 두 배로(최대 4배)
+    - 배치 사이에 pause초 쉬어 복제 지연/IO를 조절, 5초마다 진행률(키 기준)과 남은 시간 로그
+    - 같은 배치가 lock_timeout으로 attempts번(기본 MIGRATION_LOCK_RETRIES) 연속 실패하면 예외 (배포가 무한히 멈추지 않도록)
+    - where_sql에 "새 컬럼 IS NULL" 같은 조건을 두면 중단 후 다시 실행해도 이어서 처리"""
+    attempts = attempts or settings.MIGRATION_LOCK_RETRIES
+    batch_size = batch_size or settings.MIGRATION_BACKFILL_BATCH
+    pause = settings.MIGRATION_BACKFILL_PAUSE if pause is None else pause
+    max_seconds = settings.MIGRATION_BACKFILL_MAX_BATCH_SECONDS
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        low, high = conn.execute(sa.text(f"SELECT min({key}), max({key}) FROM {table}")).one()
+        if low is None:
+            return 0
+        stmt = sa.text(f"UPDATE {table} SET {set_sql} WHERE {key} >= :_low AND {key} < :_high AND ({where_sql})")
+        size, start, updated, failures = batch_size, low, 0, 0
+        started = last_report = time.monotonic()
+        while start <= high:
+            batch_started = time.monotonic()
+            try:
+                updated += conn.execute(stmt, {**(params or {}), "_low": start, "_high": start + size}).rowcount
+            except OperationalError as exc:
+                failures += 1
+                if _sqlstate(exc) != LOCK_NOT_AVAILABLE or failures >= attempts:
+                    raise
+                wait = max(pause, 1.0) * failures
+                logger.warning("backfill %s: lock timeout at %s=%s (attempt %d/%d), retrying in %.1fs", table, key, start, failures, attempts, wait)
+                time.sleep(wait)
+                continue
+            failures = 0
+            start += size
+            elapsed = time.monotonic() - batch_started
+            if elapsed > max_seconds and size > 100:
+                size //= 2
+            elif elapsed < max_seconds / 4 and size < batch_size * 4:
+                size *= 2
+            now = time.monotonic()
+            if now - last_report >= 5 or start > high:
+                done = min(1.0, (start - low) / (high - low + 1))
+                eta = (now - started) / done * (1 - done) if done else 0
+                logger.info("backfill %s: %.1f%% (%d rows, batch %d, eta %.0fs)", table, done * 100, updated, size, eta)
+                last_report = now
+            time.sleep(pause)
+        return updated
+
+
+def _sync_function(table: str, target: str) -> str:
+    return f"{table}_{target}_sync"[:63]
+
+
+def expand_column(
+    table: str,
+    column: sa.Column,
+    source: Optional[str] = None,
+    expression: Optional[str] = None,
+    backfill_expression: Optional[str] = None,
+    backfill_existing: bool = True,
+):
+    """expand 단계: 새 컬럼을 nullable로 추가(테이블 재작성 없음)하고, source가 있으면
+    옛 컬럼에 쓰는 구버전 코드가 남아 있는 동안 새 컬럼도 채우는 트리거를 건 뒤 기존 행을 backfill
+    expression은 트리거용 NEW.<컬럼> 기준 SQL (기본: NEW.{source}),
+    backfill_expression은 같은 값을 행 기준으로 쓴 SQL (기본: {source}, expression을 주면 함께 줘야 함)"""
+    if expression is not None and backfill_existing and backfill_expression is None:
+        raise ValueError("expression을 주면 기존 행 backfill용 backfill_expression도 필요합니다.")
+    with_lock_retry(lambda: op.add_column(table, column))
+    if source is None:
+        return
+    expression = expression or f"NEW.{source}"
+    backfill_expression = backfill_expression or source
+    function = _sync_function(table, column.name)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.{column.name} := {expression};
+            RETURN NEW;
+        END $$
+    """)
+    with_lock_retry(lambda: op.execute(
+        f"CREATE TRIGGER {function} BEFORE INSERT OR UPDATE OF {source} ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()"
+    ))
+    if backfill_existing:
+        backfill(table, f"{column.name} = {backfill_expression}", f"{column.name} IS DISTINCT FROM ({backfill_expression})")
+
+
+def contract_column(table: str, column: str, replaced_by: Optional[str] = None):
+    """contract 단계: 새 컬럼을 쓰는 코드가 모두 배포된 뒤 동기화 트리거와 옛 컬럼 제거"""
+    if replaced_by is not None:
+        function = _sync_function(table, replaced_by)
+        with_lock_retry(lambda: op.execute(f"DROP TRIGGER IF EXISTS {function} ON {table}"))
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    with_lock_retry(lambda: op.drop_column(table, column))
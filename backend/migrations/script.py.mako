@@ -10,6 +10,7 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 ${imports if imports else ""}
+# works/issues 등 큰 테이블은 migrations/online.py 헬퍼 사용 (CONCURRENTLY 인덱스, 배치 backfill, expand/contract)
 
 # revision identifiers, used by Alembic.
 revision: str = ${repr(up_revision)}
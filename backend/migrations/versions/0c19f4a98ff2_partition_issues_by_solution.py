@@ -0,0 +1,105 @@
+"""partition issues by solution
+
+Revision ID: 0c19f4a98ff2
+Revises: fab8713f4b81
+Create Date: 2025-08-13 10:27:05.184362
+
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c19f4a98ff2'
+down_revision: Union[str, Sequence[str], None] = 'fab8713f4b81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = "deleted_at IS NULL"
+TOMBSTONE = "deleted_at IS NOT NULL"
+OPEN_DUE = "status <> 'resolved' AND due_date IS NOT NULL AND deleted_at IS NULL"
+
+COLUMNS = "id, solution, title, client, assignee, status, priority, content, tags, version, created_at, due_date, updated_at, deleted_at"
+
+
+def _issues_table(name: str, primary_key: str, partition_by: str = "") -> str:
+    return f"""
+        CREATE TABLE {name} (
+            id INTEGER NOT NULL DEFAULT nextval('issues_id_seq'),
+            solution VARCHAR NOT NULL,
+            title VARCHAR NOT NULL,
+            client VARCHAR NOT NULL,
+            assignee VARCHAR NOT NULL,
+            status issuestatus NOT NULL,
+            priority issuepriority NOT NULL,
+            content VARCHAR,
+            tags JSONB,
+            version INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            due_date TIMESTAMP WITH TIME ZONE,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT issues_pkey PRIMARY KEY ({primary_key})
+        ) {partition_by}
+    """
+
+
+# issue_partitions.partition_name과 같은 규칙 (앱 코드가 바뀌어도 이 리비전 결과는 그대로 유지)
+def _partition_name(solution: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", solution.lower()).strip("_")[:40]
+    if slug != solution:
+        slug = f"{slug}_{hashlib.md5(solution.encode()).hexdigest()[:8]}".lstrip("_")
+    return f"issues_{slug}"
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_issues_id'), 'issues', ['id'], unique=False)
+    op.create_index(op.f('ix_issues_solution'), 'issues', ['solution'], unique=False)
+    op.create_index('ix_issues_tags', 'issues', ['tags'], unique=False, postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'})
+    op.create_index('ix_issues_open_due_date', 'issues', ['due_date', 'solution'], unique=False, postgresql_where=sa.text(OPEN_DUE))
+    op.create_index('ix_issues_solution_live', 'issues', ['solution', 'created_at'], unique=False, postgresql_where=sa.text(LIVE))
+    op.create_index('ix_issues_deleted_at', 'issues', ['deleted_at'], unique=False, postgresql_where=sa.text(TOMBSTONE))
+    op.create_index('ix_issues_solution_client', 'issues', ['solution', 'client'], unique=False, postgresql_where=sa.text(LIVE))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 파티션 테이블로는 제자리 변환이 안 되므로 works(af01449bd970)와 같이 새 테이블로 복사 (점검 시간에 실행)
+    conn = op.get_bind()
+    op.drop_constraint('issue_comments_issue_id_fkey', 'issue_comments', type_='foreignkey')
+    op.execute("ALTER TABLE issues RENAME TO issues_legacy")
+    op.execute("ALTER TABLE issues_legacy RENAME CONSTRAINT issues_pkey TO issues_legacy_pkey")
+    # 파티션 키(solution)는 기본키에 포함되어야 하므로 (id, solution)을 기본키로 사용
+    op.execute(_issues_table('issues', 'id, solution', 'PARTITION BY LIST (solution)'))
+    op.execute("ALTER SEQUENCE issues_id_seq OWNED BY issues.id")
+
+    # 기존 솔루션마다 파티션 생성 (이후 새 솔루션은 issue_partitions가 첫 등록 때 생성, 기본 파티션은 두지 않음)
+    solutions = conn.execute(sa.text("SELECT DISTINCT solution FROM issues_legacy ORDER BY solution")).scalars().all()
+    for solution in solutions:
+        value = sa.literal(solution, sa.String).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        op.execute(f"CREATE TABLE {_partition_name(solution)} PARTITION OF issues FOR VALUES IN ({value})")
+
+    op.execute(f"INSERT INTO issues ({COLUMNS}) SELECT {COLUMNS} FROM issues_legacy")
+    # 인덱스는 복사 후에 만드는 편이 빠름 (legacy 인덱스 이름과 겹치지 않도록 legacy를 먼저 삭제)
+    op.drop_table('issues_legacy')
+    _create_indexes()
+    # 댓글 FK는 다음 리비전(3f8a2c6d9b14)에서 (issue_id, solution)으로 다시 만듦
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE issues RENAME TO issues_partitioned")
+    op.execute("ALTER TABLE issues_partitioned RENAME CONSTRAINT issues_pkey TO issues_partitioned_pkey")
+    for name in ('ix_issues_id', 'ix_issues_solution', 'ix_issues_tags', 'ix_issues_open_due_date',
+                 'ix_issues_solution_live', 'ix_issues_deleted_at', 'ix_issues_solution_client'):
+        op.execute(f"DROP INDEX {name}")
+    op.execute(_issues_table('issues', 'id'))
+    op.execute("ALTER SEQUENCE issues_id_seq OWNED BY issues.id")
+    op.execute(f"INSERT INTO issues ({COLUMNS}) SELECT {COLUMNS} FROM issues_partitioned")
+    op.execute("DROP TABLE issues_partitioned CASCADE")
+    _create_indexes()
+    op.create_foreign_key('issue_comments_issue_id_fkey', 'issue_comments', 'issues', ['issue_id'], ['id'], ondelete='CASCADE')
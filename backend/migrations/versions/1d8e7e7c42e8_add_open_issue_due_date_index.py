@@ -0,0 +1,28 @@
+"""add open issue due date index
+
+Revision ID: 1d8e7e7c42e8
+Revises: 26e22ae5f3db
+Create Date: 2025-08-07 10:12:44.208731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d8e7e7c42e8'
+down_revision: Union[str, Sequence[str], None] = '26e22ae5f3db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_issues_open_due_date', 'issues', ['due_date', 'solution'], unique=False, postgresql_where=sa.text("status <> 'resolved' AND due_date IS NOT NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_issues_open_due_date', table_name='issues', postgresql_where=sa.text("status <> 'resolved' AND due_date IS NOT NULL"))
@@ -0,0 +1,29 @@
+"""add client name trigram index
+
+Revision ID: 3a92c75d7488
+Revises: e55e20e5e175
+Create Date: 2025-08-08 09:41:52.063177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a92c75d7488'
+down_revision: Union[str, Sequence[str], None] = 'e55e20e5e175'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_clients_name_trgm', 'clients', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clients_name_trgm', table_name='clients', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
@@ -0,0 +1,45 @@
+"""key issue comments by solution
+
+Revision ID: 3f8a2c6d9b14
+Revises: 0c19f4a98ff2
+Create Date: 2025-08-13 10:41:22.906513
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import add_foreign_key_not_valid, backfill, set_not_null
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2c6d9b14'
+down_revision: Union[str, Sequence[str], None] = '0c19f4a98ff2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 댓글에 솔루션 키 추가 후 (issue_id, solution)으로 FK 재생성 (파티션 전환 0c19f4a98ff2와 분리)
+    # backfill이 배치마다 커밋하므로 중간에 실패해도 다시 실행하면 남은 단계부터 이어지도록 각 단계를 반복 실행 가능하게 둠
+    op.execute("ALTER TABLE issue_comments ADD COLUMN IF NOT EXISTS solution VARCHAR")
+    backfill(
+        'issue_comments',
+        "solution = (SELECT i.solution FROM issues i WHERE i.id = issue_comments.issue_id)",
+        where_sql="solution IS NULL",
+    )
+    op.execute("ALTER TABLE issue_comments DROP CONSTRAINT IF EXISTS issue_comments_solution_not_null")
+    set_not_null('issue_comments', 'solution')
+    op.execute("ALTER TABLE issue_comments DROP CONSTRAINT IF EXISTS issue_comments_issue_id_fkey")
+    add_foreign_key_not_valid(
+        'issue_comments_issue_id_fkey', 'issue_comments', 'issues',
+        ['issue_id', 'solution'], ['id', 'solution'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('issue_comments_issue_id_fkey', 'issue_comments', type_='foreignkey')
+    op.drop_column('issue_comments', 'solution')
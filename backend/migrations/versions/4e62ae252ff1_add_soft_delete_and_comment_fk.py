@@ -0,0 +1,98 @@
+"""add soft delete and comment fk
+
+Revision ID: 4e62ae252ff1
+Revises: 6d0b439b67ad
+Create Date: 2025-08-09 11:04:37.519204
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from config import settings
+from migrations.online import add_foreign_key_not_valid, create_index_concurrently, drop_index_concurrently, with_lock_retry
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e62ae252ff1'
+down_revision: Union[str, Sequence[str], None] = '6d0b439b67ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = "deleted_at IS NULL"
+TOMBSTONE = "deleted_at IS NOT NULL"
+OPEN_DUE = "status <> 'resolved' AND due_date IS NOT NULL"
+
+
+def _replace_index(name: str, table: str, columns: list, unique: bool = False, where: str = None):
+    # 새 정의를 임시 이름으로 CONCURRENTLY 생성 -> 기존 인덱스 삭제 -> 이름 변경 (교체 중에도 기존 인덱스 사용)
+    create_index_concurrently(f"{name}_new", table, columns, unique=unique, where=where)
+    drop_index_concurrently(name)
+    with_lock_retry(lambda: op.execute(f"ALTER INDEX {name}_new RENAME TO {name}"))
+
+
+def _delete_orphan_comments() -> int:
+    """이미 삭제된 이슈에 남아 있던 댓글을 id 범위로 나눠 삭제 (배치마다 커밋)"""
+    batch = settings.MIGRATION_BACKFILL_BATCH
+    deleted = 0
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        low, high = conn.execute(sa.text("SELECT min(id), max(id) FROM issue_comments")).one()
+        if low is None:
+            return 0
+        for start in range(low, high + 1, batch):
+            deleted += conn.execute(sa.text(
+                "DELETE FROM issue_comments c WHERE c.id >= :low AND c.id < :high "
+                "AND NOT EXISTS (SELECT 1 FROM issues i WHERE i.id = c.issue_id)"
+            ), {"low": start, "high": start + batch}).rowcount
+            time.sleep(settings.MIGRATION_BACKFILL_PAUSE)
+    return deleted
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nullable 컬럼 추가는 테이블을 다시 쓰지 않음
+    for table in ('clients', 'issues', 'issue_comments'):
+        with_lock_retry(lambda: op.add_column(table, sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True)))
+
+    # 삭제 표시된 고객사와 같은 이름으로 다시 등록할 수 있도록 유일 조건을 살아있는 행으로 한정
+    # (부분 유일 인덱스를 먼저 만든 뒤 기존 제약을 지워 유일 조건이 빠지는 구간이 없게 함)
+    create_index_concurrently('uix_name_solution_live', 'clients', ['name', 'solution'], unique=True, where=LIVE)
+    with_lock_retry(lambda: op.drop_constraint('uix_name_solution', 'clients', type_='unique'))
+    with_lock_retry(lambda: op.execute("ALTER INDEX uix_name_solution_live RENAME TO uix_name_solution"))
+    create_index_concurrently('ix_clients_solution_live', 'clients', ['solution', 'name'], where=LIVE)
+    create_index_concurrently('ix_clients_deleted_at', 'clients', ['deleted_at'], where=TOMBSTONE)
+
+    _replace_index('ix_issues_open_due_date', 'issues', ['due_date', 'solution'], where=f"{OPEN_DUE} AND {LIVE}")
+    create_index_concurrently('ix_issues_solution_live', 'issues', ['solution', 'created_at'], where=LIVE)
+    create_index_concurrently('ix_issues_deleted_at', 'issues', ['deleted_at'], where=TOMBSTONE)
+
+    create_index_concurrently('ix_issue_comments_live', 'issue_comments', ['issue_id', 'created_at'], where=LIVE)
+    create_index_concurrently('ix_issue_comments_deleted_at', 'issue_comments', ['deleted_at'], where=TOMBSTONE)
+
+    # 이미 삭제된 이슈에 남아 있던 댓글 정리 후 FK 추가
+    # NOT VALID로 추가(짧은 잠금)해 커밋한 뒤, VALIDATE는 별도 트랜잭션에서 쓰기를 막지 않는 잠금으로 기존 행 검사
+    _delete_orphan_comments()
+    add_foreign_key_not_valid('issue_comments_issue_id_fkey', 'issue_comments', 'issues', ['issue_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('issue_comments_issue_id_fkey', 'issue_comments', type_='foreignkey')
+    op.drop_index('ix_issue_comments_deleted_at', table_name='issue_comments', postgresql_where=sa.text(TOMBSTONE))
+    op.drop_index('ix_issue_comments_live', table_name='issue_comments', postgresql_where=sa.text(LIVE))
+    op.drop_index('ix_issues_deleted_at', table_name='issues', postgresql_where=sa.text(TOMBSTONE))
+    op.drop_index('ix_issues_solution_live', table_name='issues', postgresql_where=sa.text(LIVE))
+    op.drop_index('ix_issues_open_due_date', table_name='issues', postgresql_where=sa.text(f"{OPEN_DUE} AND {LIVE}"))
+    op.create_index('ix_issues_open_due_date', 'issues', ['due_date', 'solution'], unique=False, postgresql_where=sa.text(OPEN_DUE))
+    op.drop_index('ix_clients_deleted_at', table_name='clients', postgresql_where=sa.text(TOMBSTONE))
+    op.drop_index('ix_clients_solution_live', table_name='clients', postgresql_where=sa.text(LIVE))
+    op.drop_index('uix_name_solution', table_name='clients', postgresql_where=sa.text(LIVE))
+    # 삭제 표시된 행이 남아 있으면 유일 조건이 깨질 수 있으므로 먼저 지움 (issues 삭제 시 댓글은 FK 없이 따로)
+    op.execute("DELETE FROM issue_comments WHERE deleted_at IS NOT NULL OR issue_id IN (SELECT id FROM issues WHERE deleted_at IS NOT NULL)")
+    op.execute("DELETE FROM issues WHERE deleted_at IS NOT NULL")
+    op.execute("DELETE FROM clients WHERE deleted_at IS NOT NULL")
+    op.create_unique_constraint('uix_name_solution', 'clients', ['name', 'solution'])
+    for table in ('issue_comments', 'issues', 'clients'):
+        op.drop_column(table, 'deleted_at')
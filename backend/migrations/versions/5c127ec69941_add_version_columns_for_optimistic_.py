@@ -0,0 +1,33 @@
+"""add version columns for optimistic concurrency
+
+Revision ID: 5c127ec69941
+Revises: 830ef4554bd6
+Create Date: 2025-07-31 11:05:48.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c127ec69941'
+down_revision: Union[str, Sequence[str], None] = '830ef4554bd6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 상수 기본값이므로 테이블 재작성 없이 추가됨
+    op.add_column('clients', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('works', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('issues', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('issues', 'version')
+    op.drop_column('works', 'version')
+    op.drop_column('clients', 'version')
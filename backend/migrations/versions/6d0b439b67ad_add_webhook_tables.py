@@ -0,0 +1,62 @@
+"""add webhook tables
+
+Revision ID: 6d0b439b67ad
+Revises: 3a92c75d7488
+Create Date: 2025-08-08 15:27:10.882461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '6d0b439b67ad'
+down_revision: Union[str, Sequence[str], None] = '3a92c75d7488'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('webhook_subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('solution', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('secret', sa.String(), nullable=False),
+    sa.Column('events', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('max_concurrency', sa.Integer(), server_default='2', nullable=False),
+    sa.Column('batch_size', sa.Integer(), server_default='20', nullable=False),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_subscriptions_id'), 'webhook_subscriptions', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_subscriptions_solution'), 'webhook_subscriptions', ['solution'], unique=False)
+    op.create_table('webhook_outbox',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['subscription_id'], ['webhook_subscriptions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_outbox_subscription_id'), 'webhook_outbox', ['subscription_id'], unique=False)
+    op.create_index('ix_webhook_outbox_due', 'webhook_outbox', ['next_attempt_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_webhook_outbox_due', table_name='webhook_outbox', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_index(op.f('ix_webhook_outbox_subscription_id'), table_name='webhook_outbox')
+    op.drop_table('webhook_outbox')
+    op.drop_index(op.f('ix_webhook_subscriptions_solution'), table_name='webhook_subscriptions')
+    op.drop_index(op.f('ix_webhook_subscriptions_id'), table_name='webhook_subscriptions')
+    op.drop_table('webhook_subscriptions')
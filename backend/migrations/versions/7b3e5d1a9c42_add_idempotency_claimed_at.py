@@ -0,0 +1,29 @@
+"""add idempotency claimed_at
+
+Revision ID: 7b3e5d1a9c42
+Revises: 3f8a2c6d9b14
+Create Date: 2025-08-14 09:12:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e5d1a9c42'
+down_revision: Union[str, Sequence[str], None] = '3f8a2c6d9b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now()는 추가 시점에 한 번만 계산되므로 테이블을 다시 쓰지 않음
+    op.add_column('idempotency_keys', sa.Column('claimed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_keys', 'claimed_at')
@@ -0,0 +1,28 @@
+"""add gin index on issue tags
+
+Revision ID: 830ef4554bd6
+Revises: af01449bd970
+Create Date: 2025-07-29 16:40:27.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '830ef4554bd6'
+down_revision: Union[str, Sequence[str], None] = 'af01449bd970'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_issues_tags', 'issues', ['tags'], unique=False, postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_issues_tags', table_name='issues')
@@ -0,0 +1,106 @@
+"""partition works by date
+
+Revision ID: af01449bd970
+Revises: 219e85924d07
+Create Date: 2025-07-28 10:02:11.413905
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af01449bd970'
+down_revision: Union[str, Sequence[str], None] = '219e85924d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 마이그레이션 시점에 현재 월 이후로 미리 만들어 둘 파티션 수
+MONTHS_AHEAD = 3
+# 현재 월 이전으로 만들 파티션 수 상한 (0202년 같은 오타 날짜 하나로 파티션이 수만 개 생기지 않도록, 그 이전 날짜는 기본 파티션으로)
+MONTHS_BACK = 120
+
+
+def _add_months(d: date, months: int) -> date:
+    total = d.year * 12 + (d.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    op.execute("ALTER TABLE works RENAME TO works_legacy")
+    op.execute("ALTER INDEX ix_works_id RENAME TO ix_works_legacy_id")
+    op.execute("ALTER TABLE works_legacy RENAME CONSTRAINT works_pkey TO works_legacy_pkey")
+    # 파티션 키(date)는 기본키에 포함되어야 하므로 (id, date)를 기본키로 사용
+    op.execute("""
+        CREATE TABLE works (
+            id INTEGER NOT NULL DEFAULT nextval('works_id_seq'),
+            client VARCHAR NOT NULL,
+            date DATE NOT NULL,
+            solution VARCHAR NOT NULL,
+            content VARCHAR NOT NULL,
+            issue VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT works_pkey PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+    """)
+    op.execute("ALTER SEQUENCE works_id_seq OWNED BY works.id")
+    op.create_index(op.f('ix_works_id'), 'works', ['id'], unique=False)
+    op.create_index('ix_works_solution_date', 'works', ['solution', sa.text('date DESC')], unique=False)
+
+    today = date.today().replace(day=1)
+    floor = _add_months(today, -MONTHS_BACK)
+    last = _add_months(today, MONTHS_AHEAD)
+    oldest = conn.execute(
+        sa.text("SELECT min(date) FROM works_legacy WHERE date >= :floor AND date < :last"),
+        {"floor": floor, "last": last},
+    ).scalar()
+    month = (oldest or today).replace(day=1)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE works_{month:%Y_%m} PARTITION OF works "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    # 범위를 벗어난 날짜(오타 등)는 기본 파티션으로
+    op.execute("CREATE TABLE works_default PARTITION OF works DEFAULT")
+
+    op.execute("""
+        INSERT INTO works (id, client, date, solution, content, issue, created_at, updated_at)
+        SELECT id, client, date, solution, content, issue, created_at, updated_at FROM works_legacy
+    """)
+    op.drop_table('works_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE works RENAME TO works_partitioned")
+    op.execute("ALTER TABLE works_partitioned RENAME CONSTRAINT works_pkey TO works_partitioned_pkey")
+    op.drop_index('ix_works_solution_date', table_name='works_partitioned')
+    op.drop_index(op.f('ix_works_id'), table_name='works_partitioned')
+    op.execute("""
+        CREATE TABLE works (
+            id INTEGER NOT NULL DEFAULT nextval('works_id_seq'),
+            client VARCHAR NOT NULL,
+            date DATE NOT NULL,
+            solution VARCHAR NOT NULL,
+            content VARCHAR NOT NULL,
+            issue VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT works_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE works_id_seq OWNED BY works.id")
+    op.create_index(op.f('ix_works_id'), 'works', ['id'], unique=False)
+    op.execute("""
+        INSERT INTO works (id, client, date, solution, content, issue, created_at, updated_at)
+        SELECT id, client, date, solution, content, issue, created_at, updated_at FROM works_partitioned
+    """)
+    op.execute("DROP TABLE works_partitioned CASCADE")
@@ -0,0 +1,41 @@
+"""add activity log table
+
+Revision ID: e55e20e5e175
+Revises: 1d8e7e7c42e8
+Create Date: 2025-08-07 16:03:27.514920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e55e20e5e175'
+down_revision: Union[str, Sequence[str], None] = '1d8e7e7c42e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity_log',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('solution', sa.String(), nullable=True),
+    sa.Column('field', sa.String(), nullable=False),
+    sa.Column('old_value', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('new_value', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('actor', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_activity_log_entity', 'activity_log', ['entity_type', 'entity_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_log_entity', table_name='activity_log')
+    op.drop_table('activity_log')
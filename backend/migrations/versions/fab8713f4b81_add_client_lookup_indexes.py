@@ -0,0 +1,32 @@
+"""add client lookup indexes
+
+Revision ID: fab8713f4b81
+Revises: 4e62ae252ff1
+Create Date: 2025-08-11 09:41:52.730118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.online import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fab8713f4b81'
+down_revision: Union[str, Sequence[str], None] = '4e62ae252ff1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 고객사 개요 조회용 (works는 파티션별 CONCURRENTLY 후 ATTACH)
+    create_index_concurrently('ix_works_solution_client_date', 'works', ['solution', 'client', 'date DESC'])
+    create_index_concurrently('ix_issues_solution_client', 'issues', ['solution', 'client'], where='deleted_at IS NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently('ix_issues_solution_client')
+    drop_index_concurrently('ix_works_solution_client_date')
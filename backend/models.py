@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Date, UniqueConstraint
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Enum, Date, Index, LargeBinary, ForeignKey, ForeignKeyConstraint
+from sqlalchemy.sql import func, text
 from database import Base
 import enum
 from sqlalchemy.dialects.postgresql import JSONB
@@ -9,6 +9,11 @@ DB 모델 정의
 - User, Client, Work, Issue, IssueComment 등 테이블 구조 및 Enum
 """
 
+# 소프트 삭제(deleted_at) 조건 - 살아있는 행만 보는 조회는 LIVE_PREDICATE 부분 인덱스를 사용하고,
+# 삭제 표시된 행은 purge.py가 보관 기간이 지나면 조금씩 실제로 삭제
+LIVE_PREDICATE = "deleted_at IS NULL"
+TOMBSTONE_PREDICATE = "deleted_at IS NOT NULL"
+
 class UserRole(enum.Enum):
     admin = "admin"
     editor = "editor"
@@ -29,7 +34,12 @@ class User(Base):
 class Client(Base):
     __tablename__ = "clients"
     __table_args__ = (
-        UniqueConstraint('name', 'solution', name='uix_name_solution'),
+        # 삭제 표시된 고객사와 같은 이름으로 다시 등록할 수 있도록 살아있는 행에만 유일 조건
+        Index('uix_name_solution', 'name', 'solution', unique=True, postgresql_where=text(LIVE_PREDICATE)),
+        Index('ix_clients_solution_live', 'solution', 'name', postgresql_where=text(LIVE_PREDICATE)),
+        Index('ix_clients_deleted_at', 'deleted_at', postgresql_where=text(TOMBSTONE_PREDICATE)),
+        # 자동완성 폴백(ILIKE '%q%') 용 trigram 인덱스 (pg_trgm 확장 필요)
+        Index('ix_clients_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -45,21 +55,30 @@ class Client(Base):
     location = Column(String, nullable=True)
     memo = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 class Work(Base):
     __tablename__ = "works"
+    # date 기준 월 단위 RANGE 파티션 (partitions.py 참고), 파티션 키는 기본키에 포함
+    __table_args__ = {'postgresql_partition_by': 'RANGE (date)'}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     client = Column(String, nullable=False)
-    date = Column(Date, nullable=False)
+    date = Column(Date, primary_key=True, nullable=False)
     solution = Column(String, nullable=False)
     content = Column(String, nullable=False)
     issue = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+Index('ix_works_solution_date', Work.solution, Work.date.desc())
+# 고객사별 작업내역 조회(고객사 개요)용
+Index('ix_works_solution_client_date', Work.solution, Work.client, Work.date.desc())
+
 class IssueStatus(enum.Enum):
     in_progress = "in_progress"
     waiting = "waiting"
@@ -70,11 +89,28 @@ class IssuePriority(enum.Enum):
     medium = "medium"
     low = "low"
 
+# 마감일이 있는 미해결 이슈 조건 (부분 인덱스 조건과 문자 그대로 같아야 플래너가 인덱스를 사용)
+ISSUE_OPEN_DUE_PREDICATE = "status <> 'resolved' AND due_date IS NOT NULL AND deleted_at IS NULL"
+
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        # tags @> '[...]' 필터용 (jsonb_path_ops는 포함 연산 전용으로 인덱스가 더 작음)
+        Index('ix_issues_tags', 'tags', postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'}),
+        # 미해결 이슈의 마감일 조회용 부분 인덱스 (지연/임박 이슈, 리마인더)
+        Index('ix_issues_open_due_date', 'due_date', 'solution', postgresql_where=text(ISSUE_OPEN_DUE_PREDICATE)),
+        # 목록 조회(솔루션 + 등록일 순)용, 삭제 표시된 이슈는 인덱스에서 제외
+        Index('ix_issues_solution_live', 'solution', 'created_at', postgresql_where=text(LIVE_PREDICATE)),
+        Index('ix_issues_deleted_at', 'deleted_at', postgresql_where=text(TOMBSTONE_PREDICATE)),
+        # 고객사별 이슈 조회(고객사 개요)용
+        Index('ix_issues_solution_client', 'solution', 'client', postgresql_where=text(LIVE_PREDICATE)),
+        # 솔루션별 LIST 파티션 (issues_<솔루션>, 고객사에 등록된 새 솔루션의 파티션은 issue_partitions가 첫 등록 때 생성)
+        {'postgresql_partition_by': 'LIST (solution)'},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    solution = Column(String, nullable=False, index=True)
+    # 파티션 키(solution)는 기본키에 포함되어야 하므로 (id, solution)을 기본키로 사용
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    solution = Column(String, primary_key=True, nullable=False, index=True)
     title = Column(String, nullable=False)
     client = Column(String, nullable=False)
     assignee = Column(String, nullable=False)
@@ -82,15 +118,125 @@ class Issue(Base):
     priority = Column(Enum(IssuePriority), default="medium", nullable=False)
     content = Column(String, nullable=True)
     tags = Column(JSONB, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     due_date = Column(DateTime(timezone=True), nullable=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
 class IssueComment(Base):
     __tablename__ = "issue_comments"
+    __table_args__ = (
+        Index('ix_issue_comments_live', 'issue_id', 'created_at', postgresql_where=text(LIVE_PREDICATE)),
+        Index('ix_issue_comments_deleted_at', 'deleted_at', postgresql_where=text(TOMBSTONE_PREDICATE)),
+        # issues 기본키가 (id, solution)이므로 FK도 솔루션을 함께 참조
+        ForeignKeyConstraint(['issue_id', 'solution'], ['issues.id', 'issues.solution'], ondelete="CASCADE", name="issue_comments_issue_id_fkey"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, nullable=False, index=True)
+    solution = Column(String, nullable=False)
     author = Column(String, nullable=False)
     content = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+# 첨부파일 메타데이터 (파일 본문은 sha256 기준으로 저장소에 한 번만 저장)
+class Attachment(Base):
+    __tablename__ = "attachments"
+    __table_args__ = (
+        Index('ix_attachments_owner', 'owner_type', 'owner_id'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_type = Column(String, nullable=False)  # issue | work
+    owner_id = Column(Integer, nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    uploaded_by = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# 진행 중인 분할 업로드 (받은 바이트 수는 저장소의 임시 파일 크기로 관리)
+class AttachmentUpload(Base):
+    __tablename__ = "attachment_uploads"
+
+    id = Column(String(32), primary_key=True)
+    owner_type = Column(String, nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    uploaded_by = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Idempotency-Key 응답 저장 (id = 인증 주체/경로/키의 sha256, status_code가 비어 있으면 처리 중)
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 처리 시작(선점) 시각, 응답 없이 IDEMPOTENCY_CLAIM_LEASE가 지나면 다른 요청이 넘겨받음
+    claimed_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+# 필드 단위 변경 이력 (audit.py가 모아서 한 번에 저장, created_at은 변경 시각)
+class ActivityLog(Base):
+    __tablename__ = "activity_log"
+    __table_args__ = (
+        Index('ix_activity_log_entity', 'entity_type', 'entity_id', 'created_at'),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    entity_type = Column(String, nullable=False)  # issue | client | work
+    entity_id = Column(Integer, nullable=False)
+    solution = Column(String, nullable=True)
+    field = Column(String, nullable=False)
+    old_value = Column(JSONB, nullable=True)
+    new_value = Column(JSONB, nullable=True)
+    actor = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+# 솔루션별 웹훅 구독 (events: 받을 이벤트 이름 목록)
+class WebhookSubscription(Base):
+    __tablename__ = "webhook_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    solution = Column(String, nullable=False, index=True)
+    url = Column(String, nullable=False)
+    secret = Column(String, nullable=False)
+    events = Column(JSONB, nullable=False)
+    max_concurrency = Column(Integer, nullable=False, default=2, server_default="2")
+    batch_size = Column(Integer, nullable=False, default=20, server_default="20")
+    is_active = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# 웹훅 outbox (변경과 같은 트랜잭션에서 적재, status: pending / delivered / dead)
+class WebhookDelivery(Base):
+    __tablename__ = "webhook_outbox"
+    __table_args__ = (
+        Index('ix_webhook_outbox_due', 'next_attempt_at', postgresql_where=text("status = 'pending'")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False, index=True)
+    event = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String, nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+# 여러 워커가 함께 도는 주기 작업의 마지막 실행 시각 (한 주기에 한 워커만 실행하고, 재시작해도 주기가 이어짐)
+class JobRun(Base):
+    __tablename__ = "job_runs"
+
+    name = Column(String, primary_key=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=False)
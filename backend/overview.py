@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import String, bindparam, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from config import settings
+from models import Client, Issue, IssueComment, IssueStatus, Work
+import schemas
+
+"""
+고객사 개요 (/clients/{id}/overview)
+- 고객사 + 라이선스 남은 일수 + 월별 작업 건수 + 최근 작업 N건 + 우선순위별 미해결 이슈 + 마지막 활동 시각을
+  고객사 CTE 하나에 스칼라 서브쿼리를 붙인 한 문장으로 조회 (DB 왕복 1회, 문장은 한 번만 만들어 재사용)
+- 결과는 고객사 id별로 캐시하고, 이 워커에서 고객사/작업내역/이슈/댓글이 바뀌면 해당 고객사(이름+솔루션) 항목을 지움
+  (다른 워커에서의 변경은 CLIENT_OVERVIEW_TTL초 안에 반영, 날짜가 바뀌면 남은 일수 때문에 다시 조회)
+"""
+
+
+def _build_statement():
+    client = (
+        select(Client)
+        .where(Client.id == bindparam("client_id"), Client.deleted_at.is_(None))
+        .cte("client")
+    )
+    of_client = lambda model: (model.client == client.c.name, model.solution == client.c.solution)
+
+    month = func.to_char(Work.date, literal("YYYY-MM"))
+    monthly = (
+        select(month.label("month"), func.count().label("count"))
+        .where(*of_client(Work), Work.date >= bindparam("since"))
+        .group_by(month)
+        .subquery("monthly")
+    )
+    recent = (
+        select(Work.id, Work.client, Work.date, Work.solution, Work.content, Work.issue, Work.version, Work.created_at, Work.updated_at)
+        .where(*of_client(Work))
+        .order_by(Work.date.desc(), Work.id.desc())
+        .limit(bindparam("recent"))
+        .subquery("recent")
+    )
+    open_issues = (
+        select(cast(Issue.priority, String).label("priority"), func.count().label("count"))
+        .where(*of_client(Issue), Issue.deleted_at.is_(None), Issue.status != IssueStatus.resolved)
+        .group_by(Issue.priority)
+        .subquery("open_issues")
+    )
+    last_work = select(func.max(func.coalesce(Work.updated_at, Work.created_at))).where(*of_client(Work))
+    last_issue = select(func.max(func.coalesce(Issue.updated_at, Issue.created_at))).where(*of_client(Issue), Issue.deleted_at.is_(None))
+    last_comment = (
+        select(func.max(IssueComment.created_at))
+        .join(Issue, (Issue.id == IssueComment.issue_id) & (Issue.solution == IssueComment.solution))
+        .where(*of_client(Issue), IssueComment.solution == client.c.solution, Issue.deleted_at.is_(None), IssueComment.deleted_at.is_(None))
+    )
+    return select(
+        client,
+        (client.c.license_end - func.current_date()).label("license_days_remaining"),
+        select(func.jsonb_object_agg(monthly.c.month, monthly.c.count)).scalar_subquery().label("works_by_month"),
+        select(func.jsonb_agg(aggregate_order_by(func.to_jsonb(recent.table_valued()), recent.c.date.desc(), recent.c.id.desc())))
+        .scalar_subquery().label("recent_works"),
+        select(func.jsonb_object_agg(open_issues.c.priority, open_issues.c.count)).scalar_subquery().label("open_issues_by_priority"),
+        func.greatest(
+            func.coalesce(client.c.updated_at, client.c.created_at),
+            last_work.scalar_subquery(),
+            last_issue.scalar_subquery(),
+            last_comment.scalar_subquery(),
+        ).label("last_activity_at"),
+    )
+
+
+_OVERVIEW = _build_statement()
+
+
+def _months(since: date, count: int) -> List[str]:
+    total = since.year * 12 + since.month - 1
+    return [f"{(total + i) // 12:04d}-{(total + i) % 12 + 1:02d}" for i in range(count)]
+
+
+def query_overview(db: Session, client_id: int, recent: int, months: int) -> Optional[schemas.ClientOverview]:
+    today = date.today()
+    total = today.year * 12 + today.month - 1 - (months - 1)
+    since = date(total // 12, total % 12 + 1, 1)
+    row = db.execute(_OVERVIEW, {"client_id": client_id, "since": since, "recent": recent}).mappings().first()
+    if row is None:
+        return None
+    counts = row["works_by_month"] or {}
+    by_priority = row["open_issues_by_priority"] or {}
+    client = {column.name: row[column.name] for column in Client.__table__.c}
+    return schemas.ClientOverview(
+        client=schemas.Client.model_validate(client),
+        license_days_remaining=row["license_days_remaining"],
+        works_by_month={month: counts.get(month, 0) for month in _months(since, months)},
+        recent_works=[schemas.Work.model_validate(work) for work in row["recent_works"] or []],
+        open_issues=sum(by_priority.values()),
+        open_issues_by_priority=by_priority,
+        last_activity_at=row["last_activity_at"],
+    )
+
+
+class OverviewCache:
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (고객사 id, recent, months) -> (만료 시각, 조회 날짜, (이름, 솔루션), 개요)
+        self._entries: "OrderedDict[tuple, Tuple[float, date, tuple, schemas.ClientOverview]]" = OrderedDict()
+        # 무효화할 때마다 증가 (조회 중에 무효화되면 그 결과는 캐시에 넣지 않음)
+        self.generation = 0
+
+    def get(self, key: tuple) -> Optional[schemas.ClientOverview]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, day, _, overview = entry
+            if expires < time.monotonic() or day != date.today():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return overview
+
+    def put(self, key: tuple, overview: schemas.ClientOverview, generation: int):
+        owner = (overview.client.name, overview.client.solution)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, date.today(), owner, overview)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _drop(self, match):
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, entry in self._entries.items() if match(key, entry[2])]:
+                del self._entries[key]
+
+    def invalidate(self, client_id: int):
+        self._drop(lambda key, owner: key[0] == client_id)
+
+    def invalidate_name(self, name: Optional[str], solution: Optional[str]):
+        self._drop(lambda key, owner: owner == (name, solution))
+
+    def invalidate_solution(self, solution: str):
+        self._drop(lambda key, owner: owner[1] == solution)
+
+
+client_overviews = OverviewCache(settings.CLIENT_OVERVIEW_CACHE_SIZE, settings.CLIENT_OVERVIEW_TTL)
+
+
+def client_overview(db: Session, client_id: int, recent: Optional[int] = None, months: Optional[int] = None) -> Optional[schemas.ClientOverview]:
+    key = (client_id, recent or settings.CLIENT_OVERVIEW_RECENT_WORKS, months or settings.CLIENT_OVERVIEW_MONTHS)
+    overview = client_overviews.get(key)
+    if overview is None:
+        generation = client_overviews.generation
+        overview = query_overview(db, *key)
+        if overview is not None:
+            client_overviews.put(key, overview, generation)
+    return overview
@@ -0,0 +1,274 @@
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from config import settings
+from database import get_db, get_engine
+from models import User, UserRole, Work
+import jobs
+
+router = APIRouter(prefix="/admin/works/partitions", tags=["admin"])
+
+"""
+works 테이블 범위 파티션 관리
+- works는 date 기준 월 단위 RANGE 파티션 (works_YYYY_MM, 범위 밖 날짜는 works_default)
+- 미래 파티션 사전 생성, 보존 기간이 지난 파티션 분리 후 gzip CSV로 아카이브, 아카이브 복원
+- 아카이브는 먼저 분리(DETACH)해 더 이상 바뀌지 않는 테이블을 덤프한 뒤 삭제 (중간에 실패해 분리만 된 테이블은 다음 실행에서 이어서 아카이브)
+- 복원한 파티션은 테이블 COMMENT(RESTORED_MARK)로 표시해 자동 아카이브에서 제외 (다시 보관하려면 `COMMENT ON TABLE ... IS NULL`)
+- 주기 실행: `python partitions.py maintain` (cron 등)
+"""
+
+PARTITION_RE = re.compile(r"^works_(\d{4})_(\d{2})$")
+# 아카이브/복원 컬럼은 모델에서 가져옴 (컬럼이 추가돼도 아카이브에서 빠지지 않도록)
+COLUMNS = {column.name: column.type.compile(dialect=postgresql.dialect()) for column in Work.__table__.columns}
+RESTORE_BATCH_SIZE = 1000
+RESTORED_MARK = "restored"
+
+
+def add_months(d: date, months: int) -> date:
+    total = d.year * 12 + (d.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"works_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    m = PARTITION_RE.match(name)
+    if not m:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), 1)
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    rows = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'works'
+        ORDER BY c.relname
+    """))
+    return [r[0] for r in rows]
+
+
+def restored_partitions(conn: Connection) -> List[str]:
+    rows = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'works' AND obj_description(c.oid, 'pg_class') = :mark
+    """), {"mark": RESTORED_MARK})
+    return [r[0] for r in rows]
+
+
+def detached_partitions(conn: Connection) -> List[str]:
+    # 아카이브 도중 분리만 되고 삭제되지 않은 works_YYYY_MM 테이블
+    rows = conn.execute(text("""
+        SELECT c.relname FROM pg_class c
+        WHERE c.relkind = 'r' AND NOT c.relispartition AND pg_table_is_visible(c.oid)
+          AND c.relname ~ '^works_[0-9]{4}_[0-9]{2}$'
+        ORDER BY c.relname
+    """))
+    return [r[0] for r in rows]
+
+
+def create_partition(conn: Connection, month: date) -> str:
+    name = partition_name(month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    # 기본 파티션에 이미 들어간 해당 월 데이터를 새 파티션으로 옮긴 뒤 붙인다
+    conn.execute(text(f"CREATE TABLE {name} (LIKE works INCLUDING DEFAULTS)"))
+    conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM works_default WHERE date >= :lower AND date < :upper RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), {"lower": lower, "upper": upper})
+    conn.execute(text(f"ALTER TABLE works ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    return name
+
+
+def ensure_future_partitions(conn: Connection, months_ahead: int = None) -> List[str]:
+    months_ahead = settings.WORKS_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    existing = set(list_partitions(conn))
+    this_month = date.today().replace(day=1)
+    created = []
+    for i in range(months_ahead + 1):
+        month = add_months(this_month, i)
+        if partition_name(month) not in existing:
+            created.append(create_partition(conn, month))
+    return created
+
+
+def _archive_paths(name: str, archive_dir: str):
+    base = os.path.join(archive_dir, name)
+    return f"{base}.csv.gz", f"{base}.json"
+
+
+def archive_partition(name: str, archive_dir: str = None) -> dict:
+    archive_dir = archive_dir or settings.WORKS_ARCHIVE_DIR
+    month = partition_month(name)
+    if month is None:
+        raise ValueError(f"invalid works partition: {name}")
+    os.makedirs(archive_dir, exist_ok=True)
+    data_path, meta_path = _archive_paths(name, archive_dir)
+
+    # 먼저 분리해 덤프 중에 바뀔 수 없게 함 (분리 후 들어오는 해당 월 데이터는 works_default로 감)
+    # 분리는 짧은 트랜잭션으로 끝내고, 덤프/삭제는 분리된 테이블을 대상으로 하므로 works 쓰기를 막지 않음
+    with get_engine().begin() as conn:
+        if name in list_partitions(conn):
+            conn.execute(text(f"ALTER TABLE works DETACH PARTITION {name}"))
+
+    rows = 0
+    tmp_path = data_path + ".tmp"
+    with get_engine().connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(
+            text(f"SELECT {', '.join(COLUMNS)} FROM {name} ORDER BY date, id")
+        )
+        with gzip.open(tmp_path, "wt", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for row in result:
+                writer.writerow(["" if v is None else v.isoformat() if isinstance(v, (date, datetime)) else v for v in row])
+                rows += 1
+    os.replace(tmp_path, data_path)
+    meta = {
+        "partition": name,
+        "from": month.isoformat(),
+        "to": add_months(month, 1).isoformat(),
+        "rows": rows,
+        "archived_at": datetime.utcnow().isoformat(),
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    # 아카이브 파일을 다 쓴 뒤에만 삭제 (여기서 실패하면 다음 실행이 같은 내용으로 다시 덤프)
+    with get_engine().begin() as conn:
+        conn.execute(text(f"DROP TABLE {name}"))
+    return meta
+
+
+def list_archives(archive_dir: str = None) -> List[dict]:
+    archive_dir = archive_dir or settings.WORKS_ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return []
+    archives = []
+    for filename in sorted(os.listdir(archive_dir)):
+        if filename.endswith(".json"):
+            with open(os.path.join(archive_dir, filename), encoding="utf-8") as f:
+                archives.append(json.load(f))
+    return archives
+
+
+def restore_partition(conn: Connection, name: str, archive_dir: str = None) -> dict:
+    archive_dir = archive_dir or settings.WORKS_ARCHIVE_DIR
+    month = partition_month(name)
+    data_path, meta_path = _archive_paths(name, archive_dir)
+    if month is None or not os.path.exists(data_path):
+        raise FileNotFoundError(name)
+    if name in list_partitions(conn):
+        raise ValueError(f"partition already attached: {name}")
+
+    # 분리 이후 기본 파티션에 쌓인 같은 월 데이터도 함께 옮겨진다
+    create_partition(conn, month)
+    # 보존 기간보다 오래된 월이므로 다음 maintain에서 다시 아카이브되지 않도록 표시
+    conn.execute(text(f"COMMENT ON TABLE {name} IS '{RESTORED_MARK}'"))
+    rows, batch = 0, []
+    with gzip.open(data_path, "rt", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        # 아카이브 당시에 없던 컬럼(예: version)은 기본값으로 채워지도록 아카이브에 있는 컬럼만 넣음
+        columns = [c for c in reader.fieldnames or [] if c in COLUMNS]
+        values = ", ".join(f"CAST(:{c} AS {COLUMNS[c]})" for c in columns)
+        insert = text(f"INSERT INTO works ({', '.join(columns)}) VALUES ({values})")
+        for record in reader:
+            batch.append({c: (record[c] if record[c] != "" else None) for c in columns})
+            if len(batch) >= RESTORE_BATCH_SIZE:
+                conn.execute(insert, batch)
+                rows += len(batch)
+                batch = []
+    if batch:
+        conn.execute(insert, batch)
+        rows += len(batch)
+    return {"partition": name, "rows": rows}
+
+
+def remove_archive(name: str, archive_dir: str = None):
+    # 복원 트랜잭션이 커밋된 뒤에 호출
+    for path in _archive_paths(name, archive_dir or settings.WORKS_ARCHIVE_DIR):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def maintain() -> dict:
+    with get_engine().begin() as conn:
+        created = ensure_future_partitions(conn)
+        names = list_partitions(conn)
+        restored = set(restored_partitions(conn))
+        # 이전 실행에서 분리만 된 테이블은 보존 기간과 관계없이 마저 아카이브
+        interrupted = detached_partitions(conn)
+    archived = [archive_partition(name) for name in interrupted]
+    cutoff = add_months(date.today().replace(day=1), -settings.WORKS_RETENTION_MONTHS)
+    for name in names:
+        month = partition_month(name)
+        if month is not None and month < cutoff and name not in restored:
+            archived.append(archive_partition(name))
+    return {"created": created, "archived": archived}
+
+
+# 파티션/아카이브 목록 (관리자 전용)
+@router.get("/")
+def get_partitions(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return {"partitions": list_partitions(db.connection()), "archives": list_archives()}
+
+
+# 파티션 유지보수 즉시 실행 (관리자 전용)
+@router.post("/maintain")
+def run_maintenance(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return maintain()
+
+
+# 아카이브된 파티션 복원 (관리자 전용)
+@router.post("/{name}/restore")
+def restore_archived_partition(name: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    try:
+        result = restore_partition(db.connection(), name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Archive not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    db.commit()
+    remove_archive(name)
+    return result
+
+
+# cron 대신 앱 안에서 주기 실행 (WORKS_PARTITION_MAINTAIN_INTERVAL > 0 일 때)
+jobs.register("works_partitions", "WORKS_PARTITION_MAINTAIN_INTERVAL", maintain)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "maintain"
+    if command == "maintain":
+        print(json.dumps(maintain(), ensure_ascii=False, indent=2))
+    elif command == "restore" and len(sys.argv) > 2:
+        with get_engine().begin() as conn:
+            result = restore_partition(conn, sys.argv[2])
+        remove_archive(sys.argv[2])
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print("usage: python partitions.py [maintain | restore <works_YYYY_MM>]")
+        sys.exit(1)
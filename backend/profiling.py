@@ -0,0 +1,229 @@
+import gc
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from auth import SECRET_KEY, get_current_user
+from config import settings
+from models import User, UserRole
+
+router = APIRouter(prefix="/admin/profiling", tags=["admin"])
+
+"""
+요청 단위 프로파일링 및 메모리 스냅샷 (관리자 전용)
+- PROFILE_SAMPLE_RATE 비율의 요청, 또는 서명된 X-Profile 헤더가 있는 요청을 통계적 샘플러로 프로파일링
+- 샘플러는 요청이 처리되는 동안 PROFILE_INTERVAL마다 워커의 모든 스레드 스택을 수집 (같은 워커의 동시 요청도 함께 잡힘)
+- 결과는 flamegraph.pl / speedscope에서 바로 읽을 수 있는 folded stack 형식으로 PROFILE_DIR에 저장
+- tracemalloc 상위 할당 위치와 gc 객체 수를 워커별로 조회
+"""
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.folded$")
+# 대기 중인 스레드(유휴 워커, 이벤트 루프 select)는 샘플에서 제외
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def sign_profile_token(expires: int) -> str:
+    signature = hmac.new(SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_token(int(expires)), token)
+
+
+def _fold(frame) -> Optional[str]:
+    names = []
+    top = frame
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    if (os.path.basename(top.f_code.co_filename), top.f_code.co_name) in IDLE_FRAMES:
+        return None
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = _fold(frame)
+                if stack:
+                    self.samples[stack] += 1
+
+
+def _save_profile(method: str, path: str, status: int, elapsed: float, samples: Counter) -> str:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^\w-]+", "_", path.strip("/")) or "root"
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{method}_{slug}_{status}_{int(elapsed * 1000)}ms.folded"
+    with open(os.path.join(settings.PROFILE_DIR, name), "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    _prune_profiles()
+    return name
+
+
+def _prune_profiles():
+    names = sorted(n for n in os.listdir(settings.PROFILE_DIR) if PROFILE_NAME_RE.match(n))
+    for name in names[:-settings.PROFILE_KEEP] if len(names) > settings.PROFILE_KEEP else []:
+        os.remove(os.path.join(settings.PROFILE_DIR, name))
+
+
+def _finish_profile(sampler: StackSampler, method: str, path: str, status: int, elapsed: float):
+    # 샘플러 join과 파일 쓰기/정리는 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    samples = sampler.stop()
+    if samples:
+        _save_profile(method, path, status, elapsed, samples)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        if settings.PROFILE_TRACEMALLOC_FRAMES > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_INTERVAL)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            await run_in_threadpool(_finish_profile, sampler, scope["method"], scope["path"], status, elapsed)
+
+
+def _require_admin(current_user: User):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+
+
+# 프로파일 요청용 서명 헤더 발급 (X-Profile 헤더에 그대로 넣어 요청)
+@router.post("/token")
+def create_profile_token(ttl: int = 600, current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    expires = int(time.time()) + min(max(ttl, 1), 24 * 60 * 60)
+    return {"header": "X-Profile", "value": sign_profile_token(expires), "expires": expires}
+
+
+# 저장된 프로파일 목록
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    result = []
+    for name in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if PROFILE_NAME_RE.match(name):
+            result.append({"name": name, "size": os.path.getsize(os.path.join(settings.PROFILE_DIR, name))})
+    return result
+
+
+# 프로파일 다운로드 (folded stack 텍스트)
+@router.get("/profiles/{name}", response_class=PlainTextResponse)
+def get_profile(name: str, current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    path = os.path.join(settings.PROFILE_DIR, name)
+    if not PROFILE_NAME_RE.match(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+# 워커 메모리 스냅샷 (tracemalloc 상위 할당 + gc 객체 수)
+@router.get("/memory")
+def memory_snapshot(limit: int = 20, group_by: str = "lineno", current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by는 lineno, filename, traceback 중 하나여야 합니다.")
+    allocations: List[dict] = []
+    traced = None
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        for stat in snapshot.statistics(group_by)[:limit]:
+            allocations.append({
+                "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size": stat.size,
+                "count": stat.count,
+            })
+        current, peak = tracemalloc.get_traced_memory()
+        traced = {"current": current, "peak": peak}
+    objects = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return {
+        "pid": os.getpid(),
+        "tracing": tracemalloc.is_tracing(),
+        "traced": traced,
+        "allocations": allocations,
+        "gc_counts": gc.get_count(),
+        "objects": [{"type": name, "count": count} for name, count in objects.most_common(limit)],
+    }
+
+
+# tracemalloc 켜기/끄기 (이 워커에만 적용)
+@router.post("/memory/tracing")
+def set_memory_tracing(enable: bool, frames: int = 10, current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if enable and not tracemalloc.is_tracing():
+        tracemalloc.start(max(frames, 1))
+    elif not enable and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return {"pid": os.getpid(), "tracing": tracemalloc.is_tracing()}
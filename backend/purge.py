@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, delete, func, or_, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import aliased
+from auth import get_current_user
+from config import settings
+from database import SessionLocal
+from models import Client, Issue, IssueComment, User, UserRole, Work
+from schemas import AttachmentOwnerType
+from attachments import delete_owner_attachments, release_files
+from knowledge import unindex
+import jobs
+
+router = APIRouter(prefix="/admin/purge", tags=["admin"])
+
+"""
+소프트 삭제 정리 (삭제 표시된 고객사/이슈/댓글을 실제로 삭제)
+- API의 삭제는 deleted_at만 채우고, PURGE_RETENTION_DAYS가 지난 행을 이 작업이 PURGE_BATCH_SIZE건씩 나눠 삭제
+- 배치마다 별도 트랜잭션 + lock_timeout(PURGE_LOCK_TIMEOUT_MS), 잠긴 행은 SKIP LOCKED로 건너뛰어 API 쓰기를 오래 막지 않음
+- 이슈를 지우면 댓글은 FK(ON DELETE CASCADE)로 함께 삭제, 이슈/작업내역의 첨부파일은 같은 배치 트랜잭션에서 삭제
+  (다른 첨부가 참조하지 않는 파일은 커밋 후 저장소에서 삭제)
+- 고객사 삭제 API가 고객사의 이슈/댓글에도 같은 문장에서 삭제 표시를 하므로, 이슈는 삭제 표시된 행만 지움
+- 작업내역은 삭제 표시가 없으므로 고객사가 삭제되기 전에 등록된 것만 지운 뒤 고객사 삭제
+  (삭제 후 같은 이름으로 등록된 작업내역이나, 같은 이름/솔루션으로 다시 등록된 고객사가 있으면 그쪽 데이터로 보고 남김)
+- 주기 실행: PURGE_INTERVAL(초) 또는 `python purge.py`
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _tombstones(model, cutoff: datetime, limit: int):
+    ids = select(model.id).where(model.deleted_at < cutoff).order_by(model.id).limit(limit).with_for_update(skip_locked=True)
+    return delete(model.__table__).where(model.id.in_(ids)).returning(model.id)
+
+
+def _live_twin():
+    # 삭제 표시된 고객사와 이름/솔루션이 같은 살아있는 고객사
+    live = aliased(Client)
+    return select(live.id).where(live.name == Client.name, live.solution == Client.solution, live.deleted_at.is_(None)).exists()
+
+
+def _purgeable_clients(cutoff: datetime):
+    return (
+        select(Client.name, Client.solution, func.max(Client.deleted_at).label("deleted_at"))
+        .where(Client.deleted_at < cutoff, Client.solution.isnot(None), ~_live_twin())
+        .group_by(Client.name, Client.solution)
+        .subquery("purgeable")
+    )
+
+
+def _client_works(cutoff: datetime, limit: int):
+    # 고객사가 삭제되기 전에 등록된 작업내역만 (삭제 후 같은 이름으로 등록된 작업내역은 살아있는 데이터)
+    clients = _purgeable_clients(cutoff)
+    rows = (
+        select(Work.id, Work.date)
+        .join(clients, and_(Work.client == clients.c.name, Work.solution == clients.c.solution))
+        .where(Work.created_at <= clients.c.deleted_at)
+        .limit(limit)
+    )
+    return delete(Work.__table__).where(tuple_(Work.id, Work.date).in_(rows)).returning(Work.id)
+
+
+def _clients(cutoff: datetime, limit: int):
+    has_works = (
+        select(Work.id)
+        .where(Work.client == Client.name, Work.solution == Client.solution, Work.created_at <= Client.deleted_at)
+        .exists()
+    )
+    ids = (
+        select(Client.id)
+        .where(Client.deleted_at < cutoff, or_(_live_twin(), ~has_works))
+        .order_by(Client.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return delete(Client.__table__).where(Client.id.in_(ids)).returning(Client.id)
+
+
+def _delete_batches(name: str, build: Callable, cutoff: datetime, on_deleted: Optional[Callable] = None, owner_type: Optional[AttachmentOwnerType] = None) -> int:
+    """build(cutoff, limit)로 만든 DELETE ... RETURNING을 배치 단위 트랜잭션으로 반복 (더 지울 행이 없거나 PURGE_MAX_BATCHES까지)
+    owner_type이 있으면 지운 행(첫 컬럼이 id)의 첨부파일도 같은 트랜잭션에서 삭제"""
+    total = 0
+    for _ in range(settings.PURGE_MAX_BATCHES):
+        with SessionLocal() as db:
+            try:
+                db.execute(select(func.set_config("lock_timeout", f"{settings.PURGE_LOCK_TIMEOUT_MS}ms", True)))
+                rows = db.execute(build(cutoff, settings.PURGE_BATCH_SIZE)).all()
+                released = delete_owner_attachments(db, owner_type, [row[0] for row in rows]) if owner_type else ([], [])
+                db.commit()
+            except OperationalError:
+                db.rollback()
+                logger.warning("purge %s: lock timeout, retrying next run", name, exc_info=True)
+                break
+        total += len(rows)
+        release_files(released)
+        if on_deleted and rows:
+            on_deleted(rows)
+        if len(rows) < settings.PURGE_BATCH_SIZE:
+            break
+        time.sleep(settings.PURGE_BATCH_PAUSE)
+    return total
+
+
+def _unindex_works(rows):
+    for (work_id,) in rows:
+        unindex("work", work_id)
+
+
+def purge_deleted(retention_days: Optional[float] = None) -> Dict[str, int]:
+    retention_days = settings.PURGE_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    # 댓글 -> 이슈(댓글은 FK cascade, 고객사 삭제 때 표시된 이슈 포함) -> 삭제된 고객사의 작업내역 -> 고객사 순
+    steps: List[tuple] = [
+        ("comments", lambda cutoff, limit: _tombstones(IssueComment, cutoff, limit), None, None),
+        ("issues", lambda cutoff, limit: _tombstones(Issue, cutoff, limit), None, AttachmentOwnerType.issue),
+        ("client_works", _client_works, _unindex_works, AttachmentOwnerType.work),
+        ("clients", _clients, None, None),
+    ]
+    return {name: _delete_batches(name, build, cutoff, on_deleted, owner_type) for name, build, on_deleted, owner_type in steps}
+
+
+jobs.register("soft_delete_purge", "PURGE_INTERVAL", purge_deleted)
+
+
+# 삭제 표시된 데이터 즉시 정리 (관리자 전용, retention_days를 주면 보관 기간 대신 사용)
+@router.post("/run")
+def run_purge(retention_days: Optional[float] = None, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return purge_deleted(retention_days)
+
+
+if __name__ == "__main__":
+    print(json.dumps(purge_deleted(), ensure_ascii=False, indent=2))
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import smtplib
+import sys
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from config import settings
+from database import SessionLocal
+from models import Issue, JobRun, User, UserRole, ISSUE_OPEN_DUE_PREDICATE
+import jobs
+
+router = APIRouter(prefix="/admin/reminders", tags=["admin"])
+
+"""
+마감 리마인더 다이제스트
+- 전체 솔루션의 마감 지연/임박 이슈를 한 번의 쿼리(미해결 마감일 부분 인덱스)로 조회해 담당자별로 묶어 한 통씩 발송
+- 담당자(issues.assignee)는 활성 사용자 이름으로 이메일을 찾고, 없으면 건너뜀
+- 발송은 Notifier로 교체 가능: log(REMINDER_OUTBOX_DIR에 .eml 저장, 로컬 SMTP 대용) / smtp
+- 주기 실행: REMINDER_DIGEST_INTERVAL(초) 또는 `python reminders.py [--dry-run]`
+  (워커마다 REMINDER_CHECK_INTERVAL로 확인하되 job_runs의 마지막 발송 시각을 조건부로 갱신한 한 워커만 발송,
+  재시작해도 마지막 발송 시각부터 주기를 계산)
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Notifier(ABC):
+    """다이제스트 발송 인터페이스 (한 번의 실행분을 묶어서 전달)"""
+
+    @abstractmethod
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        ...
+
+
+class LogNotifier(Notifier):
+    def __init__(self, outbox_dir: str):
+        self.outbox_dir = outbox_dir
+
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for message in messages:
+            path = os.path.join(self.outbox_dir, f"{stamp}_{uuid.uuid4().hex[:8]}.eml")
+            with open(path, "wb") as f:
+                f.write(bytes(message))
+            logger.info("reminder digest for %s written to %s", message["To"], path)
+        return len(messages)
+
+
+class SmtpNotifier(Notifier):
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        if not messages:
+            return 0
+        # 한 번 연결해서 전체 다이제스트 발송
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as smtp:
+            if settings.SMTP_STARTTLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            for message in messages:
+                smtp.send_message(message)
+        return len(messages)
+
+
+NOTIFIERS = {
+    "log": lambda: LogNotifier(settings.REMINDER_OUTBOX_DIR),
+    "smtp": SmtpNotifier,
+}
+
+
+def get_notifier() -> Notifier:
+    return NOTIFIERS[settings.REMINDER_NOTIFIER]()
+
+
+def due_issues(db: Session, now: datetime) -> Dict[str, dict]:
+    """담당자별 마감 지연/임박 이슈 (전체 솔루션, 쿼리 1회)"""
+    cutoff = now + timedelta(days=settings.REMINDER_DUE_SOON_DAYS)
+    # 같은 이름의 사용자가 여럿이면 가장 먼저 가입한 활성 사용자
+    recipients = (
+        select(User.name, User.email)
+        .where(User.is_active.is_(True))
+        .distinct(User.name)
+        .order_by(User.name, User.id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Issue.id, Issue.solution, Issue.title, Issue.client, Issue.priority, Issue.due_date, Issue.assignee,
+            recipients.c.email,
+            func.row_number().over(partition_by=Issue.assignee, order_by=Issue.due_date).label("position"),
+        )
+        .outerjoin(recipients, recipients.c.name == Issue.assignee)
+        .where(text(ISSUE_OPEN_DUE_PREDICATE), Issue.due_date < cutoff)
+        .order_by(Issue.assignee, Issue.due_date)
+    )
+    digests: Dict[str, dict] = OrderedDict()
+    for row in db.execute(stmt).mappings():
+        digest = digests.setdefault(row["assignee"], {"email": row["email"], "overdue": [], "due_soon": [], "total": 0})
+        digest["total"] += 1
+        if row["position"] > settings.REMINDER_MAX_ITEMS:
+            continue
+        item = {k: row[k] for k in ("id", "solution", "title", "client", "priority", "due_date")}
+        (digest["overdue"] if row["due_date"] < now else digest["due_soon"]).append(item)
+    return digests
+
+
+def _format_item(item: dict, now: datetime) -> str:
+    delta = (now - item["due_date"]).total_seconds() / 86400
+    when = f"{delta:.1f}일 지남" if delta > 0 else f"{-delta:.1f}일 남음"
+    priority = getattr(item["priority"], "value", item["priority"])
+    return f"- [{item['solution']}] #{item['id']} {item['title']} ({item['client']}, {priority}, {item['due_date']:%Y-%m-%d %H:%M}, {when})"
+
+
+def build_message(assignee: str, digest: dict, now: datetime) -> EmailMessage:
+    lines = [f"{assignee}님, 마감이 지났거나 곧 다가오는 이슈 {digest['total']}건이 있습니다.", ""]
+    if digest["overdue"]:
+        lines += ["[마감 지남]"] + [_format_item(item, now) for item in digest["overdue"]] + [""]
+    if digest["due_soon"]:
+        lines += [f"[{settings.REMINDER_DUE_SOON_DAYS}일 이내 마감]"] + [_format_item(item, now) for item in digest["due_soon"]] + [""]
+    shown = len(digest["overdue"]) + len(digest["due_soon"])
+    if shown < digest["total"]:
+        lines.append(f"외 {digest['total'] - shown}건은 CSD Portal에서 확인하세요.")
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = digest["email"]
+    message["Subject"] = f"[CSD Portal] 마감 리마인더 - 지연 {len(digest['overdue'])}건 / 임박 {len(digest['due_soon'])}건"
+    message.set_content("\n".join(lines))
+    return message
+
+
+def send_digests(dry_run: bool = False, notifier: Optional[Notifier] = None) -> dict:
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        digests = due_issues(db, now)
+    messages, skipped = [], []
+    for assignee, digest in digests.items():
+        if not digest["email"]:
+            skipped.append(assignee)
+            continue
+        messages.append(build_message(assignee, digest, now))
+    sent = 0 if dry_run else (notifier or get_notifier()).send_batch(messages)
+    return {
+        "assignees": len(digests),
+        "issues": sum(d["total"] for d in digests.values()),
+        "messages": len(messages),
+        "sent": sent,
+        "skipped_no_email": skipped,
+    }
+
+
+JOB_NAME = "issue_reminders"
+
+
+def _claim_run(now: datetime) -> bool:
+    """이번 주기의 발송을 선점 (마지막 발송 후 REMINDER_DIGEST_INTERVAL이 지났을 때 한 워커만 성공)"""
+    due = now - timedelta(seconds=settings.REMINDER_DIGEST_INTERVAL)
+    stmt = insert(JobRun).values(name=JOB_NAME, last_run_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobRun.name],
+        set_={"last_run_at": stmt.excluded.last_run_at},
+        where=JobRun.last_run_at <= due,
+    ).returning(JobRun.name)
+    with SessionLocal() as db:
+        claimed = db.execute(stmt).scalar()
+        db.commit()
+    return claimed is not None
+
+
+def send_scheduled_digests() -> Optional[dict]:
+    if settings.REMINDER_DIGEST_INTERVAL <= 0 or not _claim_run(datetime.now(timezone.utc)):
+        return None
+    return send_digests()
+
+
+jobs.register(JOB_NAME, "REMINDER_CHECK_INTERVAL", send_scheduled_digests)
+
+
+# 리마인더 다이제스트 즉시 실행 (관리자 전용, dry_run이면 발송 없이 집계만)
+@router.post("/run")
+def run_reminders(dry_run: bool = True, current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+    return send_digests(dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    print(json.dumps(send_digests(dry_run="--dry-run" in sys.argv[1:]), ensure_ascii=False, indent=2))
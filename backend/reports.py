@@ -0,0 +1,310 @@
+import json
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from openpyxl import Workbook
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal, get_db, get_engine
+from models import Client, Issue, Work
+import schemas
+import jobs
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+"""
+주간 리포트 스냅샷
+- 솔루션별 주차(YYYY-Www, ISO 주) 작업내역/이슈/라이선스 만료 예정 고객사를 JSON + XLSX로 미리 만들어 REPORTS_DIR에 저장
+- 스냅샷은 r0001, r0002 ... 로만 추가하고 덮어쓰지 않음 (latest.json이 최신 리비전을 가리킴, REPORT_KEEP_REVISIONS개만 보관)
+- 주기 작업은 최근 REPORT_LOOKBACK_WEEKS개 주차의 원본 지문(건수/version 합/최종 수정 시각)을 집계 쿼리로 비교해
+  늦게 수정된 주차만 다시 생성 (원본 행이 모두 지워지거나 옮겨져 지문이 없어진 스냅샷도 빈 리포트로 다시 생성)
+- 다운로드 시 스냅샷이 없으면 원본 데이터(지문)가 있는 솔루션/주차만 생성하고 나머지는 404
+- XLSX는 openpyxl write-only 모드로 행 단위 기록 (메모리 사용량 일정)
+- 같은 솔루션/주차는 advisory lock으로 한 번에 하나만 생성 (여러 워커의 주기 작업/다운로드가 같은 리비전을 쓰지 않음)
+- 수동 실행: `python reports.py [YYYY-Www ...]`
+"""
+
+WEEK_RE = re.compile(r"^(\d{4})-W(\d{2})$")
+ISO_WEEK = "IYYY-\"W\"IW"
+FORMATS = {
+    "json": "application/json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+WORK_COLUMNS = [("date", "날짜"), ("client", "고객사"), ("content", "작업 내용"), ("issue", "이슈")]
+ISSUE_COLUMNS = [("id", "번호"), ("title", "제목"), ("client", "고객사"), ("assignee", "담당자"), ("status", "상태"), ("priority", "우선순위"), ("created_at", "등록일"), ("due_date", "마감일")]
+CLIENT_COLUMNS = [("name", "고객사"), ("license_type", "라이선스"), ("license_end", "만료일"), ("manager_name", "담당자"), ("manager_email", "이메일")]
+
+
+def parse_week(week: str) -> Tuple[date, date]:
+    m = WEEK_RE.match(week)
+    if not m:
+        raise ValueError(f"invalid week: {week}")
+    start = date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1)
+    return start, start + timedelta(days=6)
+
+
+def week_of(d: date) -> str:
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def completed_weeks(count: int, today: Optional[date] = None) -> List[str]:
+    """지난주부터 거꾸로 count개 주차"""
+    today = today or date.today()
+    return [week_of(today - timedelta(weeks=i)) for i in range(1, count + 1)]
+
+
+def _week_dir(solution: str, week: str) -> str:
+    return os.path.join(settings.REPORTS_DIR, quote(solution, safe=""), week)
+
+
+def latest_snapshot(solution: str, week: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(_week_dir(solution, week), "latest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# ---- 원본 지문 (늦은 수정 감지) ----
+
+def _fingerprint_rows(db: Session, model, date_column, start: date, end: date, solution: Optional[str] = None):
+    week = func.to_char(date_column, literal_column(f"'{ISO_WEEK}'")).label("week")
+    stmt = (
+        select(
+            model.solution, week, func.count(), func.coalesce(func.sum(model.version), 0),
+            func.max(func.coalesce(model.updated_at, model.created_at)),
+        )
+        .where(date_column >= start, date_column < end + timedelta(days=1))
+        .group_by(model.solution, week)
+    )
+    if solution is not None:
+        stmt = stmt.where(model.solution == solution)
+    if hasattr(model, "deleted_at"):
+        stmt = stmt.where(model.deleted_at.is_(None))
+    return db.execute(stmt).all()
+
+
+def source_fingerprints(db: Session, weeks: List[str], solution: Optional[str] = None) -> Dict[Tuple[str, str], str]:
+    """(솔루션, 주차)별 원본 지문 - works/issues/clients 테이블당 집계 쿼리 1회"""
+    ranges = [parse_week(week) for week in weeks]
+    start, end = min(r[0] for r in ranges), max(r[1] for r in ranges)
+    parts: Dict[Tuple[str, str], List[str]] = {}
+    for name, model, column in (("works", Work, Work.date), ("issues", Issue, Issue.created_at)):
+        for row_solution, week, count, versions, last in _fingerprint_rows(db, model, column, start, end, solution):
+            if week in weeks:
+                parts.setdefault((row_solution, week), []).append(f"{name}:{count}:{versions}:{last and last.isoformat()}")
+    # 만료 예정 고객사는 주차와 무관하게 솔루션 단위로 반영
+    stmt = select(
+        Client.solution, func.count(), func.coalesce(func.sum(Client.version), 0),
+        func.max(func.coalesce(Client.updated_at, Client.created_at)),
+    ).where(Client.solution.isnot(None), Client.deleted_at.is_(None)).group_by(Client.solution)
+    if solution is not None:
+        stmt = stmt.where(Client.solution == solution)
+    for row_solution, count, versions, last in db.execute(stmt).all():
+        for week in weeks:
+            parts.setdefault((row_solution, week), []).append(f"clients:{count}:{versions}:{last and last.isoformat()}")
+    return {key: "|".join(sorted(values)) for key, values in parts.items()}
+
+
+# ---- 스냅샷 생성 ----
+
+def build_report(db: Session, solution: str, week: str) -> dict:
+    start, end = parse_week(week)
+    expiry_until = end + timedelta(days=settings.REPORT_EXPIRY_DAYS)
+    works = db.execute(
+        select(Work).where(Work.solution == solution, Work.date >= start, Work.date <= end).order_by(Work.date, Work.id)
+    ).scalars()
+    issues = db.execute(
+        select(Issue)
+        .where(Issue.solution == solution, Issue.created_at >= start, Issue.created_at < end + timedelta(days=1), Issue.deleted_at.is_(None))
+        .order_by(Issue.created_at, Issue.id)
+    ).scalars()
+    clients = db.execute(
+        select(Client)
+        .where(Client.solution == solution, Client.license_end > end, Client.license_end <= expiry_until, Client.deleted_at.is_(None))
+        .order_by(Client.license_end, Client.name)
+    ).scalars()
+    report = {
+        "solution": solution,
+        "week": week,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "works": [schemas.Work.model_validate(w).model_dump(mode="json") for w in works],
+        "issues": [schemas.Issue.model_validate(i).model_dump(mode="json") for i in issues],
+        "expiring_clients": [schemas.Client.model_validate(c).model_dump(mode="json") for c in clients],
+    }
+    status_counts: Dict[str, int] = {}
+    for issue in report["issues"]:
+        status_counts[issue["status"]] = status_counts.get(issue["status"], 0) + 1
+    report["summary"] = {
+        "works": len(report["works"]),
+        "clients_worked": len({w["client"] for w in report["works"]}),
+        "issues_created": len(report["issues"]),
+        "issues_by_status": status_counts,
+        "expiring_clients": len(report["expiring_clients"]),
+    }
+    return report
+
+
+def _write_xlsx(report: dict, path: str):
+    wb = Workbook(write_only=True)
+    summary = wb.create_sheet("요약")
+    summary.append(["솔루션", report["solution"]])
+    summary.append(["주차", f"{report['week']} ({report['start']} ~ {report['end']})"])
+    summary.append(["작업 건수", report["summary"]["works"]])
+    summary.append(["작업 고객사 수", report["summary"]["clients_worked"]])
+    summary.append(["신규 이슈", report["summary"]["issues_created"]])
+    for status, count in sorted(report["summary"]["issues_by_status"].items()):
+        summary.append([f"  - {status}", count])
+    summary.append([f"{settings.REPORT_EXPIRY_DAYS}일 내 라이선스 만료", report["summary"]["expiring_clients"]])
+    for title, columns, rows in (
+        ("작업내역", WORK_COLUMNS, report["works"]),
+        ("이슈", ISSUE_COLUMNS, report["issues"]),
+        ("라이선스 만료 예정", CLIENT_COLUMNS, report["expiring_clients"]),
+    ):
+        sheet = wb.create_sheet(title)
+        sheet.append([label for _, label in columns])
+        for row in rows:
+            sheet.append([row.get(key) for key, _ in columns])
+    wb.save(path)
+
+
+def _write_atomic(path: str, write):
+    # 임시 파일 이름은 호출마다 다르게 만들어 다른 프로세스의 쓰기와 겹치지 않게 함
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_json(path: str, data: dict):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    _write_atomic(path, write)
+
+
+@contextmanager
+def _snapshot_lock(solution: str, week: str):
+    """(솔루션, 주차)별 advisory lock (별도 연결의 트랜잭션이 끝나면 자동으로 풀림)"""
+    with get_engine().begin() as conn:
+        conn.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"reports:{solution}:{week}"))))
+        yield
+
+
+def generate_snapshot(db: Session, solution: str, week: str, fingerprint: str) -> dict:
+    with _snapshot_lock(solution, week):
+        # 잠금을 기다리는 동안 다른 워커가 같은 지문으로 만들었으면 그대로 사용
+        latest = latest_snapshot(solution, week)
+        if latest and latest["fingerprint"] == fingerprint:
+            return latest
+        return _generate_snapshot(db, solution, week, fingerprint, latest)
+
+
+def _generate_snapshot(db: Session, solution: str, week: str, fingerprint: str, latest: Optional[dict]) -> dict:
+    week_dir = _week_dir(solution, week)
+    os.makedirs(week_dir, exist_ok=True)
+    revision = (latest["revision"] if latest else 0) + 1
+    report = build_report(db, solution, week)
+    meta = {
+        "solution": solution,
+        "week": week,
+        "revision": revision,
+        "fingerprint": fingerprint,
+        "generated_at": datetime.utcnow().isoformat(),
+        "summary": report["summary"],
+    }
+    report = {**meta, **report}
+    base = os.path.join(week_dir, f"r{revision:04d}")
+    _write_json(f"{base}.json", report)
+    _write_atomic(f"{base}.xlsx", lambda path: _write_xlsx(report, path))
+    # 스냅샷 파일이 모두 만들어진 뒤에 최신 리비전 교체
+    _write_json(os.path.join(week_dir, "latest.json"), meta)
+    for old in range(1, revision - settings.REPORT_KEEP_REVISIONS + 1):
+        for ext in FORMATS:
+            path = os.path.join(week_dir, f"r{old:04d}.{ext}")
+            if os.path.exists(path):
+                os.remove(path)
+    return meta
+
+
+def _snapshot_keys(weeks: List[str]) -> List[Tuple[str, str]]:
+    """REPORTS_DIR에 스냅샷이 있는 (솔루션, 주차) 중 weeks에 속한 것"""
+    if not os.path.isdir(settings.REPORTS_DIR):
+        return []
+    return [
+        (unquote(name), week)
+        for name in os.listdir(settings.REPORTS_DIR)
+        for week in weeks
+        if os.path.exists(os.path.join(settings.REPORTS_DIR, name, week, "latest.json"))
+    ]
+
+
+def refresh_snapshots(weeks: Optional[List[str]] = None) -> dict:
+    """지문이 바뀐(또는 아직 없는) 솔루션/주차만 다시 생성
+    원본 행이 모두 없어져 지문이 사라진 기존 스냅샷은 빈 지문("")으로 바뀐 것으로 봄"""
+    weeks = weeks or completed_weeks(settings.REPORT_LOOKBACK_WEEKS)
+    generated, unchanged = [], 0
+    with SessionLocal() as db:
+        fingerprints = source_fingerprints(db, weeks)
+        for key in _snapshot_keys(weeks):
+            fingerprints.setdefault(key, "")
+        for (solution, week), fingerprint in sorted(fingerprints.items()):
+            latest = latest_snapshot(solution, week)
+            if latest and latest["fingerprint"] == fingerprint:
+                unchanged += 1
+                continue
+            meta = generate_snapshot(db, solution, week, fingerprint)
+            generated.append(f"{solution}/{week}/r{meta['revision']:04d}")
+    return {"weeks": weeks, "generated": generated, "unchanged": unchanged}
+
+
+jobs.register("weekly_reports", "REPORT_SNAPSHOT_INTERVAL", refresh_snapshots)
+
+
+# 솔루션의 주간 리포트 스냅샷 목록
+@router.get("/{solution}")
+def list_reports(solution: str):
+    solution_dir = os.path.join(settings.REPORTS_DIR, quote(solution, safe=""))
+    if not os.path.isdir(solution_dir):
+        return []
+    reports = [latest_snapshot(solution, week) for week in sorted(os.listdir(solution_dir), reverse=True) if WEEK_RE.match(week)]
+    return [meta for meta in reports if meta]
+
+
+# 주간 리포트 다운로드 (스냅샷이 없으면 원본 데이터가 있는 지난 주차에 한해 바로 생성)
+@router.get("/{solution}/{week}")
+def get_report(solution: str, week: str, format: str = Query("json", pattern="^(json|xlsx)$"), db: Session = Depends(get_db)):
+    try:
+        _, end = parse_week(week)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="주차 형식이 올바르지 않습니다. (예: 2025-W32)")
+    latest = latest_snapshot(solution, week)
+    if latest is None:
+        if end >= date.today():
+            raise HTTPException(status_code=404, detail="아직 끝나지 않은 주차는 리포트가 없습니다.")
+        # 인증 없는 API이므로 임의의 솔루션 이름으로 스냅샷 파일이 만들어지지 않도록 원본 데이터가 있을 때만 생성
+        fingerprint = source_fingerprints(db, [week], solution).get((solution, week))
+        if fingerprint is None:
+            raise HTTPException(status_code=404, detail="리포트가 없습니다.")
+        latest = generate_snapshot(db, solution, week, fingerprint)
+    path = os.path.join(_week_dir(solution, week), f"r{latest['revision']:04d}.{format}")
+    filename = f"{solution}_{week}_weekly_report.{format}"
+    return FileResponse(path, media_type=FORMATS[format], filename=filename)
+
+
+if __name__ == "__main__":
+    print(json.dumps(refresh_snapshots(sys.argv[1:] or None), ensure_ascii=False, indent=2))
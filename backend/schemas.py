@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, HttpUrl, model_validator
 from datetime import datetime, date
-from typing import Optional, List
+import datetime as dt
+from typing import ClassVar, Optional, List, Any, Dict, Tuple
 import enum
 
 """
@@ -28,6 +29,7 @@ class ClientCreate(ClientBase):
 
 class Client(ClientBase):
     id: int
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -60,8 +62,34 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
 
-class ClientUpdate(ClientBase):
-    pass
+# 부분 수정 공통: 생략한 필드는 그대로 두고, NOT NULL 컬럼에 명시적으로 null을 보내면 422
+class PartialUpdate(BaseModel):
+    not_null_fields: ClassVar[Tuple[str, ...]] = ()
+
+    @model_validator(mode="after")
+    def reject_explicit_nulls(self):
+        nulls = [name for name in self.not_null_fields if name in self.model_fields_set and getattr(self, name) is None]
+        if nulls:
+            raise ValueError(f"null로 바꿀 수 없는 필드: {', '.join(nulls)}")
+        return self
+
+# 부분 수정: 전달된 필드만 반영, version을 보내면 동시 수정 충돌 검사
+class ClientUpdate(PartialUpdate):
+    not_null_fields: ClassVar[Tuple[str, ...]] = ("name", "contract_type", "license_type", "license_start", "license_end")
+
+    name: Optional[str] = None
+    solution: Optional[str] = None
+    contract_type: Optional[str] = None
+    license_type: Optional[str] = None
+    license_start: Optional[date] = None
+    license_end: Optional[date] = None
+    manager_name: Optional[str] = None
+    manager_email: Optional[EmailStr] = None
+    manager_phone: Optional[str] = None
+    location: Optional[str] = None
+    memo: Optional[str] = None
+    is_active: Optional[bool] = None
+    version: Optional[int] = None
 
 # 클라이언트(고객사) 스키마
 # (아래쪽 중복 정의 전체 삭제) 
@@ -76,17 +104,35 @@ class WorkBase(BaseModel):
 class WorkCreate(WorkBase):
     pass
 
-class WorkUpdate(WorkBase):
-    pass
+class WorkUpdate(PartialUpdate):
+    not_null_fields: ClassVar[Tuple[str, ...]] = ("client", "date", "solution", "content")
+
+    client: Optional[str] = None
+    date: Optional[dt.date] = None  # 필드명이 date 타입을 가리므로 모듈 경로로 지정
+    solution: Optional[str] = None
+    content: Optional[str] = None
+    issue: Optional[str] = None
+    version: Optional[int] = None
 
 class Work(WorkBase):
     id: int
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+# 고객사 개요 (works_by_month: "YYYY-MM" -> 건수, 오래된 달부터 / open_issues_by_priority: 미해결 이슈 우선순위별 건수)
+class ClientOverview(BaseModel):
+    client: Client
+    license_days_remaining: Optional[int] = None
+    works_by_month: Dict[str, int] = {}
+    recent_works: List[Work] = []
+    open_issues: int = 0
+    open_issues_by_priority: Dict[str, int] = {}
+    last_activity_at: Optional[datetime] = None
+
 class IssueStatus(str, enum.Enum):
     in_progress = "in_progress"
     waiting = "waiting"
@@ -110,7 +156,9 @@ class IssueBase(BaseModel):
 class IssueCreate(IssueBase):
     pass
 
-class IssueUpdate(BaseModel):
+class IssueUpdate(PartialUpdate):
+    not_null_fields: ClassVar[Tuple[str, ...]] = ("title", "client", "assignee", "status", "priority")
+
     title: Optional[str] = None
     client: Optional[str] = None
     assignee: Optional[str] = None
@@ -119,15 +167,74 @@ class IssueUpdate(BaseModel):
     content: Optional[str] = None
     tags: Optional[List[str]] = None
     due_date: Optional[datetime] = None
+    version: Optional[int] = None
 
 class Issue(IssueBase):
     id: int
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class SimilarIssue(BaseModel):
+    id: int
+    title: str
+    score: float
+
+class IssueCreated(Issue):
+    similar: List[SimilarIssue] = []
+
+# 일괄 수정/삭제 대상: ids 또는 목록 조회(list_issues)와 같은 필터 중 하나
+class IssueBulkFilter(BaseModel):
+    status: Optional[IssueStatus] = None
+    priority: Optional[IssuePriority] = None
+    client: Optional[str] = None
+    tags: Optional[List[str]] = None
+    search: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+class IssueBulkTarget(BaseModel):
+    ids: Optional[List[int]] = None
+    filter: Optional[IssueBulkFilter] = None
+
+class IssueBulkChanges(BaseModel):
+    status: Optional[IssueStatus] = None
+    priority: Optional[IssuePriority] = None
+    assignee: Optional[str] = None
+
+class IssueBulkUpdate(IssueBulkTarget):
+    changes: IssueBulkChanges
+
+class IssueBulkResult(BaseModel):
+    affected: int
+    ids: List[int]
+    comments_deleted: int = 0
+
+class IssueFacets(BaseModel):
+    total: int
+    status: Dict[str, int]
+    priority: Dict[str, int]
+    client: Dict[str, int]
+    tags: Dict[str, int]
+
+class OverdueIssue(Issue):
+    overdue_days: float
+    assignee_rank: int
+    assignee_total: int
+
+class AssigneeAging(BaseModel):
+    assignee: str
+    open_with_due: int
+    overdue: int
+    due_soon: int
+    buckets: Dict[str, int]
+    max_overdue_days: Optional[float] = None
+    overdue_share: float
+    rank: int
+
 class IssueCommentBase(BaseModel):
     issue_id: int
     author: str
@@ -141,4 +248,112 @@ class IssueComment(IssueCommentBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+# 변경 이력 스키마
+class ActivityEntry(BaseModel):
+    field: str
+    old_value: Optional[Any] = None
+    new_value: Optional[Any] = None
+    actor: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# 웹훅 스키마
+class WebhookSubscriptionCreate(BaseModel):
+    solution: str
+    url: HttpUrl
+    events: List[str] = ["issue.created", "issue.status_changed", "issue.comment_created", "issue.bulk_updated", "issue.bulk_deleted"]
+    secret: Optional[str] = None
+    max_concurrency: int = Field(2, ge=1, le=20)
+    batch_size: int = Field(20, ge=1, le=100)
+    is_active: bool = True
+
+class WebhookSubscription(BaseModel):
+    id: int
+    solution: str
+    url: str
+    events: List[str]
+    max_concurrency: int
+    batch_size: int
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class WebhookSubscriptionCreated(WebhookSubscription):
+    secret: str
+
+class WebhookDelivery(BaseModel):
+    id: int
+    event: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    last_error: Optional[str] = None
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# 배치 요청 스키마
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Optional[Any] = None
+
+# 지식 검색 결과
+class KnowledgeHit(BaseModel):
+    key: str
+    kind: str
+    id: int
+    issue_id: Optional[int] = None
+    solution: Optional[str] = None
+    title: str
+    snippet: str
+    score: float
+
+# 첨부파일 스키마
+class AttachmentOwnerType(str, enum.Enum):
+    issue = "issue"
+    work = "work"
+
+class AttachmentUploadCreate(BaseModel):
+    owner_type: AttachmentOwnerType
+    owner_id: int
+    filename: str
+    content_type: str = "application/octet-stream"
+    size: int
+
+class AttachmentUploadStatus(BaseModel):
+    upload_id: str
+    offset: int
+    size: int
+
+class Attachment(BaseModel):
+    id: int
+    owner_type: AttachmentOwnerType
+    owner_id: int
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    uploaded_by: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, TypeVar
+
+"""
+동일 조회 요청 병합 (single-flight)
+- 같은 키(라우트, 파라미터, 권한 범위)의 조회가 동시에 들어오면 첫 요청만 DB 쿼리를 실행하고
+  나머지는 그 결과를 함께 받음
+- 결과는 요청 간에 공유되므로 세션에 묶인 ORM 객체가 아닌 스키마 객체로 변환해 반환해야 함
+"""
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# 조회 API 공용 인스턴스
+read_flight = SingleFlight()
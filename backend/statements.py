@@ -0,0 +1,139 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import Select
+from models import Client, Issue, IssueComment, IssueStatus, IssuePriority, User, Work
+
+"""
+자주 실행되는 조회 쿼리의 캐시 문장
+- 문장 객체는 한 번만 만들고 값은 bindparam으로만 넘기므로, 요청마다 쿼리 구성/캐시 키 계산/컴파일을 하지 않음
+- 선택 조건이 있는 목록 쿼리는 "어떤 조건이 있는지" 조합별로 문장을 하나씩 만들어 재사용 (lru_cache)
+- 컴파일 결과는 엔진 compiled cache(DB_QUERY_CACHE_SIZE)에, DB_DRIVER=psycopg(psycopg 3)면 서버 측 prepared statement로도 재사용
+- 모든 함수는 (문장, 파라미터)를 반환: db.execute(*statements.work_by_id(work_id))
+- 효과 측정: `python bench_statements.py`
+"""
+
+Statement = Tuple[Select, dict]
+
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+# 고객사/이슈/댓글은 삭제 표시(deleted_at)된 행 제외
+_CLIENT_BY_ID = select(Client).where(Client.id == bindparam("client_id"), Client.deleted_at.is_(None))
+_CLIENTS_BY_SOLUTION = select(Client).where(Client.solution == bindparam("solution"), Client.deleted_at.is_(None))
+_WORK_BY_ID = select(Work).where(Work.id == bindparam("work_id"))
+_ISSUE_BY_ID = select(Issue).where(Issue.solution == bindparam("solution"), Issue.id == bindparam("issue_id"), Issue.deleted_at.is_(None))
+_COMMENTS_FOR_ISSUE = (
+    select(IssueComment)
+    .where(IssueComment.solution == bindparam("solution"), IssueComment.issue_id == bindparam("issue_id"), IssueComment.deleted_at.is_(None))
+    .order_by(IssueComment.created_at.asc())
+)
+
+
+def user_by_email(email: str) -> Statement:
+    return _USER_BY_EMAIL, {"email": email}
+
+
+def user_by_id(user_id: int) -> Statement:
+    return _USER_BY_ID, {"user_id": user_id}
+
+
+def client_by_id(client_id: int) -> Statement:
+    return _CLIENT_BY_ID, {"client_id": client_id}
+
+
+def clients_by_solution(solution: str) -> Statement:
+    return _CLIENTS_BY_SOLUTION, {"solution": solution}
+
+
+def work_by_id(work_id: int) -> Statement:
+    return _WORK_BY_ID, {"work_id": work_id}
+
+
+def issue_by_id(solution: str, issue_id: int) -> Statement:
+    return _ISSUE_BY_ID, {"solution": solution, "issue_id": issue_id}
+
+
+def comments_for_issue(solution: str, issue_id: int) -> Statement:
+    return _COMMENTS_FOR_ISSUE, {"solution": solution, "issue_id": issue_id}
+
+
+@lru_cache(maxsize=None)
+def _works_list(solution: bool, start: bool, end: bool) -> Select:
+    stmt = select(Work)
+    if solution:
+        stmt = stmt.where(Work.solution == bindparam("solution"))
+    if start:
+        stmt = stmt.where(Work.date >= bindparam("start"))
+    if end:
+        stmt = stmt.where(Work.date <= bindparam("end"))
+    return stmt.order_by(Work.date.desc())
+
+
+def works_list(solution: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None) -> Statement:
+    params = {"solution": solution, "start": start, "end": end}
+    return _works_list(bool(solution), bool(start), bool(end)), {k: v for k, v in params.items() if v}
+
+
+def issue_conditions(
+    solution,
+    status=None,
+    priority=None,
+    client=None,
+    tags=None,
+    pattern=None,
+    start=None,
+    end=None,
+) -> list:
+    """이슈 목록/집계 공통 조건 (값 또는 bindparam, None이면 조건 없음)"""
+    conditions = [Issue.solution == solution, Issue.deleted_at.is_(None)]
+    if status is not None:
+        conditions.append(Issue.status == status)
+    if priority is not None:
+        conditions.append(Issue.priority == priority)
+    if client is not None:
+        conditions.append(Issue.client == client)
+    if tags is not None:
+        # JSONB 포함 연산자(@>)로 모든 태그를 가진 이슈만 (GIN 인덱스 사용)
+        conditions.append(Issue.tags.contains(tags))
+    if pattern is not None:
+        conditions.append(Issue.title.ilike(pattern) | Issue.content.ilike(pattern) | Issue.assignee.ilike(pattern))
+    if start is not None:
+        conditions.append(Issue.created_at >= start)
+    if end is not None:
+        conditions.append(Issue.created_at <= end)
+    return conditions
+
+
+@lru_cache(maxsize=None)
+def _issues_list(status: bool, priority: bool, client: bool, tags: bool, search: bool, start: bool, end: bool) -> Select:
+    stmt = select(Issue).where(*issue_conditions(
+        bindparam("solution"),
+        status=bindparam("status") if status else None,
+        priority=bindparam("priority") if priority else None,
+        client=bindparam("client") if client else None,
+        tags=bindparam("tags", type_=JSONB) if tags else None,
+        pattern=bindparam("pattern") if search else None,
+        start=bindparam("start") if start else None,
+        end=bindparam("end") if end else None,
+    ))
+    return stmt.order_by(Issue.created_at.asc()).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+def issues_list(
+    solution: str,
+    status: Optional[IssueStatus] = None,
+    priority: Optional[IssuePriority] = None,
+    client: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    search: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Statement:
+    stmt = _issues_list(bool(status), bool(priority), bool(client), bool(tags), bool(search), bool(start), bool(end))
+    params = {"solution": solution, "skip": skip, "limit": limit}
+    optional = {"status": status, "priority": priority, "client": client, "tags": tags, "pattern": f"%{search}%" if search else None, "start": start, "end": end}
+    params.update({k: v for k, v in optional.items() if v})
+    return stmt, params
@@ -0,0 +1,255 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import Client
+
+"""
+고객사 이름 자동완성 (메모리 prefix/n-gram 색인)
+- 솔루션별(+ 전체) 색인: 정렬된 키 목록에서 bisect로 prefix 검색, 부족하면 2-gram 교집합으로 중간 일치 검색
+- 키는 이름 전체/단어별("(주) 삼성전자"의 "삼성전자")/한글 초성("ㅅㅅㅈㅈ")을 모두 넣어 한/영 모두 지원
+  (한글 이름은 2~4글자가 많아 3-gram 대신 2-gram 사용)
+- 고객사 등록/수정/삭제 시 갱신, 처음 조회하거나 CLIENT_SUGGEST_TTL이 지나면 테이블에서 재구축
+  (재구축은 키를 모아 한 번만 정렬, 한 번에 하나만 실행하고 TTL 재구축은 기존 색인으로 응답하면서 백그라운드에서,
+  재구축 중에 들어온 add/remove는 새 색인으로 바꾼 직후 다시 적용)
+- 고객사가 CLIENT_SUGGEST_MAX_NAMES개를 넘으면 메모리 색인 대신 pg_trgm 인덱스(ix_clients_name_trgm)로 조회
+"""
+
+logger = logging.getLogger(__name__)
+
+ALL = "*"
+NGRAM = 2
+MAX_PREFIX_SCAN = 200
+SPLIT_RE = re.compile(r"[\W_]+")
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+KIND_NAME, KIND_WORD, KIND_CHOSEONG = 0, 1, 2
+# NFKC가 호환 자모(ㄱ)를 첫소리 자모(ᄀ)로 바꾸므로 다시 호환 자모로 되돌림
+_JAMO_TO_CHOSEONG = {0x1100 + i: ch for i, ch in enumerate(CHOSEONG)}
+
+
+def _nfkc(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").translate(_JAMO_TO_CHOSEONG)
+
+
+def normalize(text: str) -> str:
+    return SPLIT_RE.sub("", _nfkc(text).lower())
+
+
+def choseong(text: str) -> str:
+    return "".join(CHOSEONG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+
+def _keys(name: str) -> Set[Tuple[str, int]]:
+    full = normalize(name)
+    words = [w for w in (normalize(w) for w in SPLIT_RE.split(_nfkc(name))) if w and w != full]
+    keys = {(full, KIND_NAME)} | {(w, KIND_WORD) for w in words}
+    keys |= {(choseong(key), KIND_CHOSEONG) for key, _ in list(keys) if choseong(key) != key}
+    return {(key, kind) for key, kind in keys if key}
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class _SolutionNames:
+    def __init__(self):
+        self.names: Dict[int, str] = {}
+        self.normalized: Dict[int, str] = {}
+        self.entries: List[Tuple[str, int, int]] = []  # (키, 종류, 고객사 id) 정렬 유지
+        self.grams: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def build(cls, clients: List[Tuple[int, str]]) -> "_SolutionNames":
+        """(고객사 id, 이름) 목록으로 구성 (키를 모두 모은 뒤 한 번만 정렬)"""
+        index = cls()
+        for client_id, name in clients:
+            index.names[client_id] = name
+            index.normalized[client_id] = normalize(name)
+            index.entries.extend((key, kind, client_id) for key, kind in _keys(name))
+            for gram in _ngrams(index.normalized[client_id]):
+                index.grams.setdefault(gram, set()).add(client_id)
+        index.entries.sort()
+        return index
+
+    def add(self, client_id: int, name: str):
+        self.remove(client_id)
+        self.names[client_id] = name
+        self.normalized[client_id] = normalize(name)
+        for key, kind in _keys(name):
+            bisect.insort(self.entries, (key, kind, client_id))
+        for gram in _ngrams(self.normalized[client_id]):
+            self.grams.setdefault(gram, set()).add(client_id)
+
+    def remove(self, client_id: int):
+        name = self.names.pop(client_id, None)
+        if name is None:
+            return
+        normalized = self.normalized.pop(client_id)
+        for key, kind in _keys(name):
+            i = bisect.bisect_left(self.entries, (key, kind, client_id))
+            if i < len(self.entries) and self.entries[i] == (key, kind, client_id):
+                del self.entries[i]
+        for gram in _ngrams(normalized):
+            ids = self.grams.get(gram)
+            if ids is not None:
+                ids.discard(client_id)
+                if not ids:
+                    del self.grams[gram]
+
+    def query(self, q: str, limit: int) -> List[str]:
+        scored: Dict[str, Tuple[int, int, str]] = {}
+
+        def consider(client_id: int, rank: int):
+            name = self.names[client_id]
+            score = (rank, len(name), name)
+            if name not in scored or score < scored[name]:
+                scored[name] = score
+
+        # 1) prefix: 이름 전체 > 단어 > 초성 순
+        start = bisect.bisect_left(self.entries, (q,))
+        for key, kind, client_id in self.entries[start:start + MAX_PREFIX_SCAN]:
+            if not key.startswith(q):
+                break
+            consider(client_id, kind)
+        # 2) 중간 일치: n-gram 후보 교집합(작은 집합부터) 후 실제 포함 여부 확인
+        if len(scored) < limit and len(q) >= NGRAM:
+            postings = sorted((self.grams.get(gram, set()) for gram in _ngrams(q)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            names = self.names
+            matches = {names[c] for c in candidates if q in self.normalized[c]} - scored.keys()
+            for name in heapq.nsmallest(limit - len(scored), matches, key=lambda n: (len(n), n)):
+                scored[name] = (3, len(name), name)
+        return [name for _, _, name in sorted(scored.values())[:limit]]
+
+
+class ClientNameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._solutions: Dict[str, _SolutionNames] = {}
+        self._client_solution: Dict[int, Optional[str]] = {}
+        self.built_at: Optional[float] = None
+        self.too_large = False
+        # 재구축 중이면 (그동안 들어온 변경 기록, 완료 이벤트)
+        self._building: Optional[Tuple[List[tuple], threading.Event]] = None
+
+    def _claim(self) -> Tuple[bool, Tuple[List[tuple], threading.Event]]:
+        # self._lock을 잡은 상태에서 호출, 이미 재구축 중이면 그 항목을 돌려줌
+        if self._building is not None:
+            return False, self._building
+        self._building = ([], threading.Event())
+        return True, self._building
+
+    def _build(self, db: Session, building: Tuple[List[tuple], threading.Event]):
+        changes, done = building
+        try:
+            total = db.execute(select(func.count()).select_from(Client).where(Client.deleted_at.is_(None))).scalar()
+            too_large = total > settings.CLIENT_SUGGEST_MAX_NAMES
+            clients: Dict[str, List[Tuple[int, str]]] = {ALL: []}
+            client_solution: Dict[int, Optional[str]] = {}
+            if not too_large:
+                for client_id, name, solution in db.execute(select(Client.id, Client.name, Client.solution).where(Client.deleted_at.is_(None))):
+                    client_solution[client_id] = solution
+                    clients[ALL].append((client_id, name))
+                    if solution:
+                        clients.setdefault(solution, []).append((client_id, name))
+            solutions = {solution: _SolutionNames.build(items) for solution, items in clients.items()}
+            with self._lock:
+                self._solutions, self._client_solution = solutions, client_solution
+                self.too_large = too_large
+                self.built_at = time.monotonic()
+                if not too_large:
+                    for method, args in changes:
+                        getattr(self, method)(*args)
+        finally:
+            with self._lock:
+                self._building = None
+            done.set()
+
+    def _build_in_background(self, building: Tuple[List[tuple], threading.Event]):
+        try:
+            with SessionLocal() as db:
+                self._build(db, building)
+        except Exception:
+            logger.warning("client name index rebuild failed", exc_info=True)
+
+    def rebuild(self, db: Session):
+        with self._lock:
+            owner, building = self._claim()
+        if owner:
+            self._build(db, building)
+        else:
+            # 다른 스레드가 재구축 중이면 끝날 때까지 기다림
+            building[1].wait()
+
+    def _ensure_fresh(self, db: Session):
+        if self.built_at is None:
+            self.rebuild(db)
+            return
+        # 다른 워커에서의 변경을 반영하기 위해 TTL이 지나면 백그라운드에서 재구축 (그동안은 기존 색인 사용)
+        with self._lock:
+            if time.monotonic() - self.built_at <= settings.CLIENT_SUGGEST_TTL:
+                return
+            owner, building = self._claim()
+        if owner:
+            threading.Thread(target=self._build_in_background, args=(building,), daemon=True).start()
+
+    def suggest(self, db: Session, q: str, solution: Optional[str] = None, limit: int = 10) -> List[str]:
+        self._ensure_fresh(db)
+        if self.too_large:
+            return _suggest_from_db(db, q, solution, limit)
+        key = normalize(q)
+        if not key:
+            return []
+        with self._lock:
+            index = self._solutions.get(solution or ALL)
+            return index.query(key, limit) if index else []
+
+    def add(self, client_id: int, name: str, solution: Optional[str]):
+        with self._lock:
+            if self._building is not None:
+                self._building[0].append(("_add", (client_id, name, solution)))
+            if self.built_at is None or self.too_large:
+                return
+            self._add(client_id, name, solution)
+
+    def remove(self, client_id: int):
+        with self._lock:
+            if self._building is not None:
+                self._building[0].append(("_remove", (client_id,)))
+            self._remove(client_id)
+
+    def _add(self, client_id: int, name: str, solution: Optional[str]):
+        self._remove(client_id)
+        self._client_solution[client_id] = solution
+        self._solutions[ALL].add(client_id, name)
+        if solution:
+            self._solutions.setdefault(solution, _SolutionNames()).add(client_id, name)
+
+    def _remove(self, client_id: int):
+        if client_id not in self._client_solution:
+            return
+        solution = self._client_solution.pop(client_id)
+        self._solutions[ALL].remove(client_id)
+        if solution in self._solutions:
+            self._solutions[solution].remove(client_id)
+
+
+def _suggest_from_db(db: Session, q: str, solution: Optional[str], limit: int) -> List[str]:
+    # ILIKE '%q%'는 3글자 이상이면 gin_trgm_ops 인덱스 사용, 정렬은 유사도 순
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    stmt = select(Client.name).where(Client.name.ilike(pattern), Client.deleted_at.is_(None))
+    if solution:
+        stmt = stmt.where(Client.solution == solution)
+    stmt = stmt.group_by(Client.name).order_by(func.similarity(Client.name, q).desc(), Client.name).limit(limit)
+    return list(db.execute(stmt).scalars())
+
+
+client_names = ClientNameIndex()
@@ -0,0 +1,186 @@
+import contextlib
+import importlib.util
+import json
+import threading
+from typing import Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import get_settings
+
+"""
+OpenTelemetry 분산 트레이싱
+- Next.js 프록시가 전달한 W3C traceparent/tracestate를 이어받아 요청 span 생성
+- 의존성(get_db, get_current_user), SQL 문장마다, 응답 직렬화 구간을 하위 span으로 기록
+- TRACING_EXPORTER: otlp(OTLP/HTTP 수집기) / file(JSON lines, 로컬·테스트용) / console / none
+- FastAPI 자체 OpenTelemetry 계측(fastapi.telemetry)이 있는 버전에서는 요청/직렬화 span을 FastAPI에 맡기고 여기서는 만들지 않음
+- opentelemetry 패키지가 없거나 TRACING_ENABLED=false 이면 모든 span 호출은 아무 일도 하지 않음
+"""
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - opentelemetry 미설치 환경
+    trace = None
+
+TRACER_NAME = "csd-portal"
+MAX_STATEMENT_LENGTH = 2000
+NATIVE_TELEMETRY = importlib.util.find_spec("fastapi.telemetry") is not None
+_enabled = False
+
+
+def span(name: str, **attributes):
+    """트레이싱이 꺼져 있으면 nullcontext"""
+    if not _enabled:
+        return contextlib.nullcontext()
+    return trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=attributes)
+
+
+if trace is not None:
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class FileSpanExporter(SpanExporter):
+        """span을 한 줄에 하나씩 JSON으로 기록"""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence) -> "SpanExportResult":
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                for item in spans:
+                    f.write(json.dumps(json.loads(item.to_json()), ensure_ascii=False) + "\n")
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+
+def _build_exporter():
+    settings = get_settings()
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT or None)
+    if settings.TRACING_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACING_FILE)
+    if settings.TRACING_EXPORTER == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    return None
+
+
+def setup_tracing(engine: Engine, exporter=None) -> bool:
+    """TracerProvider 설정 + SQL/직렬화 계측. exporter를 넘기면 설정 대신 사용 (테스트용)"""
+    global _enabled
+    settings = get_settings()
+    if trace is None or not settings.TRACING_ENABLED or _enabled:
+        return _enabled
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    exporter = exporter or _build_exporter()
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _instrument_engine(engine)
+    if not NATIVE_TELEMETRY:
+        _instrument_serialization()
+    _enabled = True
+    return True
+
+
+def _instrument_engine(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        current = trace.get_tracer(TRACER_NAME).start_span(
+            "sql " + (statement.split(None, 1)[0].upper() if statement else "?"),
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "postgresql",
+                "db.statement": statement[:MAX_STATEMENT_LENGTH],
+                "db.executemany": executemany,
+            },
+        )
+        conn.info.setdefault("_trace_spans", []).append(current)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("_trace_spans")
+        if spans:
+            current = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                current.set_attribute("db.rowcount", cursor.rowcount)
+            current.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        spans = context.connection.info.get("_trace_spans") if context.connection is not None else None
+        if spans:
+            current = spans.pop()
+            current.record_exception(context.original_exception)
+            current.set_status(Status(StatusCode.ERROR, str(context.original_exception)[:200]))
+            current.end()
+
+
+def _instrument_serialization():
+    # FastAPI는 응답 모델 검증/직렬화 훅을 제공하지 않으므로 routing 모듈의 함수를 감싼다
+    from fastapi import routing
+
+    original = routing.serialize_response
+    if getattr(original, "_traced", False):
+        return
+
+    async def serialize_response(*args, **kwargs):
+        with span("serialize_response"):
+            return await original(*args, **kwargs)
+
+    serialize_response._traced = True
+    routing.serialize_response = serialize_response
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _enabled or NATIVE_TELEMETRY:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        parent = propagate.extract(carrier)
+        tracer = trace.get_tracer(TRACER_NAME)
+        method = scope["method"]
+        with tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"], "url.query": scope.get("query_string", b"").decode("latin-1")},
+        ) as current:
+            status: Optional[int] = None
+
+            async def send_wrapper(message: Message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    current.set_attribute("http.response.status_code", status)
+                    # 클라이언트/프록시 로그와 맞춰볼 수 있도록 traceparent를 응답에도 실어 보냄
+                    headers = {}
+                    propagate.inject(headers)
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(k.encode(), v.encode()) for k, v in headers.items()]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                current.update_name(f"{method} {route.path}")
+                current.set_attribute("http.route", route.path)
+            if status is not None and status >= 500:
+                current.set_status(Status(StatusCode.ERROR))
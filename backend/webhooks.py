@@ -0,0 +1,353 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from auth import get_current_user
+from config import settings
+from database import SessionLocal, get_db
+from models import User, UserRole, WebhookDelivery, WebhookSubscription
+from schemas import WebhookDelivery as WebhookDeliverySchema, WebhookSubscription as WebhookSubscriptionSchema, WebhookSubscriptionCreate, WebhookSubscriptionCreated
+import jobs
+
+router = APIRouter(prefix="/admin/webhooks", tags=["admin"])
+
+"""
+이슈 이벤트 웹훅 발송
+- 솔루션별 구독(webhook_subscriptions)에 맞는 이벤트를 변경과 같은 트랜잭션에서 webhook_outbox에 INSERT ... SELECT로 적재
+  (API는 외부 시스템을 기다리지 않음, 커밋되지 않은 변경은 발송되지 않음)
+- 발송 작업(asyncio)은 WEBHOOK_POLL_INTERVAL마다 발송할 행을 임대(lease) 방식으로 가져와 대상별로 batch_size개씩 묶어 POST
+  (SKIP LOCKED라 여러 워커가 같이 돌아도 중복 발송하지 않음, 발송이 임대 시간보다 길어지면 결과를 기록할 때까지 WEBHOOK_LEASE/2마다 임대 연장)
+- httpx.AsyncClient 하나로 연결 재사용, 대상별 동시 요청 수는 구독의 max_concurrency, 전체는 WEBHOOK_MAX_CONCURRENCY로 제한
+- 실패하면 지수 백오프(+지터)로 재시도, WEBHOOK_MAX_ATTEMPTS번 실패하면 dead
+- 서명: X-CSD-Signature: t=<unix초>,v1=<hex(HMAC-SHA256(secret, "<t>.<본문>"))>
+- 로컬 수신기: `python webhooks.py receiver [포트] [secret]`
+"""
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ["issue.created", "issue.status_changed", "issue.comment_created", "issue.bulk_updated", "issue.bulk_deleted"]
+PING = "ping"
+SIGNATURE_HEADER = "X-CSD-Signature"
+PENDING, DELIVERED, DEAD = "pending", "delivered", "dead"
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify(secret: str, header: str, body: bytes, tolerance: int = 300) -> bool:
+    try:
+        parts = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), header)
+
+
+def backoff(attempts: int) -> float:
+    """attempts번 실패한 뒤 다음 시도까지 대기 시간(초), ±20% 지터"""
+    delay = min(settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# ---- 적재 (API 트랜잭션 안에서 호출) ----
+
+def enqueue(db: Session, solution: str, event: str, data: dict, subscription_id: Optional[int] = None):
+    """구독 중인 대상마다 outbox 행 적재 (커밋은 호출한 쪽에서)"""
+    sub = WebhookSubscription
+    conditions = [sub.is_active.is_(True)]
+    if subscription_id is not None:
+        conditions.append(sub.id == subscription_id)
+    else:
+        conditions += [sub.solution == solution, sub.events.contains([event])]
+    rows = select(sub.id, literal(event), literal(data, JSONB)).where(*conditions)
+    db.execute(
+        WebhookDelivery.__table__.insert().from_select(["subscription_id", "event", "payload"], rows)
+    )
+
+
+# ---- 발송 ----
+
+def _claim(limit: int) -> List[dict]:
+    """발송할 행을 WEBHOOK_LEASE초 동안 임대 (그 안에 결과를 기록하지 못하면 다른 워커가 다시 가져감)"""
+    outbox = WebhookDelivery.__table__
+    due = (
+        select(outbox.c.id)
+        .where(outbox.c.status == PENDING, outbox.c.next_attempt_at <= func.now())
+        .order_by(outbox.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(outbox)
+        .where(outbox.c.id.in_(due))
+        .values(attempts=outbox.c.attempts + 1, next_attempt_at=func.now() + timedelta(seconds=settings.WEBHOOK_LEASE))
+        .returning(outbox.c.id, outbox.c.subscription_id, outbox.c.event, outbox.c.payload, outbox.c.attempts, outbox.c.created_at)
+    )
+    with SessionLocal() as db:
+        rows = [dict(r) for r in db.execute(stmt).mappings()]
+        db.commit()
+    return rows
+
+
+def _extend_lease(ids: List[int]):
+    outbox = WebhookDelivery.__table__
+    with SessionLocal() as db:
+        db.execute(
+            update(outbox)
+            .where(outbox.c.id.in_(ids), outbox.c.status == PENDING)
+            .values(next_attempt_at=func.now() + timedelta(seconds=settings.WEBHOOK_LEASE))
+        )
+        db.commit()
+
+
+def _subscriptions(ids: List[int]) -> Dict[int, WebhookSubscription]:
+    with SessionLocal() as db:
+        subs = db.execute(select(WebhookSubscription).where(WebhookSubscription.id.in_(ids))).scalars().all()
+        db.expunge_all()
+    return {s.id: s for s in subs}
+
+
+def _record(delivered: List[int], failed: List[tuple]):
+    outbox = WebhookDelivery.__table__
+    with SessionLocal() as db:
+        if delivered:
+            db.execute(update(outbox).where(outbox.c.id.in_(delivered)).values(status=DELIVERED, delivered_at=func.now(), last_error=None))
+        for ids, attempts, error in failed:
+            if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                values = {"status": DEAD, "last_error": error}
+            else:
+                values = {"next_attempt_at": func.now() + timedelta(seconds=backoff(attempts)), "last_error": error}
+            db.execute(update(outbox).where(outbox.c.id.in_(ids)).values(**values))
+        db.commit()
+
+
+class WebhookSender:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limits: Dict[int, tuple] = {}
+        self._global: Optional[asyncio.Semaphore] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.WEBHOOK_TIMEOUT,
+                limits=httpx.Limits(max_connections=settings.WEBHOOK_MAX_CONCURRENCY, max_keepalive_connections=settings.WEBHOOK_MAX_CONCURRENCY),
+                headers={"User-Agent": "csd-portal-webhooks"},
+            )
+            self._global = asyncio.Semaphore(settings.WEBHOOK_MAX_CONCURRENCY)
+        return self._client
+
+    def _limit(self, sub: WebhookSubscription) -> asyncio.Semaphore:
+        # 구독의 max_concurrency가 바뀌면 새 세마포어로 교체
+        current = self._limits.get(sub.id)
+        if current is None or current[0] != sub.max_concurrency:
+            current = self._limits[sub.id] = (sub.max_concurrency, asyncio.Semaphore(sub.max_concurrency))
+        return current[1]
+
+    async def _post(self, sub: WebhookSubscription, rows: List[dict]) -> Optional[str]:
+        """배치 하나 발송, 실패하면 오류 메시지"""
+        body = json.dumps({
+            "solution": sub.solution,
+            "deliveries": [
+                {"id": r["id"], "event": r["event"], "created_at": r["created_at"].isoformat(), "attempt": r["attempts"], "data": r["payload"]}
+                for r in rows
+            ],
+        }, ensure_ascii=False).encode()
+        headers = {"Content-Type": "application/json", SIGNATURE_HEADER: sign(sub.secret, int(time.time()), body)}
+        async with self._limit(sub), self._global:
+            try:
+                response = await self._http().post(sub.url, content=body, headers=headers)
+            except httpx.HTTPError as exc:
+                return f"{type(exc).__name__}: {exc}"[:500]
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+    async def _keep_leased(self, ids: List[int], done: asyncio.Event):
+        # 대상이 느려 배치가 여러 번 돌아도 다른 워커가 발송 중인 행을 다시 가져가지 않도록 임대 연장
+        while True:
+            try:
+                await asyncio.wait_for(done.wait(), settings.WEBHOOK_LEASE / 2)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await run_in_threadpool(_extend_lease, ids)
+            except Exception:
+                logger.warning("webhook lease extension failed", exc_info=True)
+
+    async def deliver_pending(self) -> dict:
+        self._http()
+        rows = await run_in_threadpool(_claim, settings.WEBHOOK_CLAIM_SIZE)
+        if not rows:
+            return {"claimed": 0}
+        done = asyncio.Event()
+        keep_leased = asyncio.create_task(self._keep_leased([r["id"] for r in rows], done))
+        try:
+            subs = await run_in_threadpool(_subscriptions, sorted({r["subscription_id"] for r in rows}))
+            batches = []
+            for sub_id in sorted(subs):
+                sub = subs[sub_id]
+                sub_rows = [r for r in rows if r["subscription_id"] == sub_id]
+                batches += [(sub, sub_rows[i:i + sub.batch_size]) for i in range(0, len(sub_rows), sub.batch_size)]
+            results = await asyncio.gather(*(self._post(sub, batch) for sub, batch in batches))
+        finally:
+            # 진행 중인 연장이 끝난 뒤에 결과를 기록해야 재시도 시각(backoff)을 덮어쓰지 않음
+            done.set()
+            await keep_leased
+        delivered, failed = [], []
+        for (sub, batch), error in zip(batches, results):
+            if error is None:
+                delivered += [r["id"] for r in batch]
+            else:
+                logger.warning("webhook %s delivery failed: %s", sub.id, error)
+                failed.append(([r["id"] for r in batch], max(r["attempts"] for r in batch), error))
+        # 구독이 삭제된 행은 더 보낼 곳이 없으므로 dead 처리
+        orphans = [r["id"] for r in rows if r["subscription_id"] not in subs]
+        if orphans:
+            failed.append((orphans, settings.WEBHOOK_MAX_ATTEMPTS, "subscription removed"))
+        await run_in_threadpool(_record, delivered, failed)
+        return {"claimed": len(rows), "batches": len(batches), "delivered": len(delivered), "failed": sum(len(ids) for ids, _, _ in failed)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+sender = WebhookSender()
+
+
+def purge_delivered() -> int:
+    outbox = WebhookDelivery.__table__
+    with SessionLocal() as db:
+        deleted = db.execute(
+            delete(outbox).where(outbox.c.status == DELIVERED, outbox.c.delivered_at < func.now() - timedelta(days=settings.WEBHOOK_RETENTION_DAYS))
+        ).rowcount
+        db.commit()
+    return deleted
+
+
+jobs.register("webhook_delivery", "WEBHOOK_POLL_INTERVAL", sender.deliver_pending)
+jobs.register("webhook_purge", "WEBHOOK_PURGE_INTERVAL", purge_delivered)
+
+
+def _require_admin(current_user: User):
+    if current_user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="관리자만 접근 가능합니다.")
+
+
+# 웹훅 구독 목록
+@router.get("/", response_model=List[WebhookSubscriptionSchema])
+def list_subscriptions(solution: Optional[str] = Query(None), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    stmt = select(WebhookSubscription).order_by(WebhookSubscription.id)
+    if solution:
+        stmt = stmt.where(WebhookSubscription.solution == solution)
+    return db.execute(stmt).scalars().all()
+
+
+# 웹훅 구독 등록 (secret을 비우면 생성해서 이 응답에서만 반환)
+@router.post("/", response_model=WebhookSubscriptionCreated)
+def create_subscription(subscription: WebhookSubscriptionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    unknown = set(subscription.events) - set(EVENTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 이벤트: {', '.join(sorted(unknown))}")
+    data = subscription.dict()
+    data["url"] = str(subscription.url)
+    data["secret"] = subscription.secret or secrets.token_hex(32)
+    db_subscription = WebhookSubscription(**data)
+    db.add(db_subscription)
+    db.commit()
+    db.refresh(db_subscription)
+    return db_subscription
+
+
+# 웹훅 구독 삭제
+@router.delete("/{subscription_id}")
+def delete_subscription(subscription_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    if not db.execute(delete(WebhookSubscription).where(WebhookSubscription.id == subscription_id).returning(WebhookSubscription.id)).scalar():
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    db.commit()
+    return {"ok": True}
+
+
+# 최근 발송 내역 (status: pending / delivered / dead)
+@router.get("/{subscription_id}/deliveries", response_model=List[WebhookDeliverySchema])
+def list_deliveries(
+    subscription_id: int,
+    status: Optional[str] = Query(None, pattern="^(pending|delivered|dead)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _require_admin(current_user)
+    stmt = select(WebhookDelivery).where(WebhookDelivery.subscription_id == subscription_id)
+    if status:
+        stmt = stmt.where(WebhookDelivery.status == status)
+    return db.execute(stmt.order_by(WebhookDelivery.id.desc()).limit(limit)).scalars().all()
+
+
+# 연결 확인용 ping 이벤트 적재
+@router.post("/{subscription_id}/ping")
+def ping_subscription(subscription_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    _require_admin(current_user)
+    subscription = db.get(WebhookSubscription, subscription_id)
+    if subscription is None:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    enqueue(db, subscription.solution, PING, {"sent_at": datetime.now(timezone.utc).isoformat()}, subscription_id=subscription_id)
+    db.commit()
+    return {"ok": True}
+
+
+# ---- 로컬 테스트용 수신기 ----
+
+def run_receiver(port: int = 9009, secret: Optional[str] = None, fail_rate: float = 0.0):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            valid = verify(secret, self.headers.get(SIGNATURE_HEADER, ""), body) if secret else None
+            if random.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            payload = json.loads(body)
+            for delivery in payload["deliveries"]:
+                print(f"[{payload['solution']}] #{delivery['id']} {delivery['event']} attempt={delivery['attempt']} signature_ok={valid}", flush=True)
+            self.send_response(401 if valid is False else 204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"webhook receiver listening on http://127.0.0.1:{port}/", flush=True)
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["receiver"]:
+        run_receiver(int(sys.argv[2]) if len(sys.argv) > 2 else 9009, sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print(json.dumps(asyncio.run(sender.deliver_pending()), ensure_ascii=False, indent=2))
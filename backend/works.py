@@ -1,8 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
-import models, schemas
+from database import get_db, update_returning_changes, delete_returning_row, row_exists
+from auth import get_actor
+from audit import audit_log
+from singleflight import read_flight
+from knowledge import index_work, unindex
+from overview import client_overviews
+from attachments import delete_owner_attachments, release_files
+import models, schemas, statements
 
 router = APIRouter(prefix="/works", tags=["works"])
 
@@ -13,14 +19,11 @@ router = APIRouter(prefix="/works", tags=["works"])
 
 @router.get("/", response_model=List[schemas.Work])
 def list_works(solution: Optional[str] = Query(None), db: Session = Depends(get_db)):
-    q = db.query(models.Work)
-    if solution:
-        q = q.filter(models.Work.solution == solution)
-    return q.order_by(models.Work.date.desc()).all()
+    return db.execute(*statements.works_list(solution)).scalars().all()
 
 @router.get("/{work_id}", response_model=schemas.Work)
 def get_work(work_id: int, db: Session = Depends(get_db)):
-    work = db.query(models.Work).filter(models.Work.id == work_id).first()
+    work = db.execute(*statements.work_by_id(work_id)).scalars().first()
     if not work:
         raise HTTPException(status_code=404, detail="Work not found")
     return work
@@ -31,26 +34,40 @@ def create_work(work: schemas.WorkCreate, db: Session = Depends(get_db)):
     db.add(db_work)
     db.commit()
     db.refresh(db_work)
+    index_work(db_work)
+    client_overviews.invalidate_name(db_work.client, db_work.solution)
     return db_work
 
 @router.put("/{work_id}", response_model=schemas.Work)
-def update_work(work_id: int, work: schemas.WorkUpdate, db: Session = Depends(get_db)):
-    db_work = db.query(models.Work).filter(models.Work.id == work_id).first()
+@router.patch("/{work_id}", response_model=schemas.Work)
+def update_work(work_id: int, work: schemas.WorkUpdate, db: Session = Depends(get_db), actor: Optional[str] = Depends(get_actor)):
+    data = work.dict(exclude_unset=True)
+    version = data.pop("version", None)
+    db_work, changes = update_returning_changes(db, models.Work, [models.Work.id == work_id], data, version)
     if not db_work:
+        if version is not None and row_exists(db, models.Work, [models.Work.id == work_id]):
+            raise HTTPException(status_code=409, detail="다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.")
         raise HTTPException(status_code=404, detail="Work not found")
-    for key, value in work.dict().items():
-        setattr(db_work, key, value)
     db.commit()
-    db.refresh(db_work)
+    audit_log.record("work", work_id, changes, actor=actor, solution=db_work["solution"])
+    index_work(db_work)
+    client_overviews.invalidate_name(db_work["client"], db_work["solution"])
+    # 고객사/솔루션이 바뀌었으면 이전 고객사 개요도 무효화
+    if "client" in changes or "solution" in changes:
+        previous = {field: old for field, (old, _) in changes.items()}
+        client_overviews.invalidate_name(previous.get("client", db_work["client"]), previous.get("solution", db_work["solution"]))
     return db_work
 
 @router.delete("/{work_id}")
 def delete_work(work_id: int, db: Session = Depends(get_db)):
-    db_work = db.query(models.Work).filter(models.Work.id == work_id).first()
-    if not db_work:
+    work = delete_returning_row(db, models.Work, [models.Work.id == work_id])
+    if not work:
         raise HTTPException(status_code=404, detail="Work not found")
-    db.delete(db_work)
+    released = delete_owner_attachments(db, schemas.AttachmentOwnerType.work, [work_id])
     db.commit()
+    release_files(released)
+    unindex("work", work_id)
+    client_overviews.invalidate_name(work["client"], work["solution"])
     return {"ok": True}
 
 @router.get("/solution/{solution}", response_model=List[schemas.Work])
@@ -60,9 +77,8 @@ def list_works_by_solution(
     end: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
-    q = db.query(models.Work).filter(models.Work.solution == solution)
-    if start:
-        q = q.filter(models.Work.date >= start)
-    if end:
-        q = q.filter(models.Work.date <= end)
-    return q.order_by(models.Work.date.desc()).all() 
\ No newline at end of file
+    # 동일 조건의 동시 요청은 한 번의 쿼리 결과를 공유
+    def query():
+        works = db.execute(*statements.works_list(solution, start, end)).scalars()
+        return [schemas.Work.model_validate(w) for w in works]
+    return read_flight.do(("works.list_works_by_solution", solution, start, end), query) 
\ No newline at end of file
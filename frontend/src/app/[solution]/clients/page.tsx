@@ -2,10 +2,11 @@
 import { useState, useRef, useEffect } from 'react';
 import { useParams } from 'next/navigation';
 import { useAuth } from '@/components/AuthProvider';
+import { useIdempotencyKey } from '@/components/useIdempotencyKey';
 import { List, LayoutGrid, FileText } from 'lucide-react';
 
 // API 연동용 클라이언트 타입
-type Client = { id: number; name: string; contract_type: string; license_type: string; license_start: string; license_end: string; solution: string; manager_name?: string; manager_email?: string; manager_phone?: string; location?: string; memo?: string; is_active?: boolean; created_at?: string; updated_at?: string; [key: string]: string | number | boolean | undefined; };
+type Client = { id: number; name: string; contract_type: string; license_type: string; license_start: string; license_end: string; solution: string; manager_name?: string; manager_email?: string; manager_phone?: string; location?: string; memo?: string; is_active?: boolean; version?: number; created_at?: string; updated_at?: string; [key: string]: string | number | boolean | undefined; };
 type ClientForm = { name: string; solution: string; contract_type: string; license_type: string; license_start: string; license_end: string; manager_name: string; manager_email: string; manager_phone: string; location: string; memo: string; };
 
 const columns = [
@@ -40,7 +41,7 @@ const getLicenseStatusClass = (license_end: string) => {
 export default function SolutionClientsPage() {
   const params = useParams();
   const solution = params?.solution as string | undefined;
-  const { user } = useAuth();
+  const { user, token } = useAuth();
   const [view, setView] = useState<'table' | 'tile'>('tile');
   const [clients, setClients] = useState<Client[]>([]);
   const [search, setSearch] = useState('');
@@ -115,6 +116,7 @@ export default function SolutionClientsPage() {
 
   // 추가 모달 상태
   const [showAddModal, setShowAddModal] = useState(false);
+  const addKey = useIdempotencyKey();
   const [addForm, setAddForm] = useState<ClientForm>({
     name: '', solution: solution ?? '', contract_type: '', license_type: '', license_start: '', license_end: '',
     manager_name: '', manager_email: '', manager_phone: '', location: '', memo: '',
@@ -143,9 +145,10 @@ export default function SolutionClientsPage() {
     );
     const res = await fetch('/api/clients', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'Idempotency-Key': addKey.current() },
       body: JSON.stringify(payload),
     });
+    addKey.settle(res.status);
     if (res.ok) {
       setShowAddModal(false);
       fetch('/api/clients')
@@ -173,6 +176,8 @@ export default function SolutionClientsPage() {
     manager_name: '', manager_email: '', manager_phone: '', location: '', memo: '',
   });
   const [editId, setEditId] = useState<number|null>(null);
+  // 수정 모달을 연 시점의 version (저장 시 함께 보내 동시 수정 충돌 검사)
+  const [editVersion, setEditVersion] = useState<number|undefined>(undefined);
   const [alertInfo, setAlertInfo] = useState<{ open: boolean; message: string; type: 'warn'|'confirm'|'delete'; onConfirm?: () => void }>({ open: false, message: '', type: 'warn' });
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
 
@@ -198,6 +203,7 @@ export default function SolutionClientsPage() {
       memo: client.memo ?? '',
     });
     setEditId(client.id);
+    setEditVersion(client.version);
     setShowEditModal(true);
   };
 
@@ -228,14 +234,20 @@ export default function SolutionClientsPage() {
     console.log('PUT updateData:', updateData);
     const res = await fetch(`/api/clients/${editId}`, {
       method: 'PUT',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify(updateData),
+      headers: { 'Content-Type': 'application/json', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+      body: JSON.stringify({ ...updateData, version: editVersion }),
     });
     if (res.ok) {
       setShowEditModal(false);
       fetch('/api/clients')
         .then(res => res.json())
         .then(setClients);
+    } else if (res.status === 409) {
+      setShowEditModal(false);
+      setAlertInfo({ open: true, message: '다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.', type: 'warn' });
+      fetch('/api/clients')
+        .then(res => res.json())
+        .then(setClients);
     } else {
       alert('수정 실패');
     }
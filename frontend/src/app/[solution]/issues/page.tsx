@@ -2,6 +2,7 @@
 import { useState, useEffect, use } from 'react';
 import { LayoutGrid, List, Search, MessageSquare, Calendar, User, AlertTriangle, CheckCircle, Clock, XCircle, Pencil, Trash } from 'lucide-react';
 import { useAuth } from '@/components/AuthProvider';
+import { useIdempotencyKey } from '@/components/useIdempotencyKey';
 import { useSearchParams, useRouter } from 'next/navigation';
 
 type Client = { id: number; name: string; };
@@ -103,6 +104,8 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
   const [showAddModal, setShowAddModal] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
   const [selectedIssueIds, setSelectedIssueIds] = useState<number[]>([]);
+  const addKey = useIdempotencyKey();
+  const commentKey = useIdempotencyKey();
   const [addForm, setAddForm] = useState({ title: '', client: '', assignee: '', priority: 'medium', status: 'in_progress', due_date: '', tags: '', content: '' });
   const [comments, setComments] = useState<Comment[]>([]);
   const [commentInput, setCommentInput] = useState('');
@@ -113,7 +116,7 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
   const [deleteTargetComment, setDeleteTargetComment] = useState<Comment | null>(null);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
-  const [editForm, setEditForm] = useState({ title: '', client: '', assignee: '', priority: 'medium', status: 'in_progress', due_date: '', tags: '', content: '' });
+  const [editForm, setEditForm] = useState<{ title: string; client: string; assignee: string; priority: string; status: string; due_date: string; tags: string; content: string; version?: number }>({ title: '', client: '', assignee: '', priority: 'medium', status: 'in_progress', due_date: '', tags: '', content: '' });
 
   // 솔루션별 고객사 목록 불러오기
   useEffect(() => {
@@ -170,9 +173,10 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
     };
     const res = await fetch(`/issues/${encodeURIComponent(solution)}`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'Idempotency-Key': addKey.current() },
       body: JSON.stringify(form),
     });
+    addKey.settle(res.status);
     if (res.ok) {
       setShowAddModal(false);
       setAddForm({ title: '', client: '', assignee: '', priority: 'medium', status: 'in_progress', due_date: '', tags: '', content: '' });
@@ -195,9 +199,10 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
     if (selectedIssueIds.length === 0) return;
     const res = await fetch(`/issues/${encodeURIComponent(solution)}/${selectedIssueIds[0]}/comments`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'Idempotency-Key': commentKey.current() },
       body: JSON.stringify({ issue_id: selectedIssueIds[0], author: user?.name || '익명', content: commentInput }),
     });
+    commentKey.settle(res.status);
     if (res.ok) {
       setCommentInput('');
       // 댓글 새로고침
@@ -293,6 +298,7 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
           due_date: issue.due_date ? issue.due_date.slice(0, 10) : '',
           tags: (issue.tags || []).join(', '),
           content: issue.content || '',
+          version: issue.version,
         });
       }
     }
@@ -319,6 +325,9 @@ export default function SolutionIssuesPage({ params }: { params: Promise<{ solut
     if (res.ok) {
       setShowEditModal(false);
       fetchIssues();
+    } else if (res.status === 409) {
+      alert('다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.');
+      fetchIssues();
     }
   };
 
@@ -3,6 +3,8 @@ import { useState, useEffect, use } from 'react';
 import { LayoutGrid, List, Plus, Pencil, Trash2 } from 'lucide-react';
 import { useSearchParams } from 'next/navigation';
 import { useRouter } from 'next/navigation';
+import { useAuth } from '@/components/AuthProvider';
+import { useIdempotencyKey } from '@/components/useIdempotencyKey';
 
 // 솔루션별 고객사 목업
 const solutionClients: { [key: string]: string[] } = {
@@ -114,6 +116,7 @@ export default function SolutionWorksPage({ params }: { params: Promise<{ soluti
   const { solution } = use(params);
   const searchParams = useSearchParams();
   const router = useRouter();
+  const { token } = useAuth();
   const [mode, setMode] = useState<'tile'|'table'>('tile');
   const [week, setWeek] = useState(() => searchParams?.get('week') || '');
   const [works, setWorks] = useState<any[]>([]);
@@ -122,8 +125,9 @@ export default function SolutionWorksPage({ params }: { params: Promise<{ soluti
   const pageSize = 9;
   const [showAddModal, setShowAddModal] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
+  const addKey = useIdempotencyKey();
   const [addForm, setAddForm] = useState({ client: '', solution: solution, date: '', content: '', issue: '' });
-  const [editForm, setEditForm] = useState({ id: '', client: '', solution: solution, date: '', content: '', issue: '' });
+  const [editForm, setEditForm] = useState<{ id: string; client: string; solution: string; date: string; content: string; issue: string; version?: number }>({ id: '', client: '', solution: solution, date: '', content: '', issue: '' });
   const [editId, setEditId] = useState<string | number | null>(null);
   const [clients, setClients] = useState<string[]>([]);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
@@ -169,9 +173,10 @@ export default function SolutionWorksPage({ params }: { params: Promise<{ soluti
     e.preventDefault();
     const res = await fetch('/api/works', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: { 'Content-Type': 'application/json', 'Idempotency-Key': addKey.current() },
       body: JSON.stringify(addForm)
     });
+    addKey.settle(res.status);
     const data = await res.json().catch(() => ({}));
     console.log('작업내역 추가 응답:', res.status, data);
     if (res.ok) {
@@ -194,7 +199,11 @@ export default function SolutionWorksPage({ params }: { params: Promise<{ soluti
   const handleEditSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!editId) return;
-    await fetch(`/api/works/${editId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(editForm) });
+    // editForm에는 목록에서 받은 version이 들어 있어 다른 사용자가 먼저 수정했으면 409
+    const res = await fetch(`/api/works/${editId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json', ...(token ? { Authorization: `Bearer ${token}` } : {}) }, body: JSON.stringify(editForm) });
+    if (res.status === 409) {
+      alert('다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.');
+    }
     setShowEditModal(false);
     setEditId(null);
     fetchWorks();
@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server";
+import { traceHeaders } from "@/app/api/trace";
 
 export async function PUT(req: NextRequest) {
   const body = await req.json();
@@ -6,6 +7,7 @@ export async function PUT(req: NextRequest) {
   const res = await fetch(`${process.env.NEXT_PUBLIC_API_BASE_URL}/auth/me`, {
     method: "PUT",
     headers: {
+      ...traceHeaders(req),
       "Content-Type": "application/json",
       Authorization: `Bearer ${token}`,
     },
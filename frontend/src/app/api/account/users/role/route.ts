@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server";
+import { traceHeaders } from "@/app/api/trace";
 
 export async function PATCH(req: NextRequest) {
   const token = req.headers.get("authorization")?.replace("Bearer ", "");
@@ -6,6 +7,7 @@ export async function PATCH(req: NextRequest) {
   const res = await fetch(`${process.env.NEXT_PUBLIC_API_BASE_URL}/users/${user_id}/role?role=${role}`, {
     method: "PATCH",
     headers: {
+      ...traceHeaders(req),
       "Authorization": `Bearer ${token}`,
       "Content-Type": "application/json",
     },
@@ -1,10 +1,12 @@
 import { NextRequest, NextResponse } from "next/server";
+import { traceHeaders } from "@/app/api/trace";
 
 export async function GET(req: NextRequest) {
   const token = req.headers.get("authorization")?.replace("Bearer ", "");
   const res = await fetch(`${process.env.NEXT_PUBLIC_API_BASE_URL}/users`, {
     method: "GET",
     headers: {
+      ...traceHeaders(req),
       "Authorization": `Bearer ${token}`,
     },
   });
@@ -0,0 +1,18 @@
+import { NextRequest } from 'next/server';
+import { traceHeaders } from '@/app/api/trace';
+
+const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://10.10.19.189:8000';
+
+export async function POST(req: NextRequest) {
+  const body = await req.text();
+  const headers: Record<string, string> = { 'Content-Type': 'application/json', ...traceHeaders(req) };
+  const authorization = req.headers.get('authorization');
+  if (authorization) headers['Authorization'] = authorization;
+  const res = await fetch(`${API_BASE}/batch`, {
+    method: 'POST',
+    headers,
+    body,
+  });
+  const data = await res.json();
+  return Response.json(data, { status: res.status });
+}
@@ -0,0 +1,11 @@
+import { NextRequest } from 'next/server';
+import { traceHeaders } from '@/app/api/trace';
+
+const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://10.10.19.189:8000';
+
+// 고객사 개요 (?recent=&months=)
+export async function GET(req: NextRequest, { params }: { params: { id: string } }) {
+  const res = await fetch(`${API_BASE}/clients/${params.id}/overview${req.nextUrl.search}`, { headers: traceHeaders(req) });
+  const data = await res.json();
+  return Response.json(data, { status: res.status });
+}
@@ -0,0 +1,11 @@
+import { NextRequest } from 'next/server';
+import { traceHeaders } from '@/app/api/trace';
+
+const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://10.10.19.189:8000';
+
+// 고객사 이름 자동완성 (?q=&solution=&limit=)
+export async function GET(req: NextRequest) {
+  const res = await fetch(`${API_BASE}/clients/suggest${req.nextUrl.search}`, { headers: traceHeaders(req) });
+  const data = await res.json();
+  return Response.json(data, { status: res.status });
+}
@@ -1,10 +1,11 @@
 import { NextRequest } from 'next/server';
+import { traceHeaders } from '@/app/api/trace';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://10.10.19.189:8000';
 
 export async function GET(req: NextRequest) {
   const url = `${API_BASE}/issues${req.nextUrl.search}`;
-  const res = await fetch(url, { method: 'GET' });
+  const res = await fetch(url, { method: 'GET', headers: traceHeaders(req) });
   const data = await res.json();
   return Response.json(data, { status: res.status });
 }
@@ -13,7 +14,12 @@ export async function POST(req: NextRequest) {
   const body = await req.text();
   const res = await fetch(`${API_BASE}/issues`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: {
+      'Content-Type': 'application/json',
+      ...traceHeaders(req),
+      // 재시도/중복 제출 시 백엔드가 같은 응답을 돌려주도록 키를 그대로 전달
+      ...(req.headers.get('idempotency-key') ? { 'Idempotency-Key': req.headers.get('idempotency-key')! } : {}),
+    },
     body,
   });
   const data = await res.json();
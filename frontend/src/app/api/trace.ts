@@ -0,0 +1,11 @@
+import { NextRequest } from 'next/server';
+
+// W3C trace context(traceparent/tracestate)를 백엔드로 그대로 전달해 프록시 → FastAPI → SQL 구간이 한 트레이스로 이어지도록 함
+export function traceHeaders(req: NextRequest): Record<string, string> {
+  const headers: Record<string, string> = {};
+  const traceparent = req.headers.get('traceparent');
+  const tracestate = req.headers.get('tracestate');
+  if (traceparent) headers['traceparent'] = traceparent;
+  if (traceparent && tracestate) headers['tracestate'] = tracestate;
+  return headers;
+}
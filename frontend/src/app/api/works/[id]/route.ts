@@ -1,26 +1,28 @@
 import { NextRequest } from 'next/server';
+import { traceHeaders } from '@/app/api/trace';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE_URL || 'http://10.10.19.189:8000';
 
-export async function GET(_req: NextRequest, { params }: { params: { id: string } }) {
-  const res = await fetch(`${API_BASE}/works/${params.id}`);
+export async function GET(req: NextRequest, { params }: { params: { id: string } }) {
+  const res = await fetch(`${API_BASE}/works/${params.id}`, { headers: traceHeaders(req) });
   const data = await res.json();
   return Response.json(data, { status: res.status });
 }
 
 export async function PUT(req: NextRequest, { params }: { params: { id: string } }) {
   const body = await req.text();
+  const authorization = req.headers.get('authorization');
   const res = await fetch(`${API_BASE}/works/${params.id}`, {
     method: 'PUT',
-    headers: { 'Content-Type': 'application/json' },
+    headers: { 'Content-Type': 'application/json', ...(authorization ? { Authorization: authorization } : {}), ...traceHeaders(req) },
     body,
   });
   const data = await res.json();
   return Response.json(data, { status: res.status });
 }
 
-export async function DELETE(_req: NextRequest, { params }: { params: { id: string } }) {
-  const res = await fetch(`${API_BASE}/works/${params.id}`, { method: 'DELETE' });
+export async function DELETE(req: NextRequest, { params }: { params: { id: string } }) {
+  const res = await fetch(`${API_BASE}/works/${params.id}`, { method: 'DELETE', headers: traceHeaders(req) });
   const data = await res.json().catch(() => ({}));
   return Response.json(data, { status: res.status });
 } 
\ No newline at end of file
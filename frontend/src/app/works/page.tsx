@@ -1,6 +1,8 @@
 'use client';
 import { useState, useEffect } from 'react';
 import { LayoutGrid, List, Plus, Pencil, Trash2 } from 'lucide-react';
+import { useAuth } from '@/components/AuthProvider';
+import { useIdempotencyKey } from '@/components/useIdempotencyKey';
 
 function getKoreanWeekLabel(weekStr: string) {
   if (!weekStr) return '';
@@ -100,6 +102,7 @@ const getWeekRange = (weekStr: string) => {
  * - 타일/테이블 모드 지원
  */
 export default function WorksPage() {
+  const { token } = useAuth();
   const [mode, setMode] = useState<'tile'|'table'>('tile');
   const [week, setWeek] = useState('');
   const [works, setWorks] = useState<any[]>([]);
@@ -108,8 +111,9 @@ export default function WorksPage() {
   const pageSize = 9;
   const [showAddModal, setShowAddModal] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
+  const addKey = useIdempotencyKey();
   const [addForm, setAddForm] = useState({ client: '', solution: '', date: '', content: '', issue: '' });
-  const [editForm, setEditForm] = useState({ id: '', client: '', solution: '', date: '', content: '', issue: '' });
+  const [editForm, setEditForm] = useState<{ id: string; client: string; solution: string; date: string; content: string; issue: string; version?: number }>({ id: '', client: '', solution: '', date: '', content: '', issue: '' });
   const [editId, setEditId] = useState<string | number | null>(null);
 
   useEffect(() => { setWeek(getCurrentWeek()); }, []);
@@ -139,7 +143,12 @@ export default function WorksPage() {
   };
   const handleAddSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
-    await fetch('/api/works', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(addForm) });
+    const res = await fetch('/api/works', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Idempotency-Key': addKey.current() },
+      body: JSON.stringify(addForm),
+    });
+    addKey.settle(res.status);
     setShowAddModal(false);
     setAddForm({ client: '', solution: '', date: '', content: '', issue: '' });
     fetchWorks();
@@ -156,7 +165,11 @@ export default function WorksPage() {
   const handleEditSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!editId) return;
-    await fetch(`/api/works/${editId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(editForm) });
+    // editForm에는 목록에서 받은 version이 들어 있어 다른 사용자가 먼저 수정했으면 409
+    const res = await fetch(`/api/works/${editId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json', ...(token ? { Authorization: `Bearer ${token}` } : {}) }, body: JSON.stringify(editForm) });
+    if (res.status === 409) {
+      alert('다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해 주세요.');
+    }
     setShowEditModal(false);
     setEditId(null);
     fetchWorks();
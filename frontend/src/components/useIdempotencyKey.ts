@@ -0,0 +1,22 @@
+'use client';
+import { useCallback, useRef } from 'react';
+
+function newKey() {
+  // randomUUID는 https/localhost에서만 있으므로 없으면 getRandomValues로 생성
+  if (typeof crypto.randomUUID === 'function') return crypto.randomUUID();
+  return Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// 등록 폼 한 건에 쓰는 Idempotency-Key (더블클릭/네트워크 재시도는 같은 키로 보내 백엔드가 한 번만 처리)
+export function useIdempotencyKey() {
+  const key = useRef('');
+  const current = useCallback(() => {
+    if (!key.current) key.current = newKey();
+    return key.current;
+  }, []);
+  // 응답이 확정되면 다음 제출은 새 키 (처리 중 409와 저장되지 않는 5xx는 같은 키로 다시 보내야 하므로 유지)
+  const settle = useCallback((status: number) => {
+    if (status !== 409 && status < 500) key.current = '';
+  }, []);
+  return { current, settle };
+}